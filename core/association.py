@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+手机号与联系人就近关联
+按块（段落、列表项、表格行等）记录手机号和联系人姓名的文本偏移量，
+在同一块内按最近距离配对，生成 (姓名, 职务, 手机号) 记录。
+整个过程对页面文本线性扫描一次，不影响爬取速度。
+"""
+
+import re
+from typing import List, Dict, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Comment
+
+from .config import CONTACT_ASSOCIATION
+from .extraction_cache import content_key
+
+# 块级标签：进入/离开这些标签时切分文本块
+BLOCK_TAGS = {
+    'p', 'div', 'li', 'dd', 'dt', 'ul', 'ol', 'dl', 'section', 'article',
+    'header', 'footer', 'aside', 'nav', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'table', 'tbody', 'thead', 'tfoot', 'form', 'address', 'blockquote', 'br',
+}
+
+# 不参与提取的标签
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+# 职务关键词（出现在姓名前后时记录为职务）
+TITLE_KEYWORDS = ['负责人', '经理', '主管', '主任', '总监']
+
+# 合并后的手机号模式（覆盖 PHONE_PATTERNS 中的各种写法），用于记录偏移量
+PHONE_OFFSET_PATTERN = re.compile(
+    r'(?<!\d)(?:\+?86\s*)?1[3-9]\d[\s-]?\d{4}[\s-]?\d{4}(?!\d)'
+)
+
+# 带关键词的姓名模式：关键词[：:] 姓名
+NAME_OFFSET_PATTERN = re.compile(
+    r'(联系人|负责人|经理|主管|主任|总监|姓名|名字)\s*[：:]?\s*'
+    r'([\u4e00-\u9fa5]{2,4}|[A-Za-z][A-Za-z. ]{1,19})'
+)
+
+# 姓名捕获后需截断的字段词，如 "张三电话" 截为 "张三"
+NAME_STOP_WORDS = ['电话', '手机', '联系', '职务', '邮箱', '地址', '传真'] + TITLE_KEYWORDS
+
+# 紧跟在姓名后的职务，如 "张三 经理"
+TRAILING_TITLE_PATTERN = re.compile(r'\s*(' + '|'.join(TITLE_KEYWORDS) + ')')
+
+
+def normalize_phone(raw: str) -> str:
+    """去掉空格、连字符和国家码，返回11位手机号"""
+    digits = re.sub(r'\D', '', raw)
+    if len(digits) == 13 and digits.startswith('86'):
+        digits = digits[2:]
+    return digits
+
+
+def iter_text_blocks(soup: BeautifulSoup) -> List[str]:
+    """按块切分页面文本。
+
+    表格行（tr）整体作为一个块，单元格之间用制表符分隔；
+    其余块级标签各自成块。遍历每个节点一次，为线性时间。
+    """
+    blocks: List[str] = []
+    buf: List[str] = []
+
+    def flush():
+        text = ''.join(buf).strip()
+        if text:
+            blocks.append(text)
+        buf.clear()
+
+    # 显式栈代替递归，嵌套很深或结构异常的页面不会触发 RecursionError
+    # 栈帧：(子节点迭代器, 是否在表格行内, 离开时是否切分块)
+    stack = [(iter(soup.children), False, False)]
+    while stack:
+        children, in_row, flush_after = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if flush_after:
+                flush()
+            continue
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            buf.append(str(child))
+            continue
+        name = child.name
+        if name in SKIP_TAGS:
+            continue
+        if name == 'tr':
+            flush()
+            stack.append((iter(child.children), True, True))
+        elif in_row:
+            if name in ('td', 'th'):
+                buf.append('\t')
+            stack.append((iter(child.children), True, False))
+        elif name in BLOCK_TAGS:
+            flush()
+            stack.append((iter(child.children), False, True))
+        else:
+            stack.append((iter(child.children), False, False))
+    flush()
+    return blocks
+
+
+def _find_names(block: str) -> List[Tuple[int, int, str, str]]:
+    """返回块内姓名的 (起始偏移, 结束偏移, 姓名, 职务) 列表，按偏移排序"""
+    names = []
+    for match in NAME_OFFSET_PATTERN.finditer(block):
+        keyword, name = match.group(1), match.group(2)
+        for word in NAME_STOP_WORDS:
+            pos = name.find(word)
+            if pos != -1:
+                name = name[:pos]
+        name = name.strip()
+        # 截断后过短，或姓名本身是职务词（如 "负责人：经理"）时跳过
+        if len(name) < 2:
+            continue
+        start = match.start(2)
+        end = start + len(name)
+        title = keyword if keyword in TITLE_KEYWORDS else ''
+        if not title:
+            trailing = TRAILING_TITLE_PATTERN.match(block, end)
+            if trailing:
+                title = trailing.group(1)
+        names.append((start, end, name, title))
+    return names
+
+
+def associate_block(block: str, max_distance: int = None) -> List[Dict[str, str]]:
+    """在单个文本块内把手机号与最近的姓名配对。
+
+    手机号和姓名均按偏移量有序，使用双指针一次扫描完成配对。
+    距离超过 max_distance 的姓名不配对，记录中姓名和职务留空。
+    """
+    if max_distance is None:
+        max_distance = CONTACT_ASSOCIATION['max_distance']
+
+    names = _find_names(block)
+    records = []
+    j = 0
+    for match in PHONE_OFFSET_PATTERN.finditer(block):
+        phone = normalize_phone(match.group(0))
+        if len(phone) != 11:
+            continue
+        start, end = match.start(), match.end()
+        # 前移指针，使 names[j] 为最后一个起始于手机号之前的姓名
+        while j + 1 < len(names) and names[j + 1][0] <= start:
+            j += 1
+
+        best = None
+        best_distance = None
+        for k in (j, j + 1):
+            if k >= len(names):
+                continue
+            n_start, n_end = names[k][0], names[k][1]
+            if n_end <= start:
+                distance = start - n_end
+            elif n_start >= end:
+                distance = n_start - end
+            else:
+                distance = 0
+            if best_distance is None or distance < best_distance:
+                best, best_distance = names[k], distance
+
+        if best is not None and best_distance <= max_distance:
+            records.append({'name': best[2], 'title': best[3], 'phone': phone})
+        else:
+            records.append({'name': '', 'title': '', 'phone': phone})
+    return records
+
+
+def extract_contact_records(soup: BeautifulSoup, max_distance: int = None, cache=None,
+                            blocks: List[str] = None) -> List[Dict[str, str]]:
+    """提取页面中的 (姓名, 职务, 手机号) 记录，同一手机号只保留首条。
+
+    传入 cache（ExtractionCache）时按块内容哈希缓存配对结果，
+    每页重复出现的页眉/页脚块只需配对一次。调用方已切分过文本块时可通过 blocks 传入。
+    """
+    if max_distance is None:
+        max_distance = CONTACT_ASSOCIATION['max_distance']
+    records = []
+    index: Dict[str, int] = {}
+    for block in (iter_text_blocks(soup) if blocks is None else blocks):
+        if cache is not None:
+            block_records = cache.get_or_compute(
+                content_key(f'block{max_distance}', block),
+                lambda: associate_block(block, max_distance)
+            )
+        else:
+            block_records = associate_block(block, max_distance)
+        for record in block_records:
+            pos = index.get(record['phone'])
+            if pos is None:
+                index[record['phone']] = len(records)
+                records.append(record)
+            elif not records[pos]['name'] and record['name']:
+                # 先前未配对到姓名的手机号，用后出现的有名记录替换
+                records[pos] = record
+    return records
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量爬取
+一个批次包含多个网址：协调器按上限逐步把子任务提交到调度器，
+汇总子任务状态为 batch_progress 事件，全部结束后把各站点结果打包为 ZIP。
+"""
+
+import csv
+import io
+import logging
+import os
+import zipfile
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .cancellation import CancellationToken
+from .config import BATCH, JOB_SCHEDULER, OUTPUT_DIR
+from .job_scheduler import QueueFullError
+from .result_cache import canonicalize_url
+from .task_store import STATUS_FAILED, STATUS_TERMINATED
+
+logger = logging.getLogger(__name__)
+
+# 子任务状态（在任务存储状态之外，增加尚未提交的 pending 和历史中近期失败的 skipped）
+ITEM_PENDING = 'pending'
+ITEM_RUNNING = 'running'
+ITEM_SKIPPED = 'skipped'
+
+
+def parse_url_list(text: str) -> Tuple[List[str], List[str]]:
+    """解析每行一个网址的文本，返回 (去重后的有效网址, 无效行)。
+
+    空行和以 # 开头的注释行忽略；规范化后相同的网址（大小写、默认端口、末尾斜杠等不同）只保留首次出现。
+    """
+    urls: List[str] = []
+    invalid: List[str] = []
+    seen = set()
+    for line in text.splitlines():
+        url = line.strip()
+        if not url or url.startswith('#'):
+            continue
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            invalid.append(url)
+            continue
+        key = canonicalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            urls.append(url)
+    return urls, invalid
+
+
+class BatchCoordinator:
+    """逐步提交并跟踪一个批次的子任务。
+
+    items 中每项为 {'url', 'status', 'task_id', 'files'}；status 为 pending 的项由协调器提交，
+    running 的项（历史中已在运行的任务）只跟踪，其余状态视为已结束。
+    resolve 在提交前对每个 pending 项调用一次（如按URL历史复用结果），可直接修改其状态；
+    on_item(序号, 子项) 在子项变化时调用，用于逐项保存进度。
+    """
+
+    def __init__(self, items: List[Dict], store, submit: Callable[[str], str],
+                 emit: Callable[[Dict], None], cancel: Callable[[str], bool] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 max_outstanding: int = None, poll_interval: float = None,
+                 resolve: Callable[[Dict], None] = None,
+                 on_item: Callable[[int, Dict], None] = None):
+        self.items = items
+        self.store = store
+        self.submit = submit
+        self.emit = emit
+        self.cancel = cancel
+        self.cancel_token = cancel_token or CancellationToken()
+        self.max_outstanding = max_outstanding or BATCH['max_outstanding'] or JOB_SCHEDULER['max_workers']
+        self.poll_interval = BATCH['poll_interval'] if poll_interval is None else poll_interval
+        self.resolve = resolve
+        self.on_item = on_item
+        self._positions = {id(item): index for index, item in enumerate(items)}
+        self._last_counts = None
+
+    def _changed(self, item: Dict) -> None:
+        if self.on_item is not None:
+            self.on_item(self._positions[id(item)], item)
+
+    def counts(self) -> Dict[str, int]:
+        counts = Counter(item['status'] for item in self.items)
+        counts['total'] = len(self.items)
+        return dict(counts)
+
+    def _report(self) -> None:
+        counts = self.counts()
+        if counts != self._last_counts:
+            self._last_counts = counts
+            self.emit({'type': 'batch_progress', **counts})
+
+    def run(self) -> bool:
+        """执行到所有子任务结束，返回是否完整执行（未被取消）"""
+        pending = deque(item for item in self.items if item['status'] == ITEM_PENDING)
+        active = [item for item in self.items if item['status'] == ITEM_RUNNING]
+        resolved = set()
+        self._report()
+
+        while pending or active:
+            if self.cancel_token.cancelled:
+                self._abort(pending, active)
+                return False
+
+            while pending and len(active) < self.max_outstanding:
+                item = pending[0]
+                if self.resolve is not None and id(item) not in resolved:
+                    resolved.add(id(item))
+                    self.resolve(item)
+                    if item['status'] != ITEM_PENDING:
+                        # 已有结果、已在运行或近期失败，不再提交
+                        pending.popleft()
+                        if item['status'] == ITEM_RUNNING:
+                            active.append(item)
+                        self._changed(item)
+                        continue
+                try:
+                    item['task_id'] = self.submit(item['url'])
+                except QueueFullError:
+                    # 调度器队列已满，下一轮再提交
+                    break
+                except Exception as e:
+                    logger.warning(f"批量子任务提交失败 {item['url']}: {e}")
+                    item['status'] = STATUS_FAILED
+                    item['error'] = str(e)
+                    pending.popleft()
+                    self._changed(item)
+                    continue
+                pending.popleft()
+                item['status'] = ITEM_RUNNING
+                active.append(item)
+                self._changed(item)
+
+            still_active = []
+            for item in active:
+                task = self.store.get_task(item['task_id'])
+                if task is None:
+                    item['status'] = STATUS_FAILED
+                elif task['done']:
+                    item['status'] = task['status']
+                    item['files'] = task.get('files') or {}
+                else:
+                    still_active.append(item)
+                    continue
+                self._changed(item)
+            active = still_active
+            self._report()
+
+            if pending or active:
+                self.cancel_token.wait(self.poll_interval)
+        return True
+
+    def _abort(self, pending: deque, active: List[Dict]) -> None:
+        for item in active:
+            if self.cancel is not None:
+                self.cancel(item['task_id'])
+            item['status'] = STATUS_TERMINATED
+            self._changed(item)
+        for item in pending:
+            item['status'] = ITEM_SKIPPED
+            self._changed(item)
+        self._report()
+
+
+def build_batch_archive(items: List[Dict], archive_path: str, output_dir: str = OUTPUT_DIR) -> None:
+    """把各子任务的 DOCX 结果和汇总表 summary.csv 打包为 ZIP"""
+    summary = io.StringIO()
+    writer = csv.writer(summary)
+    writer.writerow(['url', 'status', 'task_id', 'file'])
+    with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for item in items:
+            docx = (item.get('files') or {}).get('docx', '')
+            filename = os.path.basename(docx) if docx else ''
+            path = os.path.join(output_dir, filename) if filename else ''
+            if path and os.path.exists(path):
+                archive.write(path, filename)
+            else:
+                filename = ''
+            writer.writerow([item['url'], item['status'], item.get('task_id', ''), filename])
+        archive.writestr('summary.csv', '\ufeff' + summary.getvalue())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取任务取消
+CancellationToken 由爬虫在每次抓取之间检查。同进程内 cancel() 立即生效；
+任务在其他 gunicorn worker 中运行时，通过 check 回调定期查询共享任务存储。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from .config import CANCELLATION
+
+
+class CancellationToken:
+    """可在线程间共享的取消标记"""
+
+    def __init__(self, check: Optional[Callable[[], bool]] = None, poll_interval: float = None):
+        self._event = threading.Event()
+        self._check = check
+        self.poll_interval = CANCELLATION['poll_interval'] if poll_interval is None else poll_interval
+        self._last_check = 0.0
+        self.reason = ''
+
+    def cancel(self, reason: str = '') -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self._check is not None:
+            now = time.monotonic()
+            # 外部检查（如查询任务存储）按间隔限流
+            if now - self._last_check >= self.poll_interval:
+                self._last_check = now
+                if self._check():
+                    self.cancel('external')
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """最多等待 timeout 秒，期间被取消立即返回 True（替代 time.sleep）"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.cancelled:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            step = remaining if self._check is None else min(remaining, self.poll_interval)
+            if self._event.wait(step):
+                return True
@@ -99,4 +99,180 @@ DATA_CLEANING = {
     'deduplication_strategy': 'first_occurrence',  # 去重策略：first_occurrence, keep_all
     'track_duplicates': True,  # 是否跟踪重复数据统计
     'save_original_data': True,  # 是否保存原始数据用于对比
-} 
\ No newline at end of file
+}
+
+# 手机号与联系人就近关联
+CONTACT_ASSOCIATION = {
+    'enabled': False,  # 是否启用关联模式（输出 姓名/职务/手机号 记录）
+    'max_distance': 40,  # 同一块内姓名与手机号的最大字符距离
+}
+
+# 表格提取（员工/联系人名录）
+TABLE_EXTRACTION = {
+    'enabled': True,  # 是否按表头列提取表格中的联系人
+    'header_scan_rows': 3,  # 在表格前几行中查找表头
+    'min_header_fields': 2,  # 表头至少命中的字段数
+    'header_label_max_length': 10,  # 表头单元格的最大长度，更长的单元格视为数据而不是列名
+}
+
+# 表头关键词 -> 字段
+TABLE_HEADER_FIELDS = {
+    'name': ['姓名', '联系人', '名字', '负责人'],
+    'title': ['职务', '职位', '职称', '岗位'],
+    'phone': ['手机', '电话', '联系方式', '联系电话'],
+}
+
+# 提取结果缓存（按内容哈希）
+EXTRACTION_CACHE = {
+    'enabled': True,  # 是否启用提取结果缓存
+    'max_entries': 20000,  # 进程内 LRU 最大条目数
+    'disk_path': os.environ.get('EXTRACTION_CACHE_PATH') or None,  # 可选的磁盘缓存（SQLite 文件路径）
+    'disk_batch_size': 200,  # 磁盘层累计多少条写入一次
+    'disk_flush_interval': 5.0,  # 磁盘层最长写入间隔（秒）
+}
+
+# 站点模板块（页眉/页脚等）识别
+TEMPLATE_DETECTION = {
+    'enabled': True,  # 是否识别并跳过每页重复的模板块
+    'learn_pages': 5,  # 用前 N 页学习模板
+    'min_ratio': 0.8,  # 在学习页中出现比例不低于该值的块视为模板
+    'min_text_length': 10,  # 文本过短的块不参与识别
+}
+
+# 近似重复页面识别（SimHash）
+NEAR_DUPLICATE = {
+    # 是否识别与已爬页面近似重复的页面（按去掉模板块后的主体内容，页面仍照常提取，只影响外链调度和统计）。
+    # 指纹计算的耗时与页面文本长度成正比，通常高于提取本身，默认关闭
+    'enabled': os.environ.get('NEAR_DUPLICATE', '0').lower() in ('1', 'true', 'yes'),
+    'threshold': 3,  # 汉明距离不超过该值视为近似重复（最大 7）
+    'deprioritize_links': True,  # 近似重复页面的外链延后爬取
+}
+
+# 紧凑去重集合：已访问网址、已出现的手机号/联系人只保存 64 位键（手机号存为整数），
+# 用于十万页级别的大规模爬取；关闭时使用保存完整字符串的 set
+COMPACT_DEDUP = {
+    'enabled': os.environ.get('COMPACT_DEDUP', '0').lower() in ('1', 'true', 'yes'),
+    'initial_capacity': 1024,  # 初始容量，超过后自动扩容
+    'extraction_cache_entries': 2000,  # 紧凑模式下提取结果缓存（内存层）的条目上限
+}
+
+# 任务/历史共享存储（多 worker 部署时所有进程共用）
+TASK_STORE = {
+    'backend': os.environ.get('TASK_STORE_BACKEND', 'sqlite'),  # sqlite 或 redis
+    'sqlite_path': os.environ.get('TASK_STORE_PATH', os.path.join(BASE_DIR, 'data', 'tasks.db')),
+    'redis_url': os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+    'redis_prefix': 'phone_scraper:',
+    'max_events_per_task': 500,  # 每个任务保留的最近事件数（断线重连可回放的范围）
+}
+
+# SSE 事件推送
+EVENT_STREAM = {
+    'heartbeat_interval': 15,  # 空闲时发送心跳的间隔（秒）
+    'remote_poll_interval': 1.0,  # 任务在其他 worker 中运行时检查存储的间隔（秒）
+    'buffer_size': 200,  # 进程内每个任务缓存的最近事件数，本地订阅者优先从这里读取
+}
+
+# 进度事件合并：逐页事件按时间间隔合并为摘要，减少服务端和浏览器的逐事件开销
+EVENT_COALESCING = {
+    'enabled': True,  # 是否合并逐页事件（请求中 verbose=true 时不合并）
+    'interval': 2.0,  # 摘要发送间隔（秒）
+}
+
+# 独立的异步 SSE 推送服务（asyncio），事件流不再占用 gunicorn 同步 worker
+STREAM_SERVER = {
+    'host': os.environ.get('STREAM_HOST', '0.0.0.0'),
+    'port': int(os.environ.get('STREAM_PORT', '5001')),
+    'poll_interval': 0.5,  # 每个活跃任务检查共享存储的间隔（秒），与订阅者数量无关
+}
+
+# 爬取任务调度：固定大小的工作线程池 + 有界优先级队列（每个 gunicorn worker 进程各自一份）
+JOB_SCHEDULER = {
+    'max_workers': int(os.environ.get('CRAWL_WORKERS', '2')),  # 同时执行的爬取任务数
+    'max_queue': int(os.environ.get('CRAWL_QUEUE_SIZE', '20')),  # 排队任务上限，超出返回 429
+    'default_duration': 120.0,  # 尚无完成任务时用于估算等待时间的平均耗时（秒）
+}
+
+# 任务优先级：数值越小越先执行，同优先级先进先出
+JOB_PRIORITIES = {
+    'high': 0,
+    'normal': 1,
+    'low': 2,
+}
+
+# 任务取消：任务在其他 worker 进程中运行时，爬虫查询共享存储的间隔（秒）
+CANCELLATION = {
+    'poll_interval': 0.5,
+}
+
+# 批量提交：一次提交多个网址，统一排队、汇总进度并打包下载结果
+BATCH = {
+    'max_urls': 5000,  # 单个批次最多网址数
+    'max_outstanding': None,  # 同时提交到调度器的子任务数，None 表示与工作线程数相同
+    'priority': 'low',  # 子任务优先级，避免批量任务挤占交互式请求
+    'poll_interval': 1.0,  # 检查子任务状态的间隔（秒）
+}
+
+# 命令行多站点并行爬取（run.py --urls-file）：多进程，每个进程内多线程
+PARALLEL_CRAWL = {
+    'processes': os.cpu_count() or 1,  # 进程数上限
+    'threads_per_process': 4,  # 每个进程同时爬取的站点数（爬取以网络等待为主）
+    'max_workers': 16,  # 默认的全局并发站点数上限
+}
+
+# 爬取结果缓存：按规范化网址 + 爬取参数缓存结果文件
+RESULT_CACHE = {
+    'ttl': int(os.environ.get('RESULT_CACHE_TTL', '86400')),  # 结果保持新鲜的时间（秒）
+    'stale_ttl': int(os.environ.get('RESULT_CACHE_STALE_TTL', '604800')),  # 过期后仍可先返回旧结果、后台刷新的时间（秒）
+    'failed_retry': 300,  # 失败后多久内不再重新创建任务（秒）
+}
+
+# 链接可达性探测：在任务中执行，结果按主机缓存
+REACHABILITY = {
+    'timeout': 10,  # 探测超时（秒）
+    'ttl': 300,  # 可达结果缓存时间（秒）
+    'failure_ttl': 60,  # 不可达结果缓存时间（秒）：连接失败按主机、HTTP 错误按网址缓存，期间提交直接返回错误
+}
+
+# 页面结果存储：爬取过程中逐页写入，供结果接口分页查询（SQLite，所有 worker 共享）
+RESULT_STORE = {
+    'path': os.environ.get('RESULT_STORE_PATH', os.path.join(BASE_DIR, 'data', 'results.db')),
+    'page_size': 100,  # 默认每页条数
+    'max_page_size': 1000,  # 每页条数上限
+}
+
+# 页面结果写入端：每页结果立即写入，按批落盘
+RESULT_SINK = {
+    'fsync_every': 20,  # 累计多少条记录落盘一次
+    'fsync_interval': 2.0,  # 距上次落盘超过该时间（秒）时落盘
+}
+
+# 跨任务手机号索引：手机号 -> 出现的站点/页面及首次、最近出现时间（SQLite，所有 worker 共享）
+PHONE_INDEX = {
+    'enabled': os.environ.get('PHONE_INDEX', '1') != '0',  # 爬取时是否写入手机号索引
+    'path': os.environ.get('PHONE_INDEX_PATH', os.path.join(BASE_DIR, 'data', 'phone_index.db')),
+    'batch_size': 20,  # 爬取时累计多少个页面写入一次
+    'page_size': 100,  # 新号码列表默认每页条数
+    'max_page_size': 1000,  # 每页条数上限
+}
+
+# 任务与历史记录的生命周期：后台线程定期清理，避免长期运行的 worker 持续占用存储和内存
+LIFECYCLE = {
+    'enabled': True,
+    'task_ttl': int(os.environ.get('TASK_TTL', '86400')),  # 任务结束多久后删除任务、事件和页面结果（秒）
+    'max_history': int(os.environ.get('MAX_HISTORY', '10000')),  # 历史记录上限，超出时淘汰最久未使用的
+    'interval': 300,  # 清理间隔（秒）
+}
+
+# 输出文件保留策略：由生命周期清理线程执行，删除文件时同步清理对应的历史记录（任一规则为 0 表示不启用）
+OUTPUT_RETENTION = {
+    'max_age': int(os.environ.get('OUTPUT_MAX_AGE', str(30 * 86400))),  # 文件最长保留时间（秒）
+    'max_bytes': int(os.environ.get('OUTPUT_MAX_BYTES', str(5 * 1024 ** 3))),  # 输出目录总大小上限（字节）
+    'keep_latest': int(os.environ.get('OUTPUT_KEEP_LATEST', '5')),  # 每个主机保留的最新文件数
+    'min_age': 300,  # 新生成的文件在该时间（秒）内不删除
+}
+
+# Word 导出：streaming 为 True 时逐段写入文档 XML（大量结果时更快、内存占用恒定），
+# False 时使用 python-docx 构建完整文档后保存
+DOCX_EXPORT = {
+    'streaming': True,
+}
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式生成 Word 文档
+python-docx 先在内存中构建整个文档对象树再保存，结果页数多时又慢又占内存。
+这里直接把 word/document.xml 逐段写入 ZIP 流：样式、主题、编号等其余部件取自
+python-docx 自带的默认模板（只读取一次并缓存），因此样式与 Document() 生成的文档一致。
+耗时和内存只与当前写入的段落有关，与结果总数成线性关系。
+"""
+
+import os
+import re
+import threading
+import zipfile
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+import docx
+
+DOCUMENT_PART = 'word/document.xml'
+TEMPLATE_PATH = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+
+# XML 1.0 不允许的控制字符（python-docx 遇到会报错，这里直接去掉）
+_INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# 缓冲超过该大小（字符数）时写入 ZIP 流
+_FLUSH_SIZE = 64 * 1024
+
+_template: Optional[Tuple[Dict[str, bytes], str, str]] = None
+_template_lock = threading.Lock()
+
+
+def _load_template() -> Tuple[Dict[str, bytes], str, str]:
+    """返回 (除正文外的模板部件, 正文开头, 正文结尾)；正文结尾包含页面设置 sectPr"""
+    global _template
+    with _template_lock:
+        if _template is None:
+            with zipfile.ZipFile(TEMPLATE_PATH) as z:
+                parts = {name: z.read(name) for name in z.namelist() if name != DOCUMENT_PART}
+                document = z.read(DOCUMENT_PART).decode('utf-8')
+            body_start = document.index('<w:body>') + len('<w:body>')
+            body_end = document.index('<w:sectPr')
+            _template = (parts, document[:body_start], document[body_end:])
+        return _template
+
+
+def _text(text) -> str:
+    return escape(_INVALID_XML_CHARS.sub('', str(text)))
+
+
+def _run(text, bold: bool = False) -> str:
+    props = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:r>{props}<w:t xml:space="preserve">{_text(text)}</w:t></w:r>'
+
+
+class StreamingDocxWriter:
+    """逐段写入的 Word 文档。先写入临时文件，close 时再改名，中途失败不会留下不完整的文档"""
+
+    def __init__(self, path: str):
+        parts, self._head, self._tail = _load_template()
+        self.path = path
+        self._tmp_path = f'{path}.tmp'
+        self._zip = zipfile.ZipFile(self._tmp_path, 'w', zipfile.ZIP_DEFLATED)
+        for name, data in parts.items():
+            self._zip.writestr(name, data)
+        self._stream = self._zip.open(DOCUMENT_PART, 'w', force_zip64=True)
+        self._buffer = [self._head]
+        self._buffered = len(self._head)
+
+    def _write(self, xml: str) -> None:
+        self._buffer.append(xml)
+        self._buffered += len(xml)
+        if self._buffered >= _FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._stream.write(''.join(self._buffer).encode('utf-8'))
+        self._buffer = []
+        self._buffered = 0
+
+    def paragraph(self, *runs: Sequence, style: str = None, center: bool = False) -> None:
+        """写入一个段落；runs 为文本或 (文本, 是否加粗)"""
+        props = ''
+        if style or center:
+            props = '<w:pPr>'
+            if style:
+                props += f'<w:pStyle w:val="{style}"/>'
+            if center:
+                props += '<w:jc w:val="center"/>'
+            props += '</w:pPr>'
+        body = ''.join(_run(*run) if isinstance(run, tuple) else _run(run) for run in runs)
+        self._write(f'<w:p>{props}{body}</w:p>')
+
+    def heading(self, text: str, level: int = 1, center: bool = False) -> None:
+        """标题段落，level 为 0 时使用 Title 样式（与 python-docx 的 add_heading 一致）"""
+        self.paragraph(text, style='Title' if level == 0 else f'Heading{level}', center=center)
+
+    def close(self) -> None:
+        self._write(self._tail)
+        self._flush()
+        self._stream.close()
+        self._zip.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """放弃写入并删除临时文件"""
+        try:
+            self._stream.close()
+            self._zip.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'StreamingDocxWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+        return False
+
+
+def write_results_docx(path: str, site_title: str, results: Iterable, crawled_at: str,
+                       page_count: int, phone_count: int, contact_count: int) -> None:
+    """按 export_to_docx 的版式流式写出页面结果"""
+    with StreamingDocxWriter(path) as writer:
+        writer.heading(site_title, 0, center=True)
+        writer.paragraph(f"爬取时间: {crawled_at}")
+        writer.paragraph(f"爬取页面数: {page_count}")
+        writer.paragraph(f"总计手机号: {phone_count} 个")
+        writer.paragraph(f"总计联系人: {contact_count} 个")
+        writer.paragraph("=" * 50)
+
+        for i, result in enumerate(results, 1):
+            writer.heading(f"{i}. {result['title']}", 1)
+            if result['phone_numbers']:
+                writer.paragraph(("手机号: ", True), result['phone_numbers'])
+            if result['contacts']:
+                writer.paragraph(("联系人: ", True), result['contacts'])
+            # 关联记录：姓名（职务）- 手机号
+            for record in result.get('records') or []:
+                if not record['name']:
+                    continue
+                label = record['name'] + (f"（{record['title']}）" if record['title'] else '')
+                writer.paragraph((f"{label}: ", True), record['phone'])
+            writer.paragraph(f"来源: {result['url']}")
+            writer.paragraph("-" * 30)
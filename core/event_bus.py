@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务事件通知
+每个任务一个基于条件变量的通道：产生事件时唤醒所有订阅者，订阅者在没有新事件时阻塞，
+无需轮询。事件持久保存在任务存储中；通道另外用有界环形缓冲保留最近的事件，
+本进程的订阅者可直接读取，不必查询存储。
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from .config import EVENT_STREAM
+
+
+def format_sse(evt: Dict, event_id: int = None) -> str:
+    """格式化为 SSE 消息；带 id 的消息可在断线重连时通过 Last-Event-ID 续传"""
+    data = f"data: {json.dumps(evt, ensure_ascii=False)}\n\n"
+    if event_id is not None:
+        return f"id: {event_id}\n" + data
+    return data
+
+
+class EventChannel:
+    """单个任务的通知通道，支持多个订阅者"""
+
+    def __init__(self, buffer_size: int):
+        self.cond = threading.Condition()
+        self.ring: deque = deque(maxlen=buffer_size)
+        self.latest_id = 0
+        self.closed = False
+        self.local_producer = False
+        self.subscribers = 0
+
+
+class EventBus:
+    """进程内的任务事件通知中心"""
+
+    def __init__(self, buffer_size: int = None):
+        self.buffer_size = buffer_size or EVENT_STREAM['buffer_size']
+        self._lock = threading.Lock()
+        self._channels: Dict[str, EventChannel] = {}
+
+    def _channel(self, task_id: str) -> EventChannel:
+        with self._lock:
+            channel = self._channels.get(task_id)
+            if channel is None:
+                channel = self._channels[task_id] = EventChannel(self.buffer_size)
+            return channel
+
+    def open(self, task_id: str) -> None:
+        """登记本进程为该任务的事件产生方，订阅者可完全依赖通知而不轮询"""
+        self._channel(task_id).local_producer = True
+
+    def is_local(self, task_id: str) -> bool:
+        """任务是否由本进程产生事件（含刚结束的任务）"""
+        with self._lock:
+            channel = self._channels.get(task_id)
+            return bool(channel and channel.local_producer)
+
+    def publish(self, task_id: str, event_id: int, event: Dict = None) -> None:
+        """通知订阅者：事件 event_id 已写入存储；传入 event 时同时放入环形缓冲"""
+        with self._lock:
+            channel = self._channels.get(task_id)
+        if channel is None:
+            return
+        with channel.cond:
+            if event is not None:
+                channel.ring.append((event_id, event))
+            channel.latest_id = max(channel.latest_id, event_id)
+            channel.cond.notify_all()
+
+    def events_after(self, task_id: str, after_id: int) -> Optional[List[Tuple[int, Dict]]]:
+        """从环形缓冲读取 id 大于 after_id 的事件；缓冲无法完整覆盖时返回 None"""
+        with self._lock:
+            channel = self._channels.get(task_id)
+        if channel is None:
+            return None
+        with channel.cond:
+            if not channel.ring:
+                return [] if channel.latest_id <= after_id and channel.local_producer else None
+            if channel.ring[0][0] > after_id + 1:
+                return None
+            return [(event_id, event) for event_id, event in channel.ring if event_id > after_id]
+
+    def close(self, task_id: str) -> None:
+        """任务结束：唤醒所有订阅者。
+
+        刚结束的通道暂时保留，使正在两次等待之间的订阅者也能立即得知任务结束；
+        更早结束且无订阅者的通道在此时一并释放。
+        """
+        channel = self._channel(task_id)
+        with channel.cond:
+            channel.closed = True
+            channel.cond.notify_all()
+        with self._lock:
+            for other_id, other in list(self._channels.items()):
+                if other_id != task_id and other.closed and other.subscribers == 0:
+                    del self._channels[other_id]
+
+    def wait(self, task_id: str, after_id: int, timeout: float) -> bool:
+        """阻塞直到出现 id 大于 after_id 的事件或任务结束，超时返回 False"""
+        channel = self._channel(task_id)
+        with channel.cond:
+            channel.subscribers += 1
+            try:
+                notified = channel.cond.wait_for(
+                    lambda: channel.latest_id > after_id or channel.closed, timeout
+                )
+            finally:
+                channel.subscribers -= 1
+        self._release(task_id, channel)
+        return notified
+
+    def _release(self, task_id: str, channel: EventChannel) -> None:
+        """非本进程产生的通道在无订阅者时释放"""
+        with self._lock:
+            if not channel.local_producer and channel.subscribers == 0 and self._channels.get(task_id) is channel:
+                del self._channels[task_id]
+
+    def channel_count(self) -> int:
+        with self._lock:
+            return len(self._channels)
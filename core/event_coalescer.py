@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进度事件合并
+爬虫每页产生 page_start/page_result 两个事件。合并器把它们累积为按时间间隔发送的
+progress_summary 摘要；定期的 progress 快照在同一间隔内只保留最新一条，随摘要之后发出。
+其他事件原样转发（转发前先发出已累积的摘要以保持顺序）。
+"""
+
+import time
+from typing import Callable, Dict
+
+from .config import EVENT_COALESCING
+
+# 需要合并的逐页事件
+PER_PAGE_EVENTS = ('page_start', 'page_result')
+
+
+class ProgressCoalescer:
+    """可直接作为 PhoneScraper.progress_callback 使用"""
+
+    def __init__(self, emit: Callable[[Dict], None], interval: float = None, verbose: bool = False):
+        self.emit = emit
+        self.interval = EVENT_COALESCING['interval'] if interval is None else interval
+        self.verbose = verbose or not EVENT_COALESCING['enabled']
+        self._last_flush = time.monotonic()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.pending_pages = 0
+        self.new_phones = 0
+        self.new_contacts = 0
+        self.last_index = 0
+        self.last_url = ''
+        self.queue = 0
+        self.latest_progress = None
+
+    def __call__(self, evt: Dict) -> None:
+        if self.verbose:
+            self.emit(evt)
+            return
+
+        event_type = evt.get('type')
+        if event_type not in PER_PAGE_EVENTS and event_type != 'progress':
+            self.flush()
+            self.emit(evt)
+            return
+
+        if event_type == 'progress':
+            self.latest_progress = evt
+        elif event_type == 'page_start':
+            self.queue = evt.get('queue', self.queue)
+        else:
+            self.pending_pages += 1
+            self.new_phones += evt.get('new_phones', 0)
+            self.new_contacts += evt.get('new_contacts', 0)
+            self.last_index = evt.get('index', self.last_index)
+            self.last_url = evt.get('url', self.last_url)
+
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """发出已累积的摘要和最新的 progress（没有累积时不发送）"""
+        self._last_flush = time.monotonic()
+        if self.pending_pages:
+            self.emit({
+                'type': 'progress_summary',
+                'pages': self.last_index,
+                'batch': self.pending_pages,
+                'new_phones': self.new_phones,
+                'new_contacts': self.new_contacts,
+                'url': self.last_url,
+                'queue': self.queue,
+            })
+        if self.latest_progress is not None:
+            self.emit(self.latest_progress)
+        self._reset()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提取结果缓存
+以内容哈希为键缓存页面级和块级的提取结果：进程内 LRU 加可选的 SQLite 磁盘层。
+同一页面出现在多个 URL 下、或每页都带相同页脚时，只需提取一次。
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from .config import EXTRACTION_CACHE
+
+logger = logging.getLogger(__name__)
+
+# 提取逻辑变更时递增，使旧的磁盘缓存自动失效
+CACHE_VERSION = 2
+
+
+def content_key(kind: str, content: str) -> str:
+    """生成缓存键：类型 + 版本 + 内容 SHA-1"""
+    digest = hashlib.sha1(content.encode('utf-8', 'surrogatepass')).hexdigest()
+    return f"{kind}:{CACHE_VERSION}:{digest}"
+
+
+class ExtractionCache:
+    """线程安全的两级缓存，值必须可 JSON 序列化。
+    磁盘层按批写入：累计 disk_batch_size 条或距上次写入超过 disk_flush_interval 秒时，
+    用一个事务 executemany 写入，写盘期间不占用内存层的锁。
+    """
+
+    def __init__(self, max_entries: int = 20000, disk_path: Optional[str] = None,
+                 disk_batch_size: int = None, disk_flush_interval: float = None):
+        self.max_entries = max_entries
+        self.disk_batch_size = max(1, disk_batch_size or EXTRACTION_CACHE['disk_batch_size'])
+        self.disk_flush_interval = (EXTRACTION_CACHE['disk_flush_interval']
+                                    if disk_flush_interval is None else disk_flush_interval)
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 磁盘层单独加锁；_pending 为尚未写盘的条目（键 -> JSON）
+        self._disk_lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._last_flush = time.monotonic()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if disk_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+                self._db = sqlite3.connect(disk_path, check_same_thread=False)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS extraction_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"磁盘缓存不可用，仅使用内存缓存: {e}")
+                self._db = None
+
+    def get(self, key: str) -> Any:
+        """读取缓存，未命中返回 None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            pending = self._pending.get(key)
+        if self._db is not None:
+            if pending is None:
+                with self._disk_lock:
+                    row = self._db.execute('SELECT value FROM extraction_cache WHERE key = ?', (key,)).fetchone()
+                pending = row[0] if row is not None else None
+            if pending is not None:
+                value = json.loads(pending)
+                with self._lock:
+                    self._remember(key, value)
+                    self.hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存（内存层，以及启用时的磁盘层写入缓冲）"""
+        with self._lock:
+            self._remember(key, value)
+            if self._db is None:
+                return
+            self._pending[key] = json.dumps(value, ensure_ascii=False)
+            due = (len(self._pending) >= self.disk_batch_size
+                   or time.monotonic() - self._last_flush >= self.disk_flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """把缓冲中的条目写入磁盘层"""
+        if self._db is None:
+            return
+        with self._disk_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not batch:
+                return
+            try:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO extraction_cache (key, value) VALUES (?, ?)', batch.items()
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入磁盘缓存失败: {e}")
+
+    def close(self) -> None:
+        """写入剩余条目并关闭磁盘层"""
+        self.flush()
+        if self._db is not None:
+            with self._disk_lock:
+                self._db.close()
+                self._db = None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """命中则返回缓存，否则计算并写入"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """命中统计"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._memory)}
+
+    def clear(self) -> None:
+        """清空内存层（磁盘层保留）"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_shared_cache: Optional[ExtractionCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """进程内共享的缓存实例，跨页面和任务复用；未启用时返回 None"""
+    global _shared_cache
+    if not EXTRACTION_CACHE['enabled']:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ExtractionCache(
+                max_entries=EXTRACTION_CACHE['max_entries'],
+                disk_path=EXTRACTION_CACHE['disk_path'],
+            )
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
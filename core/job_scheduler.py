@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取任务调度
+固定大小的工作线程池从有界优先级队列中取任务执行（同优先级先进先出）。
+队列变化时通过回调通知每个排队任务的当前位置和预计等待时间；
+队列已满时拒绝提交，由调用方返回 429。
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import JOB_SCHEDULER, JOB_PRIORITIES
+
+logger = logging.getLogger(__name__)
+
+# 平均任务耗时的平滑系数
+DURATION_SMOOTHING = 0.3
+
+
+class QueueFullError(Exception):
+    """排队任务数已达上限"""
+
+    def __init__(self, estimated_wait: float):
+        super().__init__(f'任务队列已满，预计等待 {estimated_wait:.0f} 秒')
+        self.estimated_wait = estimated_wait
+
+
+def parse_priority(value) -> int:
+    """把请求中的优先级（'high'/'normal'/'low' 或数字）转换为队列优先级"""
+    if isinstance(value, str) and value in JOB_PRIORITIES:
+        return JOB_PRIORITIES[value]
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return JOB_PRIORITIES['normal']
+
+
+class Job:
+    """队列中的一个任务"""
+
+    def __init__(self, job_id: str, fn: Callable[[], None], priority: int, seq: int,
+                 on_position: Optional[Callable[[int, float], None]] = None):
+        self.job_id = job_id
+        self.fn = fn
+        self.priority = priority
+        self.seq = seq
+        self.on_position = on_position
+        self.position = 0
+
+    def __lt__(self, other: 'Job') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class JobScheduler:
+    """有界优先级队列 + 固定大小的工作线程池"""
+
+    def __init__(self, max_workers: int = None, max_queue: int = None):
+        self.max_workers = max_workers or JOB_SCHEDULER['max_workers']
+        self.max_queue = JOB_SCHEDULER['max_queue'] if max_queue is None else max_queue
+        self.avg_duration = JOB_SCHEDULER['default_duration']
+        self._cond = threading.Condition()
+        self._heap: List[Job] = []
+        self._seq = itertools.count()
+        self._running: Dict[str, float] = {}
+        self._workers: List[threading.Thread] = []
+        self.completed = 0
+
+    def _ensure_workers(self) -> None:
+        # 首次提交时再启动线程，导入模块不产生后台线程
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker, name=f'crawl-worker-{len(self._workers) + 1}', daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def estimated_wait(self, position: int) -> float:
+        """排在第 position 位（从 1 开始）的任务预计等待秒数"""
+        if position <= 0:
+            return 0.0
+        idle = self.max_workers - len(self._running)
+        if position <= idle:
+            return 0.0
+        return math.ceil((position - idle) / self.max_workers) * self.avg_duration
+
+    def check_admission(self) -> None:
+        """队列已满时抛出 QueueFullError，供提交前的快速检查使用"""
+        with self._cond:
+            if len(self._heap) >= self.max_queue:
+                raise QueueFullError(self.estimated_wait(len(self._heap) + 1))
+
+    def submit(self, job_id: str, fn: Callable[[], None], priority: int = None,
+               on_position: Optional[Callable[[int, float], None]] = None) -> Tuple[int, float]:
+        """提交任务，返回 (排队位置, 预计等待秒数)；队列已满时抛出 QueueFullError"""
+        if priority is None:
+            priority = JOB_PRIORITIES['normal']
+        with self._cond:
+            if len(self._heap) >= self.max_queue:
+                raise QueueFullError(self.estimated_wait(len(self._heap) + 1))
+            job = Job(job_id, fn, priority, next(self._seq), on_position)
+            heapq.heappush(self._heap, job)
+            self._ensure_workers()
+            changed = self._reposition()
+            position = job.position
+            wait = self.estimated_wait(position)
+            self._cond.notify()
+        self._notify(changed)
+        return position, wait
+
+    def cancel(self, job_id: str) -> bool:
+        """从队列中移除尚未开始的任务，返回是否移除"""
+        with self._cond:
+            for i, job in enumerate(self._heap):
+                if job.job_id == job_id:
+                    self._heap[i] = self._heap[-1]
+                    self._heap.pop()
+                    heapq.heapify(self._heap)
+                    changed = self._reposition()
+                    break
+            else:
+                return False
+        self._notify(changed)
+        return True
+
+    def position(self, job_id: str) -> int:
+        """排队位置（从 1 开始）；正在执行或不在队列中返回 0"""
+        with self._cond:
+            for job in self._heap:
+                if job.job_id == job_id:
+                    return job.position
+        return 0
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'workers': self.max_workers,
+                'running': len(self._running),
+                'queued': len(self._heap),
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'avg_duration': round(self.avg_duration, 1),
+            }
+
+    def _reposition(self) -> List[Tuple[Job, int, float]]:
+        """重新计算排队位置，返回位置发生变化的任务（需持有锁）"""
+        changed = []
+        for position, job in enumerate(sorted(self._heap), start=1):
+            if job.position != position:
+                job.position = position
+                wait = self.estimated_wait(position)
+                # 有空闲线程、马上就会执行的任务不通知
+                if job.on_position is not None and wait > 0:
+                    changed.append((job, position, wait))
+        return changed
+
+    def _notify(self, changed: List[Tuple[Job, int, float]]) -> None:
+        # 在锁外回调，回调中可能写任务存储
+        for job, position, wait in changed:
+            try:
+                job.on_position(position, wait)
+            except Exception as e:
+                logger.warning(f"任务 {job.job_id} 排队位置通知失败: {e}")
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                job = heapq.heappop(self._heap)
+                job.position = 0
+                self._running[job.job_id] = time.monotonic()
+                changed = self._reposition()
+            self._notify(changed)
+
+            try:
+                job.fn()
+            except Exception as e:
+                logger.error(f"任务 {job.job_id} 执行异常: {e}")
+            finally:
+                with self._cond:
+                    duration = time.monotonic() - self._running.pop(job.job_id)
+                    self.avg_duration += DURATION_SMOOTHING * (duration - self.avg_duration)
+                    self.completed += 1
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务与历史记录的生命周期管理
+后台线程定期清理：删除结束超过 task_ttl 的任务（连同事件和页面结果），
+历史记录超过上限时淘汰最久未使用的记录，并清理过期的可达性缓存。
+每次清理后记录保留数量，供 /health 查看清理是否生效。
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .config import LIFECYCLE
+from .task_store import TaskStore
+
+logger = logging.getLogger(__name__)
+
+
+class LifecycleManager:
+    """定期清理任务存储；on_evict 在任务被删除后调用，用于清理与任务相关的其他数据"""
+
+    def __init__(self, store: TaskStore, on_evict: Optional[Callable[[str], None]] = None,
+                 prune: Optional[List[Callable[[], int]]] = None, task_ttl: float = None,
+                 max_history: int = None, interval: float = None):
+        self.store = store
+        self.on_evict = on_evict
+        self.prune = prune or []
+        self.task_ttl = LIFECYCLE['task_ttl'] if task_ttl is None else task_ttl
+        self.max_history = LIFECYCLE['max_history'] if max_history is None else max_history
+        self.interval = interval or LIFECYCLE['interval']
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics: Dict = {
+            'sweeps': 0,
+            'evicted_tasks': 0,
+            'evicted_history': 0,
+            'last_sweep': None,
+            'last_duration': None,
+            'retained': None,
+        }
+
+    def start(self) -> None:
+        """启动后台清理线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='lifecycle-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"清理任务存储失败: {e}")
+
+    def sweep(self, now: float = None) -> Dict:
+        """执行一次清理，返回本次删除的数量"""
+        start = time.time()
+        now = now or start
+        evicted = self.store.evict_tasks(now - self.task_ttl)
+        if self.on_evict:
+            for task_id in evicted:
+                try:
+                    self.on_evict(task_id)
+                except Exception as e:
+                    logger.warning(f"清理任务 {task_id} 的数据失败: {e}")
+        trimmed = self.store.trim_history(self.max_history)
+        pruned = sum(prune() for prune in self.prune)
+        retained = self.store.stats()
+
+        with self._lock:
+            self._metrics['sweeps'] += 1
+            self._metrics['evicted_tasks'] += len(evicted)
+            self._metrics['evicted_history'] += trimmed
+            self._metrics['last_sweep'] = start
+            self._metrics['last_duration'] = round(time.time() - start, 3)
+            self._metrics['retained'] = retained
+        if evicted or trimmed:
+            logger.info(f"清理完成: 删除 {len(evicted)} 个已结束任务，淘汰 {trimmed} 条历史记录")
+        return {'evicted_tasks': len(evicted), 'evicted_history': trimmed, 'pruned': pruned}
+
+    def metrics(self) -> Dict:
+        """累计清理数量和最近一次清理后保留的任务/事件/历史数"""
+        with self._lock:
+            return dict(self._metrics, task_ttl=self.task_ttl, max_history=self.max_history)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出文件保留策略
+每次爬取都会在 OUTPUT_DIR 中生成带时间戳的 DOCX（批次为 ZIP），文件只增不减。
+清理规则（任一规则为 0 表示不启用）：
+1. 同一主机只保留最新的 keep_latest 个文件；
+2. 删除超过 max_age 秒的文件；
+3. 总大小超过 max_bytes 时从最旧的文件开始删除。
+刚生成不久（min_age 秒内）的文件不删除，避免删掉任务刚写完、尚未登记到历史记录的文件。
+删除文件后同步清理指向它的历史记录。
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, NamedTuple
+
+from .config import OUTPUT_DIR, OUTPUT_RETENTION
+from .task_store import TaskStore, STATUS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+# {主机}_{YYYYmmdd_HHMMSS}[_{任务id后4位}].docx，批次为 batch_{批次id}.zip
+OUTPUT_NAME_PATTERN = re.compile(r'^(?P<host>.+?)_\d{8}_\d{6}(?:_[0-9a-zA-Z]+)?\.docx$')
+MANAGED_EXTENSIONS = ('.docx', '.zip')
+
+
+class OutputFile(NamedTuple):
+    name: str
+    group: str  # 按主机分组；批次归为 batch；无法识别的文件自成一组
+    size: int
+    mtime: float
+
+
+def file_group(name: str) -> str:
+    if name.startswith('batch_') and name.endswith('.zip'):
+        return 'batch'
+    match = OUTPUT_NAME_PATTERN.match(name)
+    return match.group('host') if match else name
+
+
+def scan_outputs(output_dir: str) -> List[OutputFile]:
+    """列出输出目录中由本服务生成的文件，按修改时间从新到旧排序"""
+    files = []
+    try:
+        entries = list(os.scandir(output_dir))
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        if not entry.is_file() or not entry.name.endswith(MANAGED_EXTENSIONS):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append(OutputFile(entry.name, file_group(entry.name), stat.st_size, stat.st_mtime))
+    files.sort(key=lambda f: f.mtime, reverse=True)
+    return files
+
+
+def plan_deletions(files: List[OutputFile], now: float, max_age: float = 0, max_bytes: int = 0,
+                   keep_latest: int = 0, min_age: float = 0) -> List[OutputFile]:
+    """按保留规则选出要删除的文件（files 需按修改时间从新到旧排序）"""
+    doomed: Dict[str, OutputFile] = {}
+    per_group: Dict[str, int] = {}
+    for f in files:
+        per_group[f.group] = per_group.get(f.group, 0) + 1
+        if now - f.mtime < min_age:
+            continue
+        if keep_latest and per_group[f.group] > keep_latest:
+            doomed[f.name] = f
+        elif max_age and now - f.mtime > max_age:
+            doomed[f.name] = f
+
+    if max_bytes:
+        total = sum(f.size for f in files if f.name not in doomed)
+        for f in reversed(files):
+            if total <= max_bytes:
+                break
+            if f.name in doomed or now - f.mtime < min_age:
+                continue
+            doomed[f.name] = f
+            total -= f.size
+    return list(doomed.values())
+
+
+class OutputRetention:
+    """按保留策略清理输出目录，并清理指向已删除文件的历史记录"""
+
+    def __init__(self, store: TaskStore, output_dir: str = None, max_age: float = None,
+                 max_bytes: int = None, keep_latest: int = None, min_age: float = None):
+        self.store = store
+        self.output_dir = output_dir or OUTPUT_DIR
+        self.max_age = OUTPUT_RETENTION['max_age'] if max_age is None else max_age
+        self.max_bytes = OUTPUT_RETENTION['max_bytes'] if max_bytes is None else max_bytes
+        self.keep_latest = OUTPUT_RETENTION['keep_latest'] if keep_latest is None else keep_latest
+        self.min_age = OUTPUT_RETENTION['min_age'] if min_age is None else min_age
+        self._lock = threading.Lock()
+        self._metrics: Dict = {'deleted_files': 0, 'deleted_bytes': 0, 'purged_history': 0}
+
+    def sweep(self, now: float = None) -> int:
+        """执行一次清理，返回删除的文件数"""
+        now = now or time.time()
+        files = scan_outputs(self.output_dir)
+        doomed = plan_deletions(files, now, self.max_age, self.max_bytes, self.keep_latest, self.min_age)
+
+        deleted = []
+        for f in doomed:
+            try:
+                os.remove(os.path.join(self.output_dir, f.name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除输出文件失败 {f.name}: {e}")
+                continue
+            deleted.append(f)
+        deleted_names = {f.name for f in deleted}
+        purged = self._purge_history(deleted_names) if deleted else 0
+
+        with self._lock:
+            self._metrics['deleted_files'] += len(deleted)
+            self._metrics['deleted_bytes'] += sum(f.size for f in deleted)
+            self._metrics['purged_history'] += purged
+        if deleted:
+            usage = self._usage([f for f in files if f.name not in deleted_names])
+            logger.info(f"清理输出文件 {len(deleted)} 个（{sum(f.size for f in deleted) / 1024 / 1024:.1f} MB），"
+                        f"清理历史记录 {purged} 条；当前占用 {usage['bytes'] / 1024 / 1024:.1f} MB")
+        return len(deleted)
+
+    def _purge_history(self, names: set) -> int:
+        """删除指向已删除文件的历史记录；记录所属任务仍在运行时只清空结果文件"""
+        purged = 0
+        for url_hash, record in self.store.list_history().items():
+            files = record.get('files') or {}
+            if not any(os.path.basename(path) in names for path in files.values()):
+                continue
+            owner = record.get('task_id')
+            task = self.store.get_task(owner) if owner else None
+            if task is not None and task['status'] == STATUS_RUNNING:
+                self.store.update_history(url_hash, files={})
+            else:
+                self.store.delete_history(url_hash)
+            purged += 1
+        return purged
+
+    def _usage(self, files: List[OutputFile]) -> Dict:
+        usage = {'files': len(files), 'bytes': sum(f.size for f in files)}
+        try:
+            disk = shutil.disk_usage(self.output_dir)
+            usage.update(disk_total=disk.total, disk_free=disk.free)
+        except OSError:
+            pass
+        return usage
+
+    def metrics(self) -> Dict:
+        """累计删除数量和当前的磁盘占用（查询时扫描输出目录，不依赖是否已执行过清理）"""
+        usage = self._usage(scan_outputs(self.output_dir))
+        with self._lock:
+            return dict(self._metrics, usage=usage, max_age=self.max_age, max_bytes=self.max_bytes,
+                        keep_latest=self.keep_latest)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面结果记录
+手机号、联系人以元组保存（与去重集合共用同一批字符串对象），导出或序列化时才拼接成字符串。
+以只读映射的形式提供与原 page_info 字典相同的键，导出代码和 JSON 结果格式不变。
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence
+
+SEPARATOR = '; '
+
+
+class PageResult(Mapping):
+    """一页的提取结果：url、title、phone_numbers、contacts、phone_count、contact_count，
+    以及可选的 original_phones、original_contacts（保存原始数据时）和 records（关联记录）"""
+
+    __slots__ = ('url', 'title', 'phones', 'contact_list', 'original_phone_list', 'original_contact_list', 'records')
+
+    def __init__(self, url: str, title: str, phones: Sequence[str], contacts: Sequence[str],
+                 original_phones: Optional[Sequence[str]] = None,
+                 original_contacts: Optional[Sequence[str]] = None,
+                 records: Optional[List[Dict]] = None):
+        self.url = url
+        self.title = title
+        self.phones = tuple(phones)
+        self.contact_list = tuple(contacts)
+        self.original_phone_list = self._share(original_phones, self.phones)
+        self.original_contact_list = self._share(original_contacts, self.contact_list)
+        self.records = records
+
+    @staticmethod
+    def _share(original: Optional[Sequence[str]], unique: tuple) -> Optional[tuple]:
+        """原始数据与去重后相同时（页面没有重复项）共用同一个元组"""
+        if original is None:
+            return None
+        original = tuple(original)
+        return unique if original == unique else original
+
+    def _keys(self) -> List[str]:
+        keys = ['url', 'title', 'phone_numbers', 'contacts', 'phone_count', 'contact_count']
+        if self.original_phone_list is not None:
+            keys += ['original_phones', 'original_contacts']
+        if self.records is not None:
+            keys.append('records')
+        return keys
+
+    def __getitem__(self, key: str):
+        if key == 'url':
+            return self.url
+        if key == 'title':
+            return self.title
+        if key == 'phone_numbers':
+            return SEPARATOR.join(self.phones)
+        if key == 'contacts':
+            return SEPARATOR.join(self.contact_list)
+        if key == 'phone_count':
+            return len(self.phones)
+        if key == 'contact_count':
+            return len(self.contact_list)
+        if key == 'original_phones' and self.original_phone_list is not None:
+            return SEPARATOR.join(self.original_phone_list)
+        if key == 'original_contacts' and self.original_contact_list is not None:
+            return SEPARATOR.join(self.original_contact_list)
+        if key == 'records' and self.records is not None:
+            return self.records
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f'PageResult({self.url!r}, phones={len(self.phones)}, contacts={len(self.contact_list)})'
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多站点并行爬取（命令行离线批量任务）
+网址放入共享队列，多个进程各启动若干线程领取网址并爬取，
+每个站点完成后把结果发回主进程，由主进程逐行写出 JSONL。
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .config import PARALLEL_CRAWL
+from .phone_scraper import PhoneScraper
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_STOP = None
+
+
+def plan_workers(max_workers: int = None, processes: int = None,
+                 threads_per_process: int = None, total_urls: int = None) -> Tuple[int, int]:
+    """计算 (进程数, 每进程线程数)，保证两者之积不超过 max_workers 和网址数"""
+    max_workers = max(1, max_workers or PARALLEL_CRAWL['max_workers'])
+    if total_urls is not None:
+        max_workers = max(1, min(max_workers, total_urls))
+    threads = max(1, threads_per_process or PARALLEL_CRAWL['threads_per_process'])
+    threads = min(threads, max_workers)
+    processes = max(1, processes or PARALLEL_CRAWL['processes'])
+    processes = min(processes, math.ceil(max_workers / threads))
+    threads = min(threads, max_workers // processes)
+    return processes, threads
+
+
+def crawl_site(url: str, max_pages: int = None, associate: bool = False,
+               output_dir: Optional[str] = None, compact_dedup: bool = None) -> Dict:
+    """爬取单个站点，返回可序列化为 JSON 的结果"""
+    start = time.time()
+    result = {'url': url, 'status': 'completed'}
+    try:
+        scraper = PhoneScraper(url, associate_contacts=associate or None, compact_dedup=compact_dedup)
+        scraper.crawl_website(max_pages=max_pages)
+        result.update({
+            'site_title': scraper.site_title,
+            'pages': len(scraper.visited_urls),
+            'phone_count': len(scraper.seen_phones),
+            'contact_count': len(scraper.seen_contacts),
+            'results': [dict(record) for record in scraper.sink],
+        })
+        if output_dir and scraper.phone_contacts:
+            safe_host = re.sub(r'[^a-zA-Z0-9_.-]', '_', urlparse(url).netloc or 'site')
+            docx_path = os.path.join(output_dir, f"{safe_host}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:4]}.docx")
+            scraper.export_to_docx(docx_path)
+            result['docx'] = docx_path
+    except Exception as e:
+        logger.error(f"站点 {url} 爬取失败: {e}")
+        result.update({'status': 'failed', 'error': str(e)})
+    result['elapsed'] = round(time.time() - start, 2)
+    return result
+
+
+def _worker_process(task_queue, result_queue, threads: int, options: Dict) -> None:
+    """工作进程：启动 threads 个线程，从任务队列领取网址直到遇到结束标记"""
+    def worker():
+        while True:
+            url = task_queue.get()
+            if url is _STOP:
+                return
+            result_queue.put(crawl_site(url, **options))
+
+    pool = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+def iter_parallel_crawl(urls: List[str], max_workers: int = None, processes: int = None,
+                        threads_per_process: int = None, max_pages: int = None,
+                        associate: bool = False, output_dir: Optional[str] = None,
+                        compact_dedup: bool = None) -> Iterator[Dict]:
+    """并行爬取多个站点，按完成顺序逐个产出结果"""
+    if not urls:
+        return
+    processes, threads = plan_workers(max_workers, processes, threads_per_process, len(urls))
+    logger.info(f"并行爬取 {len(urls)} 个站点: {processes} 个进程 x {threads} 个线程")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    task_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    for url in urls:
+        task_queue.put(url)
+    for _ in range(processes * threads):
+        task_queue.put(_STOP)
+
+    options = {'max_pages': max_pages, 'associate': associate, 'output_dir': output_dir,
+               'compact_dedup': compact_dedup}
+    workers = [
+        multiprocessing.Process(target=_worker_process, args=(task_queue, result_queue, threads, options), daemon=True)
+        for _ in range(processes)
+    ]
+    for p in workers:
+        p.start()
+
+    received = 0
+    try:
+        while received < len(urls):
+            try:
+                result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in workers):
+                    logger.error(f"工作进程已全部退出，{len(urls) - received} 个站点没有结果")
+                    break
+                continue
+            received += 1
+            yield result
+    finally:
+        # 提前结束（调用方中断或进程异常）时终止剩余的工作进程
+        for p in workers:
+            if received < len(urls) and p.is_alive():
+                p.terminate()
+            p.join()
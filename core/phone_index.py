@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨任务手机号索引
+记录每个手机号出现在哪些站点、哪些页面，以及首次/最近一次被爬到的时间。
+爬取过程中由 PhoneIndexWriter 按页面批量写入，Web 任务、命令行和并行爬取共用同一路径；
+按号码查询出处、按时间列出新出现的号码。
+使用 SQLite（WAL 模式），所有 worker 进程共享。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .association import normalize_phone
+from .config import PHONE_INDEX
+from .sqlite_local import ThreadLocalSQLite
+
+logger = logging.getLogger(__name__)
+
+
+class PhoneIndex(ThreadLocalSQLite):
+    """手机号 -> (站点, 页面, 首次出现, 最近出现)"""
+
+    def __init__(self, path: str = None):
+        self._open_sqlite(path or PHONE_INDEX['path'])
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        self._conn().executescript('''
+            CREATE TABLE IF NOT EXISTS phones (
+                phone TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_phones_first_seen ON phones (first_seen);
+            CREATE TABLE IF NOT EXISTS phone_sightings (
+                phone TEXT NOT NULL,
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (phone, site, url)
+            );
+        ''')
+
+    def upsert_pages(self, site: str, pages: Iterable[Tuple[str, Sequence[str]]], seen_at: float = None) -> int:
+        """把一批 (页面网址, 页面中的手机号) 写入索引（一个事务），返回写入的 (号码, 页面) 条数"""
+        seen_at = seen_at or time.time()
+        rows = []
+        for url, phones in pages:
+            for phone in sorted({normalize_phone(p) for p in phones} - {''}):
+                rows.append((phone, site, url, seen_at, seen_at))
+        if not rows:
+            return 0
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany('''
+                INSERT INTO phone_sightings (phone, site, url, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (phone, site, url) DO UPDATE SET
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen)
+            ''', rows)
+            conn.executemany('''
+                INSERT INTO phones (phone, first_seen, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT (phone) DO UPDATE SET
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen)
+            ''', list({row[0]: (row[0], seen_at, seen_at) for row in rows}.values()))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(rows)
+
+    def lookup(self, phone: str) -> List[Dict]:
+        """返回某号码的全部出处，最近出现的在前"""
+        cursor = self._conn().execute(
+            'SELECT site, url, first_seen, last_seen FROM phone_sightings WHERE phone = ? '
+            'ORDER BY last_seen DESC, site, url',
+            (normalize_phone(phone),)
+        )
+        return [
+            {'site': site, 'url': url, 'first_seen': first_seen, 'last_seen': last_seen}
+            for site, url, first_seen, last_seen in cursor
+        ]
+
+    def new_since(self, since: float, limit: int = None, cursor: Optional[str] = None) -> List[Dict]:
+        """列出首次出现时间不早于 since 的号码，按首次出现时间升序；cursor 为上一页最后一个号码"""
+        limit = min(limit or PHONE_INDEX['page_size'], PHONE_INDEX['max_page_size'])
+        sql = '''
+            SELECT p.phone, p.first_seen, p.last_seen, COUNT(DISTINCT s.site)
+            FROM phones p JOIN phone_sightings s ON s.phone = p.phone
+            WHERE p.first_seen >= ?
+        '''
+        params: list = [since]
+        if cursor:
+            # 游标为 (首次出现时间, 号码)，同一时间写入的号码按号码排序
+            sql += ' AND (p.first_seen, p.phone) > (SELECT first_seen, phone FROM phones WHERE phone = ?)'
+            params.append(normalize_phone(cursor))
+        sql += ' GROUP BY p.phone ORDER BY p.first_seen, p.phone LIMIT ?'
+        params.append(limit)
+        return [
+            {'phone': phone, 'first_seen': first_seen, 'last_seen': last_seen, 'site_count': site_count}
+            for phone, first_seen, last_seen, site_count in self._conn().execute(sql, params)
+        ]
+
+    def count(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM phones').fetchone()[0]
+
+
+class PhoneIndexWriter:
+    """爬取过程中按批把每页的手机号写入索引。
+    写入的是页面上提取到的全部号码，不受本次爬取去重和 save_original_data 影响，
+    同一号码出现在多个页面时每个出处都会被记录。写入失败只记录警告，不影响爬取。"""
+
+    def __init__(self, index: PhoneIndex, site: str, batch_size: int = None):
+        self.index = index
+        self.site = site
+        self.batch_size = max(1, batch_size or PHONE_INDEX['batch_size'])
+        self._pending: List[Tuple[str, Sequence[str]]] = []
+
+    def add(self, url: str, phones: Sequence[str]) -> None:
+        if not phones:
+            return
+        self._pending.append((url, phones))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            self.index.upsert_pages(self.site, batch)
+        except Exception as e:
+            logger.warning(f"写入手机号索引失败: {e}")
+
+
+_phone_index: Optional[PhoneIndex] = None
+_phone_index_lock = threading.Lock()
+
+
+def get_phone_index() -> PhoneIndex:
+    """进程内共享的手机号索引实例"""
+    global _phone_index
+    with _phone_index_lock:
+        if _phone_index is None:
+            _phone_index = PhoneIndex()
+        return _phone_index
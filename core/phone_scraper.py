@@ -13,11 +13,31 @@ import time
 import urllib.parse
 from urllib.parse import urljoin, urlparse
 import logging
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 import json
 from docx import Document
 from docx.shared import Inches
 import os
+from collections import deque
+
+from .association import extract_contact_records, iter_text_blocks
+from .table_extractor import extract_table_records
+from .extraction_cache import ExtractionCache, content_key, get_extraction_cache
+from .template_detector import TemplateLearner
+from .simhash import SimHashIndex, simhash
+from .cancellation import CancellationToken
+from .result_sink import ResultSink, MemorySink
+from .phone_index import PhoneIndex, PhoneIndexWriter, get_phone_index
+from .compact_set import HashSet64, PhoneSet, hash64
+from .page_result import PageResult
+from .docx_stream import write_results_docx
+from .config import (
+    CONTACT_ASSOCIATION, TABLE_EXTRACTION, TEMPLATE_DETECTION, NEAR_DUPLICATE, COMPACT_DEDUP, DATA_CLEANING,
+    DOCX_EXPORT, PHONE_INDEX, EXTRACTION_CACHE
+)
+
+# 以冒号结尾的标签块（值写在下一块中）
+LABEL_END_PATTERN = re.compile(r'[：:]\s*$')
 
 # 配置日志
 logging.basicConfig(
@@ -31,21 +51,64 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class PhoneScraper:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, associate_contacts: bool = None, compact_dedup: bool = None,
+                 phone_index: PhoneIndex = None):
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
-        self.visited_urls: Set[str] = set()
-        self.phone_contacts: List[Dict[str, str]] = []
+        # 紧凑去重：只保存 64 位键，大规模爬取时显著降低内存占用
+        if compact_dedup is None:
+            compact_dedup = COMPACT_DEDUP['enabled']
+        self.compact_dedup = compact_dedup
+        self.visited_urls: Set[str] = self._new_set()
+        # 页面结果写入端：每记录一页结果立即写入，导出时从中读回
+        self.sink: ResultSink = MemorySink()
         # 用于跟踪已出现的手机号和联系人，确保不重复
-        self.seen_phones: Set[str] = set()
-        self.seen_contacts: Set[str] = set()
+        self.seen_phones: Set[str] = PhoneSet(capacity=COMPACT_DEDUP['initial_capacity']) if compact_dedup else set()
+        self.seen_contacts: Set[str] = self._new_set()
         self.site_title = "未知网站"  # 网站标题
         # 可选的进度回调：接受 dict 参数
         self.progress_callback = None
+        # 关联模式：按就近距离把手机号与姓名/职务配对
+        if associate_contacts is None:
+            associate_contacts = CONTACT_ASSOCIATION['enabled']
+        self.associate_contacts = associate_contacts
+        # 按内容哈希缓存提取结果（进程内共享，跨页面和任务）；
+        # 紧凑模式使用本次爬取独享的较小缓存（磁盘层仍共用）
+        self.extraction_cache = get_extraction_cache()
+        if compact_dedup and self.extraction_cache is not None:
+            self.extraction_cache = ExtractionCache(
+                max_entries=COMPACT_DEDUP['extraction_cache_entries'],
+                disk_path=EXTRACTION_CACHE['disk_path'],
+            )
+        # 站点模板学习：前几页识别页眉/页脚等重复块，之后的页面跳过这些块
+        self.template_learner = TemplateLearner() if TEMPLATE_DETECTION['enabled'] else None
+        # 近似重复页面索引（SimHash）
+        # 紧凑模式下只保存网址的 64 位哈希
+        self.simhash_index = (SimHashIndex(NEAR_DUPLICATE['threshold'], compact=compact_dedup)
+                              if NEAR_DUPLICATE['enabled'] else None)
+        self.near_duplicate_pages = 0
+        # 跨任务手机号索引：未指定时按配置使用进程内共享的索引，爬取开始时创建写入器
+        self.phone_index = phone_index
+        self.phone_index_writer: Optional[PhoneIndexWriter] = None
+        # 取消标记：每次抓取前后检查，取消后尽快停止爬取
+        self.cancel_token = CancellationToken()
+        self.cancelled = False
+
+    def _new_set(self):
+        if self.compact_dedup:
+            return HashSet64(capacity=COMPACT_DEDUP['initial_capacity'])
+        return set()
+
+    @property
+    def phone_contacts(self) -> List[Dict]:
+        """全部页面结果（非内存 sink 时从存储中读回）"""
+        if isinstance(self.sink, MemorySink):
+            return self.sink.records
+        return list(self.sink)
 
     def _report(self, event_type: str, data: Dict = None) -> None:
         """向外部报告进度（如果已设置回调）。"""
@@ -210,19 +273,93 @@ class PhoneScraper:
         
         return links
     
-    def extract_page_info(self, url: str, soup: BeautifulSoup) -> None:
-        """提取页面中的手机号码和联系人信息"""
+    @staticmethod
+    def _extraction_units(blocks: List[str]) -> List[str]:
+        """以文本块为提取单位；以冒号结尾的标签块（如 <dt>联系人：</dt>）与下一块合并，
+        保持 "联系人：张三" 跨块书写时的提取结果"""
+        units = []
+        carry = ''
+        for block in blocks:
+            if carry:
+                block = f'{carry}\n{block}'
+            carry = block if LABEL_END_PATTERN.search(block) else ''
+            if not carry:
+                units.append(block)
+        if carry:
+            units.append(carry)
+        return units
+    
+    def _extract_page_content(self, blocks: List[str]) -> Dict[str, List[str]]:
+        """按块提取手机号和联系人，块结果按内容哈希缓存：
+        每页重复的页眉/页脚、相同内容的页面只需提取一次"""
+        phones: Dict[str, None] = {}
+        contacts: Dict[str, None] = {}
+        for unit in self._extraction_units(blocks):
+            def compute():
+                return {
+                    'phones': self.extract_phone_numbers(unit),
+                    'contacts': self.extract_contacts(unit),
+                }
+            if self.extraction_cache is None:
+                extracted = compute()
+            else:
+                extracted = self.extraction_cache.get_or_compute(content_key('text', unit), compute)
+            phones.update(dict.fromkeys(extracted['phones']))
+            contacts.update(dict.fromkeys(extracted['contacts']))
+        return {'phones': list(phones), 'contacts': list(contacts)}
+    
+    def _check_near_duplicate(self, url: str, soup: BeautifulSoup):
+        """检查页面主体内容是否与已爬页面近似重复，是则返回原页面URL，否则收录并返回 None"""
+        if self.simhash_index is None:
+            return None
+        fingerprint = simhash(soup.get_text(' '))
+        duplicate_of = self.simhash_index.query(fingerprint)
+        if duplicate_of is not None:
+            if self.simhash_index.compact:
+                # 紧凑模式只保存网址哈希，以哈希值标识原页面
+                duplicate_of = f'#{duplicate_of:016x}'
+            self.near_duplicate_pages += 1
+            logger.info(f"页面 {url} 与 {duplicate_of} 近似重复")
+            return duplicate_of
+        self.simhash_index.add(fingerprint, hash64(url) if self.simhash_index.compact else url)
+        return None
+    
+    def extract_page_info(self, url: str, soup: BeautifulSoup):
+        """提取页面中的手机号码和联系人信息
+        启用模板识别时，学习完成后会从 soup 中移除站点模板块，需在查找链接之后调用。
+        返回近似重复的原页面 URL（不重复或未启用时为 None）。近似重复只影响外链调度，
+        页面照常提取：只差联系方式的页面指纹也很接近，跳过会漏掉号码。
+        """
         if not soup:
-            return
-            
-        # 获取页面文本内容
-        text_content = soup.get_text()
+            return None
         
-        # 提取手机号码
-        phones = self.extract_phone_numbers(text_content)
+        if self.template_learner is not None:
+            self.template_learner.process(soup)
         
-        # 提取联系人
-        contacts = self.extract_contacts(text_content)
+        # 指纹只取去掉模板块后的主体内容
+        duplicate_of = self._check_near_duplicate(url, soup)
+            
+        # 先按列提取名录表格，已提取的单元格从 soup 中移除，展平文本不再重复提取
+        table_records = []
+        if TABLE_EXTRACTION['enabled']:
+            table_records = extract_table_records(soup, remove_handled=True)
+        
+        # 按块提取手机号码和联系人（重复出现的块直接复用缓存结果）
+        blocks = iter_text_blocks(soup)
+        extracted = self._extract_page_content(blocks)
+        phones = list(extracted['phones'])
+        contacts = list(extracted['contacts'])
+        
+        # 表格中的姓名直接作为联系人
+        for record in table_records:
+            if record['name'] and record['name'] not in contacts:
+                contacts.append(record['name'])
+            if record['phone'] and record['phone'] not in phones:
+                phones.append(record['phone'])
+        
+        # 索引记录号码在本页的出处，按去重前的号码写入
+        if self.phone_index_writer is not None:
+            self.phone_index_writer.add(url, phones)
         
         # 去重处理：只保留首次出现的手机号和联系人
         unique_phones = []
@@ -243,17 +380,31 @@ class PhoneScraper:
         
         # 记录找到的信息
         if unique_phones or unique_contacts:
-            page_info = {
-                'url': url,
-                'title': page_title,
-                'phone_numbers': '; '.join(unique_phones),
-                'contacts': '; '.join(unique_contacts),
-                'phone_count': len(unique_phones),
-                'contact_count': len(unique_contacts),
-                'original_phones': '; '.join(phones),  # 保留原始数据用于对比
-                'original_contacts': '; '.join(contacts)
-            }
-            self.phone_contacts.append(page_info)
+            records = None
+            if self.associate_contacts or table_records:
+                # 表格记录优先，其余手机号再按就近距离关联；只保留本页新增手机号
+                new_phones = set(unique_phones)
+                records = []
+                candidates = table_records
+                if self.associate_contacts:
+                    candidates = candidates + extract_contact_records(soup, cache=self.extraction_cache, blocks=blocks)
+                for record in candidates:
+                    if record['phone'] in new_phones:
+                        new_phones.discard(record['phone'])
+                        records.append(record)
+            # 号码和联系人以元组保存，导出时才拼接
+            save_original = DATA_CLEANING['save_original_data']
+            page_info = PageResult(
+                url, page_title, unique_phones, unique_contacts,
+                original_phones=phones if save_original else None,  # 保留原始数据用于对比
+                original_contacts=contacts if save_original else None,
+                records=records
+            )
+            try:
+                self.sink.write(page_info)
+            except Exception as e:
+                # 写入失败不影响主流程
+                logger.warning(f"写入页面结果失败 {url}: {e}")
             logger.info(f"页面 {url} 找到 {len(unique_phones)} 个新手机号, {len(unique_contacts)} 个新联系人")
             
             # 如果有重复数据，记录去重信息
@@ -261,14 +412,29 @@ class PhoneScraper:
             duplicate_contacts = len(contacts) - len(unique_contacts)
             if duplicate_phones > 0 or duplicate_contacts > 0:
                 logger.info(f"去重: {duplicate_phones} 个重复手机号, {duplicate_contacts} 个重复联系人")
+        return duplicate_of
     
     def crawl_website(self, max_pages: int = None) -> None:
         """爬取网站。
         当 max_pages 为 None 时按安全上限爬取；否则最多爬取 max_pages 页。
         """
-        urls_to_visit = [self.base_url]
+        urls_to_visit = deque([self.base_url])
+        # 近似重复页面的外链延后爬取，主队列为空时再处理
+        deferred_urls = deque()
+        # 已加入过队列的网址（含已访问），每个网址只入队一次
+        enqueued_urls = self._new_set()
+        enqueued_urls.add(self.base_url)
         page_count = 0
         
+        # 提取的同时更新跨任务手机号索引（Web 任务、命令行和并行爬取共用）
+        if self.phone_index is None and PHONE_INDEX['enabled']:
+            try:
+                self.phone_index = get_phone_index()
+            except Exception as e:
+                logger.warning(f"手机号索引不可用: {e}")
+        if self.phone_index is not None:
+            self.phone_index_writer = PhoneIndexWriter(self.phone_index, self.domain)
+        
         logger.info(f"开始爬取网站: {self.base_url}")
         if max_pages is not None:
             try:
@@ -300,8 +466,12 @@ class PhoneScraper:
         # 安全机制：最大爬取10000页，避免无限爬取
         safety_limit = 10000
         
-        while urls_to_visit:
-            current_url = urls_to_visit.pop(0)
+        while urls_to_visit or deferred_urls:
+            if self.cancel_token.cancelled:
+                self.cancelled = True
+                logger.info(f"爬取已取消，已爬取 {page_count} 页")
+                break
+            current_url = urls_to_visit.popleft() if urls_to_visit else deferred_urls.popleft()
             
             if current_url in self.visited_urls:
                 continue
@@ -323,29 +493,46 @@ class PhoneScraper:
             content, soup = self.get_page_content(current_url)
             if not soup:
                 continue
+            # 抓取期间被取消：丢弃本页，不再解析
+            if self.cancel_token.cancelled:
+                continue
             
             # 标记为已访问
             self.visited_urls.add(current_url)
             page_count += 1
             
-            # 提取页面信息
+            # 先查找链接（提取时可能移除页眉/导航等模板块）
+            new_links = self.find_all_links(soup, current_url)
+            
+            # 提取页面信息（同时识别近似重复页面）
             before_phones = len(self.seen_phones)
             before_contacts = len(self.seen_contacts)
-            self.extract_page_info(current_url, soup)
+            duplicate_of = None
+            try:
+                duplicate_of = self.extract_page_info(current_url, soup)
+            except Exception as e:
+                # 单页提取失败（如结构异常的页面）不中断整次爬取
+                logger.error(f"提取页面信息失败 {current_url}: {e}")
             delta_phones = len(self.seen_phones) - before_phones
             delta_contacts = len(self.seen_contacts) - before_contacts
-            self._report('page_result', {
+            page_result = {
                 'index': page_count,
                 'url': current_url,
                 'new_phones': max(0, delta_phones),
                 'new_contacts': max(0, delta_contacts)
-            })
+            }
+            if duplicate_of is not None:
+                page_result['duplicate_of'] = duplicate_of
+            self._report('page_result', page_result)
             
-            # 查找新链接
-            new_links = self.find_all_links(soup, current_url)
+            # 加入新链接
+            target_queue = urls_to_visit
+            if duplicate_of is not None and NEAR_DUPLICATE['deprioritize_links']:
+                target_queue = deferred_urls
             for link in new_links:
-                if link not in self.visited_urls and link not in urls_to_visit:
-                    urls_to_visit.append(link)
+                if link not in enqueued_urls:
+                    enqueued_urls.add(link)
+                    target_queue.append(link)
             
             # 显示进度信息
             if page_count % 10 == 0:
@@ -358,39 +545,57 @@ class PhoneScraper:
                     'contacts': len(self.seen_contacts)
                 })
             
-            # 避免请求过快
-            time.sleep(1)
+            # 避免请求过快（可被取消打断）
+            self.cancel_token.wait(1)
         
         logger.info(f"爬取完成，共爬取 {page_count} 页")
+        self.sink.flush()
+        if self.phone_index_writer is not None:
+            self.phone_index_writer.flush()
+        if self.extraction_cache is not None:
+            self.extraction_cache.flush()
+        if self.compact_dedup:
+            dedup_bytes = sum(s.nbytes for s in (self.visited_urls, self.seen_phones, self.seen_contacts, enqueued_urls))
+            logger.info(f"紧凑去重集合占用 {dedup_bytes / 1024:.0f} KB")
+        if self.near_duplicate_pages:
+            logger.info(f"近似重复页面: {self.near_duplicate_pages} 页（外链已延后爬取）")
         logger.info(f"总计 {len(self.seen_phones)} 个手机号，{len(self.seen_contacts)} 个联系人")
+        if self.template_learner is not None and self.template_learner.skipped_blocks:
+            logger.info(f"模板识别: {len(self.template_learner.templates)} 个模板块，共跳过 {self.template_learner.skipped_blocks} 次")
         self._report('done', {
             'pages': page_count,
             'phones': len(self.seen_phones),
-            'contacts': len(self.seen_contacts)
+            'contacts': len(self.seen_contacts),
+            'template_blocks_skipped': self.template_learner.skipped_blocks if self.template_learner else 0,
+            'near_duplicates': self.near_duplicate_pages,
+            'unique_pages': page_count - self.near_duplicate_pages,
+            'cancelled': self.cancelled
         })
     
     def export_to_csv(self, filename: str = 'phone_contacts.csv') -> None:
         """导出结果到CSV文件"""
-        if not self.phone_contacts:
+        if not self.sink:
             logger.warning("没有找到任何手机号码或联系人信息")
             return
             
         try:
+            total_pages = total_phones = total_contacts = 0
             with open(filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
                 fieldnames = ['url', 'title', 'phone_numbers', 'contacts', 'phone_count', 'contact_count']
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 
                 writer.writeheader()
-                for row in self.phone_contacts:
+                for row in self.sink:
                     safe_row = {key: row.get(key, '') for key in fieldnames}
                     writer.writerow(safe_row)
+                    # 统计总手机号和联系人数量
+                    total_pages += 1
+                    total_phones += row['phone_count']
+                    total_contacts += row['contact_count']
             
             logger.info(f"结果已导出到 {filename}")
-            logger.info(f"共找到 {len(self.phone_contacts)} 页包含联系信息")
+            logger.info(f"共找到 {total_pages} 页包含联系信息")
             
-            # 统计总手机号和联系人数量
-            total_phones = sum(row['phone_count'] for row in self.phone_contacts)
-            total_contacts = sum(row['contact_count'] for row in self.phone_contacts)
             logger.info(f"总计: {total_phones} 个手机号, {total_contacts} 个联系人")
             
         except Exception as e:
@@ -398,12 +603,17 @@ class PhoneScraper:
     
     def export_to_json(self, filename: str = 'phone_contacts.json') -> None:
         """导出结果到JSON文件"""
-        if not self.phone_contacts:
+        if not self.sink:
             return
             
         try:
+            # 逐条写出，不把全部结果读入内存
             with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump(self.phone_contacts, jsonfile, ensure_ascii=False, indent=2)
+                jsonfile.write('[')
+                for i, row in enumerate(self.sink):
+                    jsonfile.write(',\n  ' if i else '\n  ')
+                    jsonfile.write(json.dumps(dict(row), ensure_ascii=False, indent=2).replace('\n', '\n  '))
+                jsonfile.write('\n]')
             
             logger.info(f"结果已导出到 {filename}")
         except Exception as e:
@@ -411,9 +621,12 @@ class PhoneScraper:
     
     def export_to_docx(self, filename: str = 'phone_contacts.docx') -> None:
         """导出结果到Word文档"""
-        if not self.phone_contacts:
+        if not self.sink:
             logger.warning("没有找到任何手机号码或联系人信息")
             return
+        if DOCX_EXPORT['streaming']:
+            self._export_to_docx_streaming(filename)
+            return
             
         try:
             # 创建Word文档
@@ -425,7 +638,7 @@ class PhoneScraper:
             
             # 添加说明
             doc.add_paragraph(f"爬取时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            doc.add_paragraph(f"爬取页面数: {len(self.phone_contacts)}")
+            doc.add_paragraph(f"爬取页面数: {len(self.sink)}")
             doc.add_paragraph(f"总计手机号: {len(self.seen_phones)} 个")
             doc.add_paragraph(f"总计联系人: {len(self.seen_contacts)} 个")
             
@@ -433,7 +646,7 @@ class PhoneScraper:
             doc.add_paragraph("=" * 50)
             
             # 添加内容
-            for i, result in enumerate(self.phone_contacts, 1):
+            for i, result in enumerate(self.sink, 1):
                 # 页面标题
                 page_heading = doc.add_heading(f"{i}. {result['title']}", level=1)
                 
@@ -449,6 +662,15 @@ class PhoneScraper:
                     contact_para.add_run("联系人: ").bold = True
                     contact_para.add_run(result['contacts'])
                 
+                # 关联记录：姓名（职务）- 手机号
+                for record in result.get('records', []):
+                    if not record['name']:
+                        continue
+                    record_para = doc.add_paragraph()
+                    label = record['name'] + (f"（{record['title']}）" if record['title'] else '')
+                    record_para.add_run(f"{label}: ").bold = True
+                    record_para.add_run(record['phone'])
+                
                 # 页面URL（小字）
                 url_para = doc.add_paragraph()
                 url_run = url_para.add_run(f"来源: {result['url']}")
@@ -464,6 +686,20 @@ class PhoneScraper:
             
         except Exception as e:
             logger.error(f"导出Word文档失败: {e}")
+    
+    def _export_to_docx_streaming(self, filename: str) -> None:
+        """逐条读取结果并流式写出Word文档，内存占用与结果数量无关"""
+        try:
+            write_results_docx(
+                filename, self.site_title, self.sink,
+                crawled_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+                page_count=len(self.sink),
+                phone_count=len(self.seen_phones),
+                contact_count=len(self.seen_contacts)
+            )
+            logger.info(f"结果已导出到Word文档: {filename}")
+        except Exception as e:
+            logger.error(f"导出Word文档失败: {e}")
 
 def main():
     """主函数"""
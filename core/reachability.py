@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+链接可达性探测
+先发 HEAD 请求；HEAD 失败（部分站点不支持或处理错误）时用只取 1 字节的 Range GET 确认。
+连接级失败（DNS、连接、TLS、超时）说明整个主机不可用，按主机缓存；
+HTTP 状态码只说明该网址本身，按完整网址缓存，单个网址 404 不影响同一主机的其他网址。
+提交接口只查缓存，不在请求处理中等待网络。
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import REACHABILITY
+from .result_cache import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class ReachabilityProbe:
+    """缓存探测结果：(是否可达, 说明)。
+    默认每个线程使用各自的 requests.Session；传入 session 时所有线程共用，请求时加锁。
+    """
+
+    def __init__(self, session: requests.Session = None, timeout: float = None,
+                 ttl: float = None, failure_ttl: float = None):
+        self.session = session
+        self.timeout = timeout or REACHABILITY['timeout']
+        self.ttl = REACHABILITY['ttl'] if ttl is None else ttl
+        self.failure_ttl = REACHABILITY['failure_ttl'] if failure_ttl is None else failure_ttl
+        self._cache: Dict[str, Tuple[float, bool, str]] = {}
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        parts = urlsplit(url)
+        return f'host:{parts.scheme.lower()}://{parts.netloc.lower()}'
+
+    @staticmethod
+    def _url(url: str) -> str:
+        return f'url:{canonicalize_url(url)}'
+
+    def cached(self, url: str) -> Optional[Tuple[bool, str]]:
+        """仅查缓存，不发请求；没有有效缓存时返回 None"""
+        now = time.monotonic()
+        with self._lock:
+            for key in (self._host(url), self._url(url)):
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] >= now:
+                    return entry[1], entry[2]
+        return None
+
+    def check(self, url: str) -> Tuple[bool, str]:
+        """返回 (是否可达, 说明)，命中缓存时不发请求"""
+        cached = self.cached(url)
+        if cached is not None:
+            return cached
+        ok, reason, connection_error = self._probe(url)
+        expires = time.monotonic() + (self.ttl if ok else self.failure_ttl)
+        key = self._host(url) if connection_error else self._url(url)
+        with self._lock:
+            self._cache[key] = (expires, ok, reason)
+        return ok, reason
+
+    def prune(self) -> int:
+        """删除已过期的缓存项，返回删除条数"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._cache.items() if entry[0] < now]
+            for key in expired:
+                del self._cache[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if self.session is not None:
+            # requests.Session 不保证线程安全，共用时串行发送
+            with self._session_lock:
+                return getattr(self.session, method)(url, **kwargs)
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return getattr(session, method)(url, **kwargs)
+
+    def _probe(self, url: str) -> Tuple[bool, str, bool]:
+        """返回 (是否可达, 说明, 是否为连接级失败)"""
+        try:
+            response = self._request('head', url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code < 400:
+                return True, f'HTTP {response.status_code}', False
+            logger.info(f"HEAD {url} 返回 HTTP {response.status_code}，改用 Range GET 确认")
+        except requests.RequestException as e:
+            # 连接级错误，GET 同样不会成功
+            return False, f'链接校验失败: {e}', True
+
+        try:
+            response = self._request(
+                'get', url, headers={'Range': 'bytes=0-0'}, timeout=self.timeout, allow_redirects=True, stream=True
+            )
+            response.close()
+        except requests.RequestException as e:
+            return False, f'链接校验失败: {e}', True
+        if response.status_code < 400:
+            return True, f'HTTP {response.status_code}', False
+        return False, f'链接不可访问: HTTP {response.status_code}', False
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取结果缓存键与新鲜度
+结果按规范化网址 + 爬取参数（页数上限、提取模式）缓存；
+结果在 ttl 内为新鲜，之后 stale_ttl 内仍可先返回旧结果并在后台刷新，再之后视为过期。
+"""
+
+import hashlib
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .config import RESULT_CACHE, DEFAULT_MAX_PAGES, CONTACT_ASSOCIATION
+
+# 新鲜度
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """规范化网址：协议和域名小写、去掉默认端口和锚点、路径末尾斜杠统一、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def normalize_max_pages(value) -> int:
+    """解析页数上限，无效值使用默认页数"""
+    try:
+        max_pages = int(value)
+        if max_pages > 0:
+            return max_pages
+    except (TypeError, ValueError):
+        pass
+    return DEFAULT_MAX_PAGES
+
+
+def result_key(url: str, max_pages=None, mode: Optional[str] = None) -> str:
+    """结果缓存键：规范化网址 + 页数上限 + 提取模式"""
+    if mode is None:
+        mode = 'associate' if CONTACT_ASSOCIATION['enabled'] else 'default'
+    raw = f'{canonicalize_url(url)}|max_pages={normalize_max_pages(max_pages)}|mode={mode}'
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def freshness(record: Dict, now: float = None) -> str:
+    """按最近一次成功爬取的时间（completed_at）判断结果新鲜度。
+
+    不能用 timestamp：开始刷新时会改写它，过期结果会因此被当成新鲜结果。
+    没有 completed_at 的旧记录无法判断，按过期不久（STALE）处理：先返回旧结果并在后台刷新。
+    """
+    completed_at = record.get('completed_at')
+    if not completed_at:
+        return STALE
+    age = (now or time.time()) - completed_at
+    if age < RESULT_CACHE['ttl']:
+        return FRESH
+    if age < RESULT_CACHE['ttl'] + RESULT_CACHE['stale_ttl']:
+        return STALE
+    return EXPIRED
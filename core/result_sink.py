@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面结果写入端（sink）
+extract_page_info 每得到一页结果立即写入 sink，导出时再从 sink 逐条读回，
+爬取中途崩溃也能保留已写入的结果，内存中不再累积全部结果。
+落盘按批进行：累计 fsync_every 条或距上次落盘超过 fsync_interval 秒时写入并同步一次。
+"""
+
+import json
+import os
+import time
+from typing import Dict, Iterator, List
+
+from .config import RESULT_SINK
+from .result_store import ResultStore
+
+
+class ResultSink:
+    """结果写入端接口：write 追加一条记录，迭代时按写入顺序读回全部记录"""
+
+    def write(self, record: Dict) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """把缓冲中的记录落盘"""
+
+    def close(self) -> None:
+        self.flush()
+
+    def __iter__(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class MemorySink(ResultSink):
+    """保存在内存列表中（默认，适合小规模爬取和测试）"""
+
+    def __init__(self):
+        self.records: List[Dict] = []
+
+    def write(self, record: Dict) -> None:
+        self.records.append(record)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class _BatchedSink(ResultSink):
+    """按条数/时间批量落盘的公共逻辑"""
+
+    def __init__(self, fsync_every: int = None, fsync_interval: float = None):
+        self.fsync_every = max(1, fsync_every or RESULT_SINK['fsync_every'])
+        self.fsync_interval = RESULT_SINK['fsync_interval'] if fsync_interval is None else fsync_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _written(self) -> None:
+        self._pending += 1
+        if (self._pending >= self.fsync_every
+                or time.monotonic() - self._last_flush >= self.fsync_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _flush(self) -> None:
+        raise NotImplementedError
+
+
+class JSONLSink(_BatchedSink):
+    """写入 JSONL 文件，每行一条记录。
+
+    每次爬取对应一个新文件：已存在的文件改名为 {path}.1 保留（覆盖更早的一份），
+    导出时不会混入上一次爬取的结果。append 为 True 时在原文件后继续写入（用于续爬）。
+    """
+
+    def __init__(self, path: str, fsync_every: int = None, fsync_interval: float = None,
+                 append: bool = False):
+        super().__init__(fsync_every, fsync_interval)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._count = 0
+        if os.path.exists(path):
+            if append:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._count = sum(1 for line in f if line.strip())
+            elif os.path.getsize(path):
+                os.replace(path, f'{path}.1')
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record: Dict) -> None:
+        self._file.write(json.dumps(dict(record), ensure_ascii=False) + '\n')
+        self._count += 1
+        self._written()
+
+    def _flush(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __iter__(self) -> Iterator[Dict]:
+        if not self._file.closed:
+            self.flush()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class SQLiteSink(_BatchedSink):
+    """写入页面结果存储（ResultStore），每批一个事务，写入后即可通过结果接口查询"""
+
+    def __init__(self, store: ResultStore, task_id: str,
+                 fsync_every: int = None, fsync_interval: float = None):
+        super().__init__(fsync_every, fsync_interval)
+        self.store = store
+        self.task_id = task_id
+        self._buffer: List[Dict] = []
+        self._count = store.count(task_id)
+
+    def write(self, record: Dict) -> None:
+        self._buffer.append(record)
+        self._count += 1
+        self._written()
+
+    def _flush(self) -> None:
+        batch, self._buffer = self._buffer, []
+        self.store.append_many(self.task_id, batch)
+
+    def __iter__(self) -> Iterator[Dict]:
+        self.flush()
+        for record in self.store.iter_results(self.task_id):
+            record.pop('id', None)
+            yield record
+
+    def __len__(self) -> int:
+        return self._count
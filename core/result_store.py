@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面结果存储
+爬取过程中每完成一页就写入一条结果，按自增 id 作为游标分页读取，
+支持按是否含手机号、URL 前缀过滤。使用 SQLite（WAL 模式），所有 worker 进程共享。
+"""
+
+import json
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from .config import RESULT_STORE
+from .sqlite_local import ThreadLocalSQLite
+
+
+class ResultStore(ThreadLocalSQLite):
+    """按任务保存页面结果，游标为结果的自增 id"""
+
+    def __init__(self, path: str = None):
+        self._open_sqlite(path or RESULT_STORE['path'])
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        self._conn().executescript('''
+            CREATE TABLE IF NOT EXISTS page_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                has_phone INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_results_task ON page_results (task_id, id);
+            CREATE INDEX IF NOT EXISTS idx_page_results_url ON page_results (task_id, url);
+        ''')
+
+    def append(self, task_id: str, page_info: Dict) -> int:
+        """写入一页结果，返回其 id"""
+        cursor = self._conn().execute(
+            'INSERT INTO page_results (task_id, url, has_phone, data) VALUES (?, ?, ?, ?)',
+            (task_id, page_info.get('url', ''), int(bool(page_info.get('phone_count'))),
+             json.dumps(dict(page_info), ensure_ascii=False))
+        )
+        return cursor.lastrowid
+
+    def append_many(self, task_id: str, pages: List[Dict]) -> None:
+        """在一个事务中写入多页结果"""
+        if not pages:
+            return
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                'INSERT INTO page_results (task_id, url, has_phone, data) VALUES (?, ?, ?, ?)',
+                [(task_id, page_info.get('url', ''), int(bool(page_info.get('phone_count'))),
+                  json.dumps(dict(page_info), ensure_ascii=False)) for page_info in pages]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def query(self, task_id: str, cursor: int = 0, limit: int = None,
+              has_phone: Optional[bool] = None, url_prefix: str = '') -> List[Dict]:
+        """返回 id 大于 cursor 的结果（按 id 升序），每条附带 id 字段"""
+        limit = min(limit or RESULT_STORE['page_size'], RESULT_STORE['max_page_size'])
+        sql = 'SELECT id, data FROM page_results WHERE task_id = ? AND id > ?'
+        params: list = [task_id, cursor]
+        if has_phone is not None:
+            sql += ' AND has_phone = ?'
+            params.append(int(has_phone))
+        if url_prefix:
+            # 前缀匹配写成范围条件，避免 LIKE 的通配符转义问题
+            sql += ' AND url >= ? AND url < ?'
+            params.extend([url_prefix, url_prefix + '\U0010ffff'])
+        sql += ' ORDER BY id LIMIT ?'
+        params.append(limit)
+        results = []
+        for row_id, data in self._conn().execute(sql, params):
+            record = json.loads(data)
+            record['id'] = row_id
+            results.append(record)
+        return results
+
+    def iter_results(self, task_id: str, cursor: int = 0, **filters) -> Iterator[Dict]:
+        """逐批读取某任务在 cursor 之后的全部结果"""
+        while True:
+            batch = self.query(task_id, cursor, RESULT_STORE['max_page_size'], **filters)
+            yield from batch
+            if len(batch) < RESULT_STORE['max_page_size']:
+                return
+            cursor = batch[-1]['id']
+
+    def count(self, task_id: str) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM page_results WHERE task_id = ?', (task_id,)).fetchone()[0]
+
+    def delete_task(self, task_id: str) -> int:
+        cursor = self._conn().execute('DELETE FROM page_results WHERE task_id = ?', (task_id,))
+        return cursor.rowcount
+
+
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """进程内共享的结果存储实例"""
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            _result_store = ResultStore()
+        return _result_store
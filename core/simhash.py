@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复页面识别
+对页面文本计算 64 位 SimHash 指纹，并按分段索引支持汉明距离查询。
+列表页、打印版、移动版等只差几个字节的页面，外链延后爬取。
+"""
+
+import hashlib
+import re
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Union
+
+FINGERPRINT_BITS = 64
+
+# 中文按单字、英文数字按词切分
+TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fa5]|[A-Za-z0-9]+')
+
+# 每个特征由连续 3 个词组成
+SHINGLE_SIZE = 3
+
+
+# 每个字节值预先展开为 8 个计数段（每段 _LANE_BITS 位，对应该字节的 8 位），
+# 累加时一次大整数加法同时更新 8 个位的计数
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_SPREAD = [sum((value >> i & 1) << (i * _LANE_BITS) for i in range(8)) for value in range(256)]
+
+
+def _digest(feature: str) -> bytes:
+    """特征的 64 位哈希（大端字节序）"""
+    return hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+
+
+def simhash(text: str) -> int:
+    """计算文本的 64 位 SimHash。
+
+    逐位扫描全部特征是 O(64·特征数) 的 Python 循环；这里把各特征的哈希拼接成字节串，
+    按字节位置统计字节值出现次数（在 C 中完成），再按字节值的位展开累加，
+    Python 层的循环次数与特征数无关。
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        features = Counter([' '.join(tokens)]) if tokens else Counter()
+    else:
+        features = Counter(' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1))
+    if not features:
+        return 0
+
+    # 权重为 n 的特征重复 n 次
+    blob = b''.join(_digest(feature) * weight for feature, weight in features.items())
+    total = len(blob) // 8
+    fingerprint = 0
+    for k in range(8):
+        lanes = 0
+        for value, count in Counter(blob[k::8]).items():
+            lanes += _SPREAD[value] * count
+        # 大端字节序：第 k 个字节对应指纹的第 (7-k)*8 到 (7-k)*8+7 位
+        base = (7 - k) * 8
+        for i in range(8):
+            # 该位为 1 的特征权重过半则置 1
+            if (lanes >> (i * _LANE_BITS) & _LANE_MASK) * 2 > total:
+                fingerprint |= 1 << (base + i)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """按汉明距离查询的 SimHash 索引。
+
+    指纹被分成 threshold + 1 段，距离不超过 threshold 的两个指纹至少有一段完全相同
+    （抽屉原理），因此只需比较同段桶中的候选。
+    compact 为 True 时键须为 64 位整数（如网址哈希），指纹和键存于 array('Q')，
+    各段的桶只保存 4 字节的条目序号，不再为每段保存 (指纹, 键) 元组和网址字符串。
+    """
+
+    def __init__(self, threshold: int = 3, compact: bool = False):
+        if not 0 <= threshold < 8:
+            raise ValueError('threshold 取值范围为 0-7')
+        self.threshold = threshold
+        self.segments = threshold + 1
+        self.compact = compact
+        self._width = FINGERPRINT_BITS // self.segments
+        self._buckets: List[Dict[int, list]] = [{} for _ in range(self.segments)]
+        self._fingerprints = array('Q')
+        self._keys = array('Q')
+        self.size = 0
+
+    def _segment_values(self, fingerprint: int) -> List[int]:
+        values = []
+        for i in range(self.segments):
+            shift = i * self._width
+            # 最后一段包含剩余的所有位
+            width = self._width if i < self.segments - 1 else FINGERPRINT_BITS - shift
+            values.append(fingerprint >> shift & ((1 << width) - 1))
+        return values
+
+    def query(self, fingerprint: int) -> Optional[Union[str, int]]:
+        """返回距离不超过阈值的已收录页面键，没有则返回 None"""
+        for i, value in enumerate(self._segment_values(fingerprint)):
+            if self.compact:
+                for entry in self._buckets[i].get(value, ()):
+                    if hamming_distance(fingerprint, self._fingerprints[entry]) <= self.threshold:
+                        return self._keys[entry]
+                continue
+            for other, key in self._buckets[i].get(value, ()):
+                if hamming_distance(fingerprint, other) <= self.threshold:
+                    return key
+        return None
+
+    def add(self, fingerprint: int, key: Union[str, int]) -> None:
+        if self.compact:
+            entry = len(self._fingerprints)
+            self._fingerprints.append(fingerprint)
+            self._keys.append(key)
+            for i, value in enumerate(self._segment_values(fingerprint)):
+                bucket = self._buckets[i].get(value)
+                if bucket is None:
+                    bucket = self._buckets[i][value] = array('I')
+                bucket.append(entry)
+        else:
+            # 各段共用同一个元组
+            entry = (fingerprint, key)
+            for i, value in enumerate(self._segment_values(fingerprint)):
+                self._buckets[i].setdefault(value, []).append(entry)
+        self.size += 1
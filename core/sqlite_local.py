@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按线程建立的 SQLite 连接
+任务存储、页面结果存储和手机号索引都在多个线程（Web 请求、爬取任务、后台清理）中访问
+同一个数据库文件。sqlite3 连接不能跨线程使用，因此每个线程各建一个连接，
+并开启 WAL 模式，让读取不被写入阻塞、多个 worker 进程可以共享同一文件。
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalSQLite:
+    """基类：子类在 __init__ 中调用 _open_sqlite(path)，之后通过 _conn() 取得当前线程的连接"""
+
+    path: str
+
+    def _open_sqlite(self, path: str) -> None:
+        if path == ':memory:' or path.startswith('file::memory:'):
+            # 连接按线程创建，内存库不能在连接间共享，每个线程会得到各自的空库
+            raise ValueError(f"{type(self).__name__} 不支持内存数据库，请使用文件路径")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        """每个线程一个连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
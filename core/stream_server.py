@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步 SSE 推送服务
+基于 asyncio 的独立事件流服务，从共享任务存储读取事件并推送给浏览器。
+每个连接只是一个协程，每个活跃任务只有一个轮询协程，再多的订阅者也不会占用
+gunicorn 的请求 worker。部署时由 nginx 把 /api/events 转发到本服务。
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+from urllib.parse import urlsplit, parse_qs
+
+from .config import EVENT_STREAM, STREAM_SERVER
+from .event_bus import format_sse
+from .task_store import TaskStore, get_task_store
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = (
+    'HTTP/1.1 200 OK\r\n'
+    'Content-Type: text/event-stream; charset=utf-8\r\n'
+    'Cache-Control: no-cache, no-store, must-revalidate\r\n'
+    'Pragma: no-cache\r\n'
+    'Expires: 0\r\n'
+    'Connection: close\r\n'
+    'X-Accel-Buffering: no\r\n'
+    'Access-Control-Allow-Origin: *\r\n'
+    'Access-Control-Allow-Headers: Cache-Control, Last-Event-ID\r\n'
+    '\r\n'
+)
+
+# 请求头最大长度
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class TaskFeed:
+    """单个任务的事件源：一个轮询协程把新事件广播给所有订阅者队列"""
+
+    def __init__(self, server: 'StreamServer', task_id: str):
+        self.server = server
+        self.task_id = task_id
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_id = 0
+
+    async def run(self) -> None:
+        store = self.server.store
+        try:
+            while self.subscribers:
+                task = await asyncio.to_thread(store.get_task, self.task_id)
+                events = await asyncio.to_thread(store.get_events, self.task_id, self.last_id)
+                for event_id, evt in events:
+                    self.last_id = event_id
+                    self._broadcast(('event', event_id, evt))
+                if task is None or task['done']:
+                    # 结束前补读终态写入前后产生的事件
+                    for event_id, evt in await asyncio.to_thread(store.get_events, self.task_id, self.last_id):
+                        self.last_id = event_id
+                        self._broadcast(('event', event_id, evt))
+                    self._broadcast(('end', 0, task))
+                    break
+                await asyncio.sleep(self.server.poll_interval)
+        finally:
+            self.server.feeds.pop(self.task_id, None)
+
+    def _broadcast(self, item: tuple) -> None:
+        for queue in self.subscribers:
+            queue.put_nowait(item)
+
+
+class StreamServer:
+    """asyncio SSE 服务"""
+
+    def __init__(self, store: TaskStore = None, poll_interval: float = None, heartbeat: float = None):
+        self.store = store or get_task_store()
+        self.poll_interval = poll_interval or STREAM_SERVER['poll_interval']
+        self.heartbeat = heartbeat or EVENT_STREAM['heartbeat_interval']
+        self.feeds: Dict[str, TaskFeed] = {}
+        self.connections = 0
+
+    def _subscribe(self, task_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        feed = self.feeds.get(task_id)
+        if feed is None:
+            feed = self.feeds[task_id] = TaskFeed(self, task_id)
+            feed.subscribers.add(queue)
+            asyncio.ensure_future(feed.run())
+        else:
+            feed.subscribers.add(queue)
+        return queue
+
+    def _unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        feed = self.feeds.get(task_id)
+        if feed is not None:
+            feed.subscribers.discard(queue)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            if len(head) > MAX_HEADER_BYTES:
+                return
+            lines = head.decode('latin-1').split('\r\n')
+            parts = lines[0].split(' ')
+            if len(parts) < 2:
+                return
+            method, target = parts[0], parts[1]
+            headers = {}
+            for line in lines[1:]:
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    headers[key.strip().lower()] = value.strip()
+
+            url = urlsplit(target)
+            if url.path == '/health':
+                body = b'{"status": "ok"}'
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n'
+                    + f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+                )
+                await writer.drain()
+                return
+            if method != 'GET' or url.path != '/api/events':
+                writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                await writer.drain()
+                return
+
+            query = parse_qs(url.query)
+            task_id = (query.get('task_id') or [''])[0]
+            try:
+                resume_from = int(headers.get('last-event-id') or (query.get('last_event_id') or ['0'])[0])
+            except ValueError:
+                resume_from = 0
+            await self._stream(writer, task_id, resume_from)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections -= 1
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _stream(self, writer: asyncio.StreamWriter, task_id: str, resume_from: int) -> None:
+        writer.write(SSE_HEADERS.encode())
+        if not task_id:
+            writer.write(format_sse({'type': 'error', 'message': '缺少task_id参数'}).encode('utf-8'))
+            writer.write(format_sse({'type': 'stream_end'}).encode('utf-8'))
+            await writer.drain()
+            return
+        if await asyncio.to_thread(self.store.get_task, task_id) is None:
+            writer.write(format_sse({'type': 'error', 'message': f'无效的task_id: {task_id}'}).encode('utf-8'))
+            writer.write(format_sse({'type': 'stream_end'}).encode('utf-8'))
+            await writer.drain()
+            return
+
+        # 先订阅再读取积压事件，订阅后产生的事件不会遗漏；重复的按 id 跳过
+        queue = self._subscribe(task_id)
+        last_sent = resume_from
+        try:
+            for event_id, evt in await asyncio.to_thread(self.store.get_events, task_id, resume_from):
+                if event_id > last_sent + 1:
+                    writer.write(format_sse({'type': 'events_dropped', 'count': event_id - last_sent - 1}).encode('utf-8'))
+                last_sent = event_id
+                writer.write(format_sse(evt, event_id).encode('utf-8'))
+            await writer.drain()
+
+            while True:
+                try:
+                    kind, event_id, payload = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    writer.write(b': heartbeat\n\n')
+                    await writer.drain()
+                    continue
+                if kind == 'end':
+                    files = (payload or {}).get('files', {})
+                    writer.write(format_sse({'type': 'done', 'files': files}).encode('utf-8'))
+                    writer.write(format_sse({'type': 'stream_end'}).encode('utf-8'))
+                    await writer.drain()
+                    return
+                if event_id <= last_sent:
+                    continue
+                last_sent = event_id
+                writer.write(format_sse(payload, event_id).encode('utf-8'))
+                await writer.drain()
+        finally:
+            self._unsubscribe(task_id, queue)
+
+    async def serve(self, host: str = None, port: int = None) -> asyncio.AbstractServer:
+        """启动监听并返回 asyncio 服务对象"""
+        host = host or STREAM_SERVER['host']
+        port = STREAM_SERVER['port'] if port is None else port
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        logger.info(f"SSE推送服务已启动: {host}:{port}")
+        return server
+
+
+def main(host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """运行 SSE 推送服务直到进程退出"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    async def run():
+        server = await StreamServer().serve(host, port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表格联系人提取
+员工/联系人名录通常是 姓名/职务/电话 列的 <table>。每个表格只识别一次表头，
+把列映射到字段后批量输出结构化记录，无需对展平文本运行联系人正则。
+合并单元格（colspan/rowspan）先展开成网格，再按列号取值。
+"""
+
+import re
+from typing import List, Dict, Optional, Set
+
+from bs4 import BeautifulSoup
+
+from .association import PHONE_OFFSET_PATTERN, normalize_phone
+from .config import TABLE_EXTRACTION, TABLE_HEADER_FIELDS
+
+
+def _cell_text(cell) -> str:
+    """单元格文本，合并空白"""
+    return re.sub(r'\s+', ' ', cell.get_text(' ')).strip()
+
+
+def _own_rows(table) -> list:
+    """表格自身的行（排除嵌套表格中的行）"""
+    return [row for row in table.find_all('tr') if row.find_parent('table') is table]
+
+
+def _span(cell, attr: str, limit: int) -> int:
+    """读取 colspan/rowspan，非法值按 1 处理；0 表示延伸到末尾"""
+    try:
+        value = int(str(cell.get(attr, 1)).strip())
+    except ValueError:
+        return 1
+    if value == 0:
+        return limit
+    return min(max(value, 1), limit)
+
+
+def expand_rows(rows: list) -> List[list]:
+    """按 colspan/rowspan 把各行展开成网格，合并单元格在其覆盖的每个位置重复出现，
+    被上方单元格占据且本行没有对应单元格的位置为 None"""
+    grid = []
+    pending = {}  # 列号 -> (单元格, 还需向下占据的行数)
+    for row_index, row in enumerate(rows):
+        remaining_rows = len(rows) - row_index
+        cells = iter(row.find_all(['td', 'th'], recursive=False))
+        line = []
+        col = 0
+        cell = next(cells, None)
+        while cell is not None or any(c >= col for c in pending):
+            if col in pending:
+                carried, left = pending.pop(col)
+                if left > 1:
+                    pending[col] = (carried, left - 1)
+                line.append(carried)
+                col += 1
+            elif cell is None:
+                line.append(None)
+                col += 1
+            else:
+                rowspan = _span(cell, 'rowspan', remaining_rows)
+                for _ in range(_span(cell, 'colspan', 1000)):
+                    pending.pop(col, None)  # 结构不规范时以本行单元格为准
+                    if rowspan > 1:
+                        pending[col] = (cell, rowspan - 1)
+                    line.append(cell)
+                    col += 1
+                cell = next(cells, None)
+        grid.append(line)
+    return grid
+
+
+def map_header(cells: List[str]) -> Dict[int, str]:
+    """把表头单元格映射为 {列号: 字段}，未识别的列不出现在结果中"""
+    mapping = {}
+    for index, text in enumerate(cells):
+        for field, keywords in TABLE_HEADER_FIELDS.items():
+            if any(keyword in text for keyword in keywords):
+                # 如 "负责人电话" 同时命中姓名和电话关键词时，按电话列处理
+                if field == 'name' and any(k in text for k in TABLE_HEADER_FIELDS['phone']):
+                    continue
+                mapping[index] = field
+                break
+    return mapping
+
+
+def _is_header_label(cell_text: str) -> bool:
+    """表头单元格只能是简短的列名：不含数字，也不是 "联系电话：138..." 这样的 "标签：值" """
+    return (len(cell_text) <= TABLE_EXTRACTION['header_label_max_length']
+            and not re.search(r'[\d：:]', cell_text))
+
+
+def _find_header(grid: List[list], text) -> Optional[tuple]:
+    """在前几行中查找表头，返回 (表头行号, 列映射)"""
+    scan = TABLE_EXTRACTION['header_scan_rows']
+    for row_index, line in enumerate(grid[:scan]):
+        cells = [text(cell) for cell in line]
+        if not all(_is_header_label(cell_text) for cell_text in cells if cell_text):
+            continue
+        mapping = map_header(cells)
+        if len(set(mapping.values())) >= TABLE_EXTRACTION['min_header_fields'] and 'phone' in mapping.values():
+            return row_index, mapping
+    return None
+
+
+def _is_valid_name(name: str) -> bool:
+    """姓名单元格的基本校验"""
+    if not 2 <= len(name) <= 20:
+        return False
+    return bool(re.search(r'[\u4e00-\u9fa5a-zA-Z]', name)) and not re.search(r'\d{3,}', name)
+
+
+def extract_table_records(soup: BeautifulSoup, remove_handled: bool = False) -> List[Dict[str, str]]:
+    """提取页面中所有名录表格的 (姓名, 职务, 手机号) 记录。
+
+    没有手机号的行只在 name 不为空时以 phone='' 输出，便于调用方收集联系人。
+    remove_handled 为 True 时，从 soup 中移除已按列提取过的单元格，
+    调用方之后对展平文本运行正则时不会再次提取这些内容（未映射的列保留）。
+    """
+    records = []
+    handled: Set[int] = set()
+    handled_cells = []
+    texts: Dict[int, str] = {}
+
+    def text(cell) -> str:
+        if cell is None:
+            return ''
+        key = id(cell)
+        if key not in texts:
+            texts[key] = _cell_text(cell)
+        return texts[key]
+
+    def mark(cell) -> None:
+        if cell is not None and id(cell) not in handled:
+            handled.add(id(cell))
+            handled_cells.append(cell)
+
+    for table in soup.find_all('table'):
+        grid = expand_rows(_own_rows(table))
+        header = _find_header(grid, text)
+        if header is None:
+            continue
+        header_index, mapping = header
+        table_records = len(records)
+
+        for line in grid[header_index + 1:]:
+            name = title = ''
+            phones = []
+            for index, field in mapping.items():
+                if index >= len(line) or line[index] is None:
+                    continue
+                cell = line[index]
+                mark(cell)
+                if field == 'phone':
+                    for match in PHONE_OFFSET_PATTERN.finditer(text(cell)):
+                        phone = normalize_phone(match.group(0))
+                        if len(phone) == 11 and phone not in phones:
+                            phones.append(phone)
+                elif field == 'name' and not name:
+                    name = text(cell) if _is_valid_name(text(cell)) else ''
+                elif field == 'title' and not title:
+                    title = text(cell)
+            if phones:
+                for phone in phones:
+                    records.append({'name': name, 'title': title, 'phone': phone})
+            elif name:
+                records.append({'name': name, 'title': title, 'phone': ''})
+        if len(records) > table_records:
+            # 只有按列提取出记录时才移除表头，否则列名留给展平文本
+            for index in mapping:
+                mark(grid[header_index][index])
+
+    if remove_handled:
+        for cell in handled_cells:
+            cell.extract()
+    return records
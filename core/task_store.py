@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务与历史记录存储
+gunicorn 多进程部署时，各 worker 需要共享任务状态、事件和 URL 历史。
+默认使用 SQLite（WAL 模式），可选 Redis 后端；状态转换均为原子操作。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import TASK_STORE
+from .sqlite_local import ThreadLocalSQLite
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # 未安装 redis 时（如测试中使用本地替身）
+    class WatchError(Exception):
+        """乐观事务冲突"""
+
+# 任务状态
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+STATUS_TERMINATED = 'terminated'
+
+# 终态：任务已结束，不会再产生事件
+TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_TERMINATED)
+
+
+def _task_view(task_id: str, status: str, data: Dict) -> Dict:
+    """组装任务字典，附带兼容旧结构的 done/terminated 字段"""
+    task = dict(data)
+    task['task_id'] = task_id
+    task['status'] = status
+    task['done'] = status in TERMINAL_STATUSES
+    task['terminated'] = status == STATUS_TERMINATED
+    return task
+
+
+class TaskStore(ABC):
+    """任务存储接口。
+
+    任务：task_id -> {'status': str, 'url': str, 'files': dict, ...}
+    事件：每个任务一个按 id 递增的事件序列
+    历史：url_hash -> {'task_id': str, 'status': str, 'files': dict, 'timestamp': float, 'url': str}
+    """
+
+    # ---- 任务 ----
+    @abstractmethod
+    def create_task(self, task_id: str, url: str, **fields) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_task(self, task_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_task(self, task_id: str, **fields) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def transition(self, task_id: str, from_statuses: Iterable[str], to_status: str, **fields) -> bool:
+        """仅当当前状态属于 from_statuses 时切换到 to_status，返回是否成功"""
+        raise NotImplementedError
+
+    # ---- 事件 ----
+    # 每个任务只保留最近 max_events 条事件（环形缓冲），事件 id 不因裁剪而重用
+    max_events = TASK_STORE['max_events_per_task']
+
+    @abstractmethod
+    def append_event(self, task_id: str, event: Dict) -> int:
+        """追加事件，返回事件 id（同一任务内单调递增）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_events(self, task_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        """返回仍保留的、id 大于 after_id 的事件列表"""
+        raise NotImplementedError
+
+    # ---- 历史 ----
+    @abstractmethod
+    def get_history(self, url_hash: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_history(self, url_hash: str, record: Dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_history(self, url_hash: str, **fields) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_history(self, url_hash: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_history(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    # ---- 单飞 ----
+    @abstractmethod
+    def claim_task(self, url_hash: str, task_id: str, url: str, history: Dict = None, **fields) -> Tuple[str, bool]:
+        """同一结果键只允许一个运行中的任务。
+
+        历史记录指向的任务仍在运行时返回 (该任务 id, False)；否则在同一事务中创建任务（记录 url_hash），
+        并把历史记录（保留原有字段，合并 history）指向新任务，返回 (task_id, True)。
+        """
+        raise NotImplementedError
+
+    # ---- 批次子项 ----
+    # 批次的子项单独保存，进度变化时只改写变化的一项，不改写整个批次
+    @abstractmethod
+    def set_batch_items(self, batch_id: str, items: List[Dict]) -> None:
+        """写入批次的全部子项（按列表顺序编号，替换已有子项）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_batch_item(self, batch_id: str, index: int, item: Dict) -> None:
+        """覆盖第 index 个子项"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_batch_items(self, batch_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    # ---- 清理与统计 ----
+    @abstractmethod
+    def evict_tasks(self, finished_before: float) -> List[str]:
+        """删除在 finished_before 之前结束的任务及其事件，返回被删除的任务 id"""
+        raise NotImplementedError
+
+    def trim_history(self, max_entries: int) -> int:
+        """历史记录超过 max_entries 条时按最近使用时间淘汰最旧的记录，返回淘汰条数。
+        指向运行中任务的记录不淘汰。
+        """
+        history = self.list_history()
+        excess = len(history) - max_entries
+        if excess <= 0:
+            return 0
+
+        def last_used(item) -> float:
+            record = item[1]
+            return max(record.get('last_access') or 0, record.get('timestamp') or 0)
+
+        removed = 0
+        for url_hash, record in sorted(history.items(), key=last_used):
+            if removed >= excess:
+                break
+            owner = record.get('task_id')
+            task = self.get_task(owner) if owner else None
+            if task is not None and task['status'] == STATUS_RUNNING:
+                continue
+            if self.delete_history(url_hash):
+                removed += 1
+        return removed
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """保留的任务数（按状态）、事件数和历史记录数"""
+        raise NotImplementedError
+
+
+class SQLiteTaskStore(ThreadLocalSQLite, TaskStore):
+    """SQLite 后端（WAL 模式），同一数据库文件供所有 worker 进程共享"""
+
+    def __init__(self, path: str, max_events: int = None):
+        if max_events:
+            self.max_events = max_events
+        self._open_sqlite(path)
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS task_events (
+                task_id TEXT NOT NULL,
+                event_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (task_id, event_id)
+            );
+            CREATE TABLE IF NOT EXISTS url_history (
+                url_hash TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS batch_items (
+                batch_id TEXT NOT NULL,
+                item_index INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (batch_id, item_index)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (status, updated_at);
+        ''')
+
+    def _write(self):
+        """立即获取写锁的事务，保证读-改-写的原子性"""
+        return _ImmediateTransaction(self._conn())
+
+    def create_task(self, task_id: str, url: str, **fields) -> Dict:
+        status = fields.pop('status', STATUS_RUNNING)
+        data = {'url': url, 'files': {}, 'created_at': time.time()}
+        data.update(fields)
+        self._conn().execute(
+            'INSERT OR REPLACE INTO tasks (task_id, status, data, updated_at) VALUES (?, ?, ?, ?)',
+            (task_id, status, json.dumps(data, ensure_ascii=False), time.time())
+        )
+        return _task_view(task_id, status, data)
+
+    def get_task(self, task_id: str) -> Optional[Dict]:
+        row = self._conn().execute('SELECT status, data FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+        if row is None:
+            return None
+        return _task_view(task_id, row[0], json.loads(row[1]))
+
+    def update_task(self, task_id: str, **fields) -> None:
+        with self._write() as conn:
+            row = conn.execute('SELECT status, data FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+            if row is None:
+                return
+            status, data = row[0], json.loads(row[1])
+            status = fields.pop('status', status)
+            data.update(fields)
+            conn.execute(
+                'UPDATE tasks SET status = ?, data = ?, updated_at = ? WHERE task_id = ?',
+                (status, json.dumps(data, ensure_ascii=False), time.time(), task_id)
+            )
+
+    def transition(self, task_id: str, from_statuses: Iterable[str], to_status: str, **fields) -> bool:
+        from_statuses = tuple(from_statuses)
+        with self._write() as conn:
+            row = conn.execute('SELECT status, data FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+            if row is None or row[0] not in from_statuses:
+                return False
+            data = json.loads(row[1])
+            data.update(fields)
+            conn.execute(
+                'UPDATE tasks SET status = ?, data = ?, updated_at = ? WHERE task_id = ?',
+                (to_status, json.dumps(data, ensure_ascii=False), time.time(), task_id)
+            )
+            return True
+
+    def append_event(self, task_id: str, event: Dict) -> int:
+        with self._write() as conn:
+            row = conn.execute('SELECT MAX(event_id) FROM task_events WHERE task_id = ?', (task_id,)).fetchone()
+            event_id = (row[0] or 0) + 1
+            conn.execute(
+                'INSERT INTO task_events (task_id, event_id, payload) VALUES (?, ?, ?)',
+                (task_id, event_id, json.dumps(event, ensure_ascii=False))
+            )
+            if event_id > self.max_events:
+                conn.execute(
+                    'DELETE FROM task_events WHERE task_id = ? AND event_id <= ?',
+                    (task_id, event_id - self.max_events)
+                )
+            return event_id
+
+    def get_events(self, task_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        rows = self._conn().execute(
+            'SELECT event_id, payload FROM task_events WHERE task_id = ? AND event_id > ? ORDER BY event_id',
+            (task_id, after_id)
+        ).fetchall()
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def get_history(self, url_hash: str) -> Optional[Dict]:
+        row = self._conn().execute('SELECT data FROM url_history WHERE url_hash = ?', (url_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_history(self, url_hash: str, record: Dict) -> None:
+        self._conn().execute(
+            'INSERT OR REPLACE INTO url_history (url_hash, data) VALUES (?, ?)',
+            (url_hash, json.dumps(record, ensure_ascii=False))
+        )
+
+    def claim_task(self, url_hash: str, task_id: str, url: str, history: Dict = None, **fields) -> Tuple[str, bool]:
+        with self._write() as conn:
+            row = conn.execute('SELECT data FROM url_history WHERE url_hash = ?', (url_hash,)).fetchone()
+            record = json.loads(row[0]) if row else {}
+            owner = record.get('task_id')
+            if owner:
+                task_row = conn.execute('SELECT status FROM tasks WHERE task_id = ?', (owner,)).fetchone()
+                if task_row is not None and task_row[0] == STATUS_RUNNING:
+                    return owner, False
+            data = {'url': url, 'url_hash': url_hash, 'files': {}, 'created_at': time.time()}
+            data.update(fields)
+            conn.execute(
+                'INSERT OR REPLACE INTO tasks (task_id, status, data, updated_at) VALUES (?, ?, ?, ?)',
+                (task_id, STATUS_RUNNING, json.dumps(data, ensure_ascii=False), time.time())
+            )
+            record.update(history or {})
+            record['task_id'] = task_id
+            conn.execute(
+                'INSERT OR REPLACE INTO url_history (url_hash, data) VALUES (?, ?)',
+                (url_hash, json.dumps(record, ensure_ascii=False))
+            )
+            return task_id, True
+
+    def update_history(self, url_hash: str, **fields) -> None:
+        with self._write() as conn:
+            row = conn.execute('SELECT data FROM url_history WHERE url_hash = ?', (url_hash,)).fetchone()
+            if row is None:
+                return
+            record = json.loads(row[0])
+            record.update(fields)
+            conn.execute(
+                'UPDATE url_history SET data = ? WHERE url_hash = ?',
+                (json.dumps(record, ensure_ascii=False), url_hash)
+            )
+
+    def delete_history(self, url_hash: str) -> bool:
+        cursor = self._conn().execute('DELETE FROM url_history WHERE url_hash = ?', (url_hash,))
+        return cursor.rowcount > 0
+
+    def list_history(self) -> Dict[str, Dict]:
+        rows = self._conn().execute('SELECT url_hash, data FROM url_history').fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def set_batch_items(self, batch_id: str, items: List[Dict]) -> None:
+        with self._write() as conn:
+            conn.execute('DELETE FROM batch_items WHERE batch_id = ?', (batch_id,))
+            conn.executemany(
+                'INSERT INTO batch_items (batch_id, item_index, data) VALUES (?, ?, ?)',
+                ((batch_id, index, json.dumps(item, ensure_ascii=False)) for index, item in enumerate(items))
+            )
+
+    def update_batch_item(self, batch_id: str, index: int, item: Dict) -> None:
+        self._conn().execute(
+            'INSERT OR REPLACE INTO batch_items (batch_id, item_index, data) VALUES (?, ?, ?)',
+            (batch_id, index, json.dumps(item, ensure_ascii=False))
+        )
+
+    def get_batch_items(self, batch_id: str) -> List[Dict]:
+        rows = self._conn().execute(
+            'SELECT data FROM batch_items WHERE batch_id = ? ORDER BY item_index', (batch_id,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def evict_tasks(self, finished_before: float) -> List[str]:
+        placeholders = ', '.join('?' * len(TERMINAL_STATUSES))
+        with self._write() as conn:
+            task_ids = [row[0] for row in conn.execute(
+                f'SELECT task_id FROM tasks WHERE status IN ({placeholders}) AND updated_at < ?',
+                (*TERMINAL_STATUSES, finished_before)
+            )]
+            for task_id in task_ids:
+                conn.execute('DELETE FROM task_events WHERE task_id = ?', (task_id,))
+                conn.execute('DELETE FROM batch_items WHERE batch_id = ?', (task_id,))
+                conn.execute('DELETE FROM tasks WHERE task_id = ?', (task_id,))
+            return task_ids
+
+    def stats(self) -> Dict:
+        conn = self._conn()
+        tasks = dict(conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        return {
+            'tasks': tasks,
+            'events': conn.execute('SELECT COUNT(*) FROM task_events').fetchone()[0],
+            'history': conn.execute('SELECT COUNT(*) FROM url_history').fetchone()[0],
+        }
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK 上下文"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+class RedisTaskStore(TaskStore):
+    """Redis 后端，client 需为 decode_responses=True 的 redis-py 兼容客户端"""
+
+    def __init__(self, client, prefix: str = 'phone_scraper:', max_events: int = None):
+        self.client = client
+        self.prefix = prefix
+        if max_events:
+            self.max_events = max_events
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.prefix}task:{task_id}"
+
+    def _events_key(self, task_id: str) -> str:
+        return f"{self.prefix}events:{task_id}"
+
+    def _event_seq_key(self, task_id: str) -> str:
+        return f"{self.prefix}event_seq:{task_id}"
+
+    def _batch_items_key(self, batch_id: str) -> str:
+        return f"{self.prefix}batch_items:{batch_id}"
+
+    @property
+    def _history_key(self) -> str:
+        return f"{self.prefix}history"
+
+    def create_task(self, task_id: str, url: str, **fields) -> Dict:
+        status = fields.pop('status', STATUS_RUNNING)
+        data = {'url': url, 'files': {}, 'created_at': time.time()}
+        data.update(fields)
+        self.client.hset(self._task_key(task_id), mapping={
+            'status': status,
+            'data': json.dumps(data, ensure_ascii=False),
+            'updated_at': time.time(),
+        })
+        return _task_view(task_id, status, data)
+
+    def get_task(self, task_id: str) -> Optional[Dict]:
+        raw = self.client.hgetall(self._task_key(task_id))
+        if not raw:
+            return None
+        return _task_view(task_id, raw['status'], json.loads(raw['data']))
+
+    def _compare_and_set(self, key: str, check, mutate) -> bool:
+        """WATCH/MULTI 乐观事务：check(当前值) 为真时写入 mutate(当前值)"""
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    current = pipe.hgetall(key)
+                    if not check(current):
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.hset(key, mapping=mutate(current))
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    def update_task(self, task_id: str, **fields) -> None:
+        new_status = fields.pop('status', None)
+
+        def mutate(current):
+            data = json.loads(current['data'])
+            data.update(fields)
+            return {'status': new_status or current['status'], 'data': json.dumps(data, ensure_ascii=False),
+                    'updated_at': time.time()}
+
+        self._compare_and_set(self._task_key(task_id), bool, mutate)
+
+    def transition(self, task_id: str, from_statuses: Iterable[str], to_status: str, **fields) -> bool:
+        from_statuses = tuple(from_statuses)
+
+        def mutate(current):
+            data = json.loads(current['data'])
+            data.update(fields)
+            return {'status': to_status, 'data': json.dumps(data, ensure_ascii=False), 'updated_at': time.time()}
+
+        return self._compare_and_set(
+            self._task_key(task_id),
+            lambda current: bool(current) and current['status'] in from_statuses,
+            mutate
+        )
+
+    def append_event(self, task_id: str, event: Dict) -> int:
+        event_id = self.client.incr(self._event_seq_key(task_id))
+        key = self._events_key(task_id)
+        self.client.rpush(key, json.dumps({'id': event_id, 'event': event}, ensure_ascii=False))
+        self.client.ltrim(key, -self.max_events, -1)
+        return event_id
+
+    def get_events(self, task_id: str, after_id: int = 0) -> List[Tuple[int, Dict]]:
+        items = [json.loads(item) for item in self.client.lrange(self._events_key(task_id), 0, -1)]
+        return [(item['id'], item['event']) for item in items if item['id'] > after_id]
+
+    def get_history(self, url_hash: str) -> Optional[Dict]:
+        raw = self.client.hget(self._history_key, url_hash)
+        return json.loads(raw) if raw else None
+
+    def set_history(self, url_hash: str, record: Dict) -> None:
+        self.client.hset(self._history_key, url_hash, json.dumps(record, ensure_ascii=False))
+
+    def claim_task(self, url_hash: str, task_id: str, url: str, history: Dict = None, **fields) -> Tuple[str, bool]:
+        # 同时 WATCH 历史和当前持有者的任务键：任一被修改则重试
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self._history_key)
+                    raw = pipe.hget(self._history_key, url_hash)
+                    record = json.loads(raw) if raw else {}
+                    owner = record.get('task_id')
+                    if owner:
+                        pipe.watch(self._task_key(owner))
+                        current = pipe.hgetall(self._task_key(owner))
+                        if current and current['status'] == STATUS_RUNNING:
+                            pipe.unwatch()
+                            return owner, False
+                    data = {'url': url, 'url_hash': url_hash, 'files': {}, 'created_at': time.time()}
+                    data.update(fields)
+                    record.update(history or {})
+                    record['task_id'] = task_id
+                    pipe.multi()
+                    pipe.hset(self._task_key(task_id), mapping={
+                        'status': STATUS_RUNNING,
+                        'data': json.dumps(data, ensure_ascii=False),
+                        'updated_at': time.time(),
+                    })
+                    pipe.hset(self._history_key, url_hash, json.dumps(record, ensure_ascii=False))
+                    pipe.execute()
+                    return task_id, True
+                except WatchError:
+                    continue
+
+    def update_history(self, url_hash: str, **fields) -> None:
+        # 历史记录为单个哈希中的字段，使用与任务相同的乐观事务
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self._history_key)
+                    raw = pipe.hget(self._history_key, url_hash)
+                    if not raw:
+                        pipe.unwatch()
+                        return
+                    record = json.loads(raw)
+                    record.update(fields)
+                    pipe.multi()
+                    pipe.hset(self._history_key, url_hash, json.dumps(record, ensure_ascii=False))
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    def delete_history(self, url_hash: str) -> bool:
+        return bool(self.client.hdel(self._history_key, url_hash))
+
+    def list_history(self) -> Dict[str, Dict]:
+        return {key: json.loads(value) for key, value in self.client.hgetall(self._history_key).items()}
+
+    def set_batch_items(self, batch_id: str, items: List[Dict]) -> None:
+        key = self._batch_items_key(batch_id)
+        self.client.delete(key)
+        if items:
+            self.client.hset(key, mapping={
+                str(index): json.dumps(item, ensure_ascii=False) for index, item in enumerate(items)
+            })
+
+    def update_batch_item(self, batch_id: str, index: int, item: Dict) -> None:
+        self.client.hset(self._batch_items_key(batch_id), str(index), json.dumps(item, ensure_ascii=False))
+
+    def get_batch_items(self, batch_id: str) -> List[Dict]:
+        raw = self.client.hgetall(self._batch_items_key(batch_id))
+        return [json.loads(raw[key]) for key in sorted(raw, key=int)]
+
+    def _iter_tasks(self) -> Iterator[Tuple[str, Dict]]:
+        prefix = self._task_key('')
+        for key in self.client.scan_iter(match=f'{prefix}*', count=500):
+            raw = self.client.hgetall(key)
+            if raw:
+                yield key[len(prefix):], raw
+
+    def evict_tasks(self, finished_before: float) -> List[str]:
+        evicted = []
+        for task_id, raw in self._iter_tasks():
+            # 旧版本写入的任务没有 updated_at，结束后按最早的时间处理
+            if raw['status'] in TERMINAL_STATUSES and float(raw.get('updated_at') or 0) < finished_before:
+                self.client.delete(self._task_key(task_id), self._events_key(task_id),
+                                   self._event_seq_key(task_id), self._batch_items_key(task_id))
+                evicted.append(task_id)
+        return evicted
+
+    def stats(self) -> Dict:
+        tasks: Dict[str, int] = {}
+        events = 0
+        for task_id, raw in self._iter_tasks():
+            tasks[raw['status']] = tasks.get(raw['status'], 0) + 1
+            events += self.client.llen(self._events_key(task_id))
+        return {'tasks': tasks, 'events': events, 'history': self.client.hlen(self._history_key)}
+
+
+_store: Optional[TaskStore] = None
+_store_lock = threading.Lock()
+
+
+def create_task_store() -> TaskStore:
+    """按配置创建存储后端"""
+    if TASK_STORE['backend'] == 'redis':
+        import redis
+
+        client = redis.Redis.from_url(TASK_STORE['redis_url'], decode_responses=True)
+        return RedisTaskStore(client, prefix=TASK_STORE['redis_prefix'])
+    return SQLiteTaskStore(TASK_STORE['sqlite_path'])
+
+
+def get_task_store() -> TaskStore:
+    """进程内共享的存储实例"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_task_store()
+        return _store
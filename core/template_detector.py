@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站点模板块识别
+在前 N 页中对候选 DOM 块（页眉、页脚、导航及 body 的前两层子元素）计算文本指纹，
+反复出现的块视为站点模板。学习期内模板块照常提取，手机号归属到首次出现的页面；
+之后的页面在提取前移除这些块，不再重复提取。
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+from .config import TEMPLATE_DETECTION
+
+# 无论位置都作为候选的语义标签
+SEMANTIC_TAGS = ['header', 'footer', 'nav', 'aside']
+
+# 从 body 向下参与识别的层数
+CANDIDATE_DEPTH = 2
+
+
+class TemplateLearner:
+    """单个站点的模板学习器，每个爬虫实例一个"""
+
+    def __init__(self, learn_pages: int = None, min_ratio: float = None, min_text_length: int = None):
+        self.learn_pages = learn_pages or TEMPLATE_DETECTION['learn_pages']
+        self.min_ratio = min_ratio or TEMPLATE_DETECTION['min_ratio']
+        self.min_text_length = min_text_length or TEMPLATE_DETECTION['min_text_length']
+        self.pages_seen = 0
+        self.templates = set()
+        self.skipped_blocks = 0
+        self._counts: Counter = Counter()
+
+    @property
+    def learning(self) -> bool:
+        return self.pages_seen < self.learn_pages
+
+    def _fingerprint(self, element) -> int:
+        text = re.sub(r'\s+', ' ', element.get_text(' ')).strip()
+        if len(text) < self.min_text_length:
+            return 0
+        return hash((element.name, text))
+
+    def _candidate_blocks(self, soup: BeautifulSoup) -> List[Tuple[int, object]]:
+        """返回 (指纹, 元素) 列表，指纹为 0 的块不参与识别"""
+        root = soup.body or soup
+        elements = []
+        level = [root]
+        for _ in range(CANDIDATE_DEPTH):
+            level = [child for parent in level for child in parent.find_all(True, recursive=False)]
+            elements.extend(level)
+        seen = {id(el) for el in elements}
+        elements.extend(el for el in root.find_all(SEMANTIC_TAGS) if id(el) not in seen)
+
+        blocks = []
+        for element in elements:
+            fingerprint = self._fingerprint(element)
+            if fingerprint:
+                blocks.append((fingerprint, element))
+        return blocks
+
+    def process(self, soup: BeautifulSoup) -> int:
+        """学习期内记录指纹；学习完成后从 soup 中移除模板块，返回移除的块数"""
+        if self.learning:
+            self._counts.update({fp for fp, _ in self._candidate_blocks(soup)})
+            self.pages_seen += 1
+            if not self.learning:
+                self._finalize()
+            return 0
+
+        if not self.templates:
+            return 0
+        removed_ids = set()
+        for fingerprint, element in self._candidate_blocks(soup):
+            if fingerprint not in self.templates:
+                continue
+            # 祖先块已被移除时，该块随之脱离文档，跳过
+            if any(id(parent) in removed_ids for parent in element.parents):
+                continue
+            element.extract()
+            removed_ids.add(id(element))
+        self.skipped_blocks += len(removed_ids)
+        return len(removed_ids)
+
+    def _finalize(self) -> None:
+        threshold = max(2, math.ceil(self.min_ratio * self.pages_seen))
+        self.templates = {fp for fp, count in self._counts.items() if count >= threshold}
+        self._counts.clear()
@@ -7,16 +7,38 @@
 
 import os
 import re
+import json
 import time
-import hashlib
+import threading
+import uuid
 import logging
+from typing import Tuple
 from urllib.parse import urlparse
 from flask import Flask, request, jsonify, render_template_string, Response, send_from_directory
 from flask_cors import CORS
 
 # 导入核心模块
 from .phone_scraper import PhoneScraper
-from .config import OUTPUT_DIR, DEFAULT_MAX_PAGES
+from .config import (
+    OUTPUT_DIR, DEFAULT_MAX_PAGES, EVENT_STREAM, BATCH, RESULT_CACHE, JOB_PRIORITIES, RESULT_STORE,
+    PHONE_INDEX, LIFECYCLE
+)
+from .event_bus import EventBus, format_sse
+from .event_coalescer import ProgressCoalescer
+from .job_scheduler import JobScheduler, QueueFullError, parse_priority
+from .cancellation import CancellationToken
+from .reachability import ReachabilityProbe
+from .result_store import get_result_store
+from .result_sink import SQLiteSink
+from .phone_index import get_phone_index
+from .association import normalize_phone
+from .lifecycle import LifecycleManager
+from .output_retention import OutputRetention
+from .result_cache import result_key, canonicalize_url, freshness, FRESH, STALE
+from .batch import BatchCoordinator, build_batch_archive, parse_url_list, ITEM_PENDING, ITEM_SKIPPED
+from .task_store import (
+    get_task_store, STATUS_RUNNING, STATUS_COMPLETED, STATUS_FAILED, STATUS_TERMINATED
+)
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,11 +47,35 @@ logger = logging.getLogger(__name__)
 # 确保输出目录存在
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# 任务注册表：task_id -> {'queue': [], 'done': bool, 'url': str, 'files': dict}
-TASKS = {}
+# 任务与URL历史存储：所有 gunicorn worker 共享（默认 SQLite，可选 Redis）
+# 任务：task_id -> {'status': str, 'done': bool, 'url': str, 'files': dict, 'terminated': bool}
+# 历史：结果缓存键（规范化网址 + 爬取参数）-> {'task_id': str, 'status': str, 'files': dict,
+#       'timestamp': float, 'completed_at': float, 'url': str}
+STORE = get_task_store()
 
-# URL历史记录：url_hash -> {'task_id': str, 'status': str, 'files': dict, 'timestamp': float, 'url': str}
-URL_HISTORY = {}
+# 任务事件通知：本进程产生的事件直接唤醒 SSE 订阅者
+BUS = EventBus()
+
+# 爬取任务调度：固定数量的工作线程执行爬取，超出的任务排队
+SCHEDULER = JobScheduler()
+
+# 本进程中排队或运行的任务的取消标记：task_id -> CancellationToken
+CANCEL_TOKENS = {}
+
+# 链接可达性探测（按主机缓存结果）
+PROBE = ReachabilityProbe()
+
+# 页面结果：爬取过程中逐页写入，供结果接口分页读取
+RESULTS = get_result_store()
+
+# 跨任务手机号索引：每个任务完成后批量写入
+PHONE_INDEX_STORE = get_phone_index()
+
+# 输出文件保留策略：按时间、总大小和每主机文件数清理 OUTPUT_DIR
+OUTPUTS = OutputRetention(STORE)
+
+# 生命周期管理：定期删除结束较久的任务（连同页面结果）、限制历史记录条数并清理输出文件
+LIFECYCLE_MANAGER = LifecycleManager(STORE, on_evict=RESULTS.delete_task, prune=[PROBE.prune, OUTPUTS.sweep])
 
 
 def is_valid_http_url(url: str) -> bool:
@@ -40,131 +86,316 @@ def is_valid_http_url(url: str) -> bool:
         return False
 
 
-def get_url_hash(url: str) -> str:
-    """生成URL的哈希值（以天为维度）"""
-    # 使用URL + 当前日期作为哈希，确保同一天内相同URL只有一个任务
-    today = time.strftime('%Y%m%d')
-    url_with_date = f"{url}_{today}"
-    return hashlib.md5(url_with_date.encode('utf-8')).hexdigest()
+def get_url_hash(url: str, max_pages=None) -> str:
+    """生成结果缓存键（规范化网址 + 爬取参数）"""
+    return result_key(url, max_pages)
+
+def is_recent_failure(history: dict) -> bool:
+    """最近一次爬取在 failed_retry 秒内失败"""
+    return (history.get('status') == STATUS_FAILED
+            and time.time() - history.get('timestamp', 0) < RESULT_CACHE['failed_retry'])
 
-def check_url_history(url: str) -> dict:
-    """检查URL的爬取历史（以天为维度）"""
-    url_hash = get_url_hash(url)
-    history = URL_HISTORY.get(url_hash, {})
+def check_url_history(url: str, max_pages=None) -> dict:
+    """检查URL的缓存结果和运行中的任务。
+
+    结果新鲜时直接返回；过期不久（stale）时也先返回旧结果，并标记 refresh 由调用方在后台刷新。
+    """
+    url_hash = get_url_hash(url, max_pages)
+    history = STORE.get_history(url_hash) or {}
     
-    logger.info(f"检查URL历史: {url}")
-    logger.info(f"URL哈希: {url_hash}")
-    logger.info(f"历史记录: {history}")
-    logger.info(f"当前TASKS: {list(TASKS.keys())}")
+    logger.debug(f"检查URL历史: {url}")
+    logger.debug(f"URL哈希: {url_hash}")
+    logger.debug(f"历史记录: {history}")
     
     if not history:
-        logger.info(f"URL {url} 今天没有历史记录")
-        return {'status': 'not_found', 'message': '今天未曾爬取'}
+        logger.info(f"URL {url} 没有历史记录")
+        return {'status': 'not_found', 'message': '没有爬取记录'}
     
     task_id = history.get('task_id')
+    task = STORE.get_task(task_id) if task_id else None
+    running = task is not None and not task['done']
     logger.info(f"历史记录中的task_id: {task_id}")
     
-    # 1. 检查是否有正在运行的任务
-    if task_id and task_id in TASKS:
-        task = TASKS[task_id]
-        logger.info(f"任务 {task_id} 在TASKS中找到: {task}")
-        
-        if not task.get('done', False):
-            # 验证任务状态的一致性
-            if task.get('url') == url:  # 确保URL匹配
-                logger.info(f"任务 {task_id} 正在运行中，URL: {url}")
-                return {
-                    'status': 'running', 
-                    'message': '今天已有任务正在爬取中，请稍后',
-                    'task_id': task_id
-                }
-            else:
-                # URL不匹配，清除历史记录
-                logger.warning(f"任务 {task_id} URL不匹配，清除历史记录")
-                del URL_HISTORY[url_hash]
-                return {'status': 'not_found', 'message': '任务状态不一致，需要重新爬取'}
-        else:
-            logger.info(f"任务 {task_id} 已完成")
-    
-    # 2. 检查历史记录中的状态
-    history_status = history.get('status', '')
-    logger.info(f"历史记录状态: {history_status}")
-    
-    # 如果历史记录显示任务正在运行，但TASKS中不存在，说明任务异常终止
-    if history_status == 'running' and (not task_id or task_id not in TASKS):
-        logger.warning(f"历史记录显示任务正在运行，但TASKS中不存在，清除记录")
-        del URL_HISTORY[url_hash]
-        return {'status': 'not_found', 'message': '任务状态异常，需要重新爬取'}
-    
-    # 如果历史记录显示任务失败，但时间很近（5分钟内），避免立即重新创建
-    if history_status == 'failed':
-        timestamp = history.get('timestamp', 0)
-        time_diff = time.time() - timestamp
-        logger.info(f"任务失败时间差: {time_diff}秒")
-        
-        if time_diff < 300:  # 5分钟内失败的任务，返回失败状态
-            logger.info(f"任务最近失败，避免立即重新创建")
+    # 1. 检查缓存的结果文件
+    files = history.get('files') or {}
+    if files.get('docx'):
+        docx_path = os.path.join(OUTPUT_DIR, os.path.basename(files['docx']))
+        state = freshness(history)
+        if not os.path.exists(docx_path):
+            # 文件不存在，清除无效的结果（保留记录，可能有任务正在运行）
+            logger.warning(f"历史记录中的文件不存在，清除结果: {docx_path}")
+            STORE.update_history(url_hash, files={})
+        elif state == FRESH:
+            logger.info(f"已有爬取结果: {docx_path}")
+            # 记录最近使用时间，历史记录超出上限时按此淘汰
+            STORE.update_history(url_hash, last_access=time.time())
             return {
-                'status': 'failed', 
-                'message': '任务最近失败，请稍后再试',
+                'status': 'completed',
+                'message': '已有爬取结果',
+                'files': files,
                 'task_id': task_id
             }
+        elif state == STALE:
+            # 旧结果先返回；没有任务在刷新且最近没有刷新失败时，由调用方启动后台刷新
+            refresh = not running and not is_recent_failure(history)
+            STORE.update_history(url_hash, last_access=time.time())
+            logger.info(f"返回过期结果: {docx_path}，后台刷新: {refresh or running}")
+            return {
+                'status': 'completed',
+                'message': '已有爬取结果，后台正在更新' if refresh or running else '已有爬取结果',
+                'files': files,
+                'task_id': task_id,
+                'stale': True,
+                'refresh': refresh
+            }
         else:
-            # 失败时间较久，清除记录允许重新创建
-            logger.info(f"任务失败时间较久，清除记录允许重新创建")
-            del URL_HISTORY[url_hash]
-            return {'status': 'not_found', 'message': '任务失败时间较久，可以重新爬取'}
+            logger.info(f"爬取结果已过期: {docx_path}")
     
-    # 3. 检查是否有已完成的结果文件
-    if history.get('files') and history['files'].get('docx'):
-        docx_path = os.path.join(OUTPUT_DIR, os.path.basename(history['files']['docx']))
-        if os.path.exists(docx_path):
-            logger.info(f"今天已有爬取结果: {docx_path}")
+    # 2. 检查是否有正在运行的任务
+    if running:
+        logger.info(f"任务 {task_id} 在任务存储中找到: {task}")
+        # 验证任务状态的一致性
+        if canonicalize_url(task.get('url', '')) == canonicalize_url(url):
+            logger.info(f"任务 {task_id} 正在运行中，URL: {url}")
             return {
-                'status': 'completed',
-                'message': '今天已有爬取结果',
-                'files': history['files'],
+                'status': 'running', 
+                'message': '已有任务正在爬取中，请稍后',
                 'task_id': task_id
             }
-        else:
-            # 文件不存在，清除无效的历史记录
-            logger.warning(f"历史记录中的文件不存在，清除记录: {docx_path}")
-            del URL_HISTORY[url_hash]
-            return {'status': 'not_found', 'message': '结果文件不存在，需要重新爬取'}
+        # URL不匹配，清除历史记录
+        logger.warning(f"任务 {task_id} URL不匹配，清除历史记录")
+        STORE.delete_history(url_hash)
+        return {'status': 'not_found', 'message': '任务状态不一致，需要重新爬取'}
     
-    # 4. 如果任务已完成但没有文件，且不在TASKS中，清除无效记录
-    if task_id and task_id not in TASKS:
-        logger.warning(f"任务 {task_id} 在TASKS中不存在，清除历史记录")
-        del URL_HISTORY[url_hash]
+    # 3. 历史记录显示任务正在运行，但任务存储中不存在，说明任务异常终止
+    history_status = history.get('status', '')
+    logger.info(f"历史记录状态: {history_status}")
+    if history_status == STATUS_RUNNING and task is None:
+        logger.warning(f"历史记录显示任务正在运行，但任务存储中不存在，清除记录")
+        STORE.delete_history(url_hash)
         return {'status': 'not_found', 'message': '任务状态异常，需要重新爬取'}
     
-    # 5. 没有找到任何有效信息，但保留历史记录（可能是任务还在运行中）
-    logger.info(f"URL {url} 今天没有找到有效的爬取结果，但保留历史记录")
-    return {'status': 'not_found', 'message': '今天没有找到有效的爬取结果，需要重新爬取'}
+    # 4. 最近失败的任务，避免立即重新创建
+    if is_recent_failure(history):
+        logger.info(f"任务最近失败，避免立即重新创建")
+        return {
+            'status': 'failed', 
+            'message': '任务最近失败，请稍后再试',
+            'task_id': task_id
+        }
+    
+    # 5. 没有可用结果，需要重新爬取（保留记录中的任务信息）
+    logger.info(f"URL {url} 没有可用的爬取结果")
+    return {'status': 'not_found', 'message': '没有可用的爬取结果，需要重新爬取'}
+
+def read_events(task_id: str, after_id: int) -> list:
+    """读取 id 大于 after_id 的事件：优先使用本进程的环形缓冲，否则查询任务存储"""
+    events = BUS.events_after(task_id, after_id)
+    if events is None:
+        events = STORE.get_events(task_id, after_id)
+    return events
+
 
-def terminate_old_task(url: str) -> bool:
+def cancel_task(task_id: str, message: str = '任务已取消') -> bool:
+    """终止排队或运行中的任务，返回是否成功。
+
+    原子地把运行中的任务标记为终止，避免与任务自身的完成状态写入冲突；
+    本进程内的爬虫立即停止，其他 worker 中的爬虫在下次检查存储时停止。
+    """
+    if not STORE.transition(task_id, [STATUS_RUNNING], STATUS_TERMINATED):
+        return False
+    SCHEDULER.cancel(task_id)
+    token = CANCEL_TOKENS.pop(task_id, None)
+    if token is not None:
+        token.cancel(message)
+    evt = {'type': 'cancelled', 'message': message}
+    BUS.publish(task_id, STORE.append_event(task_id, evt), evt)
+    BUS.close(task_id)
+    return True
+
+
+def terminate_old_task(url: str, max_pages=None) -> bool:
     """终止指定URL的旧任务"""
-    url_hash = get_url_hash(url)
-    history = URL_HISTORY.get(url_hash, {})
+    url_hash = get_url_hash(url, max_pages)
+    history = STORE.get_history(url_hash)
     
     if not history:
         return False
     
     task_id = history.get('task_id')
-    if task_id and task_id in TASKS:
-        task = TASKS[task_id]
-        if not task.get('done', False):
-            logger.info(f"终止旧任务: {task_id}")
-            # 标记任务为终止状态
-            task['terminated'] = True
-            task['done'] = True
-            # 清除历史记录
-            del URL_HISTORY[url_hash]
-            return True
+    if task_id and cancel_task(task_id, '任务已被新的爬取请求取代'):
+        logger.info(f"终止旧任务: {task_id}")
+        # 清除历史记录
+        STORE.delete_history(url_hash)
+        return True
     
     return False
 
 
+def start_scrape_task(url: str, max_pages_client=None, verbose: bool = False,
+                      priority: int = None) -> Tuple[str, int, float, bool]:
+    """创建爬取任务并提交到调度器，返回 (task_id, 排队位置, 预计等待秒数, 是否新建)。
+
+    相同网址和参数的任务正在运行时（包括其他 worker 进程中的），不再新建任务，
+    而是返回该任务，调用方订阅同一个事件流。队列已满时撤销任务并抛出 QueueFullError。
+    """
+    # 首次创建任务时启动后台清理线程，导入模块不产生后台线程
+    if LIFECYCLE['enabled']:
+        LIFECYCLE_MANAGER.start()
+    
+    # 分配任务ID
+    task_id = f"t{int(time.time()*1000)}{uuid.uuid4().hex[:4]}"
+    url_hash = get_url_hash(url, max_pages_client)
+    
+    # 原子地创建任务并写入历史 - 保留上次的结果文件，刷新期间仍可返回
+    previous_history = STORE.get_history(url_hash)
+    history_fields = {
+        'status': STATUS_RUNNING,
+        'timestamp': time.time(),
+        'url': url
+    }
+    owner, created = STORE.claim_task(url_hash, task_id, url, history=history_fields)
+    if not created:
+        position = SCHEDULER.position(owner)
+        logger.info(f"相同网址和参数的任务正在运行，合并到任务: {owner}, URL: {url}")
+        return owner, position, SCHEDULER.estimated_wait(position), False
+    BUS.open(task_id)
+    
+    logger.info(f"创建任务: {task_id}, URL: {url}")
+    logger.info(f"保存到历史: {url_hash} -> {history_fields}")
+    
+    def emit(evt: dict):
+        logger.debug(f"任务 {task_id} 发送事件: {evt}")
+        BUS.publish(task_id, STORE.append_event(task_id, evt), evt)
+    
+    def is_terminated() -> bool:
+        task = STORE.get_task(task_id)
+        return task is None or task['terminated']
+
+    # 立即发送任务初始化事件
+    emit({'type': 'start', 'url': url, 'max_pages': max_pages_client or DEFAULT_MAX_PAGES})
+
+    # 运行爬虫（限制页数，避免长时间执行）
+    scraper = PhoneScraper(url)
+    scraper.progress_callback = ProgressCoalescer(emit, verbose=verbose)
+    scraper.cancel_token = CANCEL_TOKENS[task_id] = CancellationToken(check=is_terminated)
+    scraper.sink = SQLiteSink(RESULTS, task_id)
+
+    # 生成文件名（带时间戳，避免覆盖）
+    ts = time.strftime('%Y%m%d_%H%M%S')
+    safe_host = re.sub(r'[^a-zA-Z0-9_.-]', '_', urlparse(url).netloc or 'site')
+    base_name = f"{safe_host}_{ts}_{task_id[-4:]}"
+    docx_name = f"{base_name}.docx"
+    docx_path = os.path.join(OUTPUT_DIR, docx_name)
+
+    # 由调度器的工作线程执行抓取与导出
+    def run_task():
+        try:
+            logger.info(f"任务 {task_id} 开始执行")
+            
+            # 检查任务是否被终止
+            if is_terminated():
+                logger.info(f"任务 {task_id} 已被终止，停止执行")
+                return
+            
+            # 检查链接可达性（按主机缓存）
+            reachable, reason = PROBE.check(url)
+            if not reachable:
+                logger.warning(f"任务 {task_id} 链接不可访问: {reason}")
+                STORE.update_history(url_hash, status=STATUS_FAILED, timestamp=time.time())
+                emit({'type': 'error', 'message': reason})
+                return
+            
+            # 解析前端传入的页数限制
+            max_pages = DEFAULT_MAX_PAGES
+            try:
+                if max_pages_client is not None:
+                    mp = int(max_pages_client)
+                    if mp > 0:
+                        max_pages = mp
+            except Exception:
+                pass
+            
+            # 爬取
+            scraper.crawl_website(max_pages=max_pages)
+            
+            # 再次检查任务是否被终止
+            if is_terminated():
+                logger.info(f"任务 {task_id} 在爬取过程中被终止，停止执行")
+                return
+            
+            scraper.export_to_docx(docx_path)
+            
+            # 仅发送 DOCX 下载链接
+            if os.path.exists(docx_path):
+                files_payload = {'docx': f"/download/{docx_name}"}
+                
+                # 更新历史记录
+                now = time.time()
+                STORE.update_history(
+                    url_hash,
+                    status=STATUS_COMPLETED,
+                    files=files_payload,
+                    timestamp=now,
+                    completed_at=now
+                )
+                
+                emit({'type': 'files', 'files': files_payload})
+                STORE.transition(task_id, [STATUS_RUNNING], STATUS_COMPLETED, files=files_payload)
+                logger.info(f"任务 {task_id} 完成，文件: {docx_path}")
+            else:
+                logger.error(f"任务 {task_id} 失败，文件不存在: {docx_path}")
+                # 更新历史记录为失败
+                STORE.update_history(url_hash, status=STATUS_FAILED, timestamp=time.time())
+        except Exception as e:
+            logger.error(f"任务 {task_id} 执行失败: {e}")
+            # 更新历史记录为失败
+            STORE.update_history(url_hash, status=STATUS_FAILED, timestamp=time.time())
+            emit({'type': 'error', 'message': str(e)})
+        finally:
+            # 写出缓冲中的剩余结果
+            try:
+                scraper.sink.close()
+            except Exception as e:
+                logger.warning(f"任务 {task_id} 写入剩余结果失败: {e}")
+            # 未正常完成（失败/提前返回）的运行中任务标记为失败；已终止的任务保持终止状态
+            STORE.transition(task_id, [STATUS_RUNNING], STATUS_FAILED)
+            CANCEL_TOKENS.pop(task_id, None)
+            BUS.close(task_id)
+            logger.info(f"任务 {task_id} 标记完成")
+
+    def on_position(position: int, wait: float):
+        emit({'type': 'queued', 'position': position, 'estimated_wait': round(wait)})
+
+    try:
+        position, wait = SCHEDULER.submit(task_id, run_task, priority, on_position)
+    except QueueFullError:
+        # 检查之后队列被其他请求占满：撤销刚创建的任务
+        STORE.transition(task_id, [STATUS_RUNNING], STATUS_FAILED)
+        if previous_history:
+            STORE.set_history(url_hash, previous_history)
+        else:
+            STORE.delete_history(url_hash)
+        CANCEL_TOKENS.pop(task_id, None)
+        BUS.close(task_id)
+        raise
+    return task_id, position, wait, True
+
+
+def queue_full_response(error: QueueFullError):
+    """任务队列已满：返回 429 和预计等待时间"""
+    wait = max(1, round(error.estimated_wait))
+    logger.warning(f"任务队列已满，拒绝新任务，预计等待 {wait} 秒")
+    response = jsonify({
+        'status': 'queue_full',
+        'message': f'当前任务过多，请约 {wait} 秒后再试',
+        'estimated_wait': wait
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(wait)
+    return response
+
+
 INDEX_HTML = """
 <!doctype html>
 <html lang="zh-CN">
@@ -244,6 +475,7 @@ INDEX_HTML = """
               <div class="note">勾选后将强制重新爬取，否则优先使用已有结果</div>
             </div>
             <button id="submit" type="submit">开始爬取</button>
+            <button id="cancel" type="button" style="display:none">取消任务</button>
           </form>
           <div id="historyInfo" class="history-info" style="display:none"></div>
           <div id="status" class="status"></div>
@@ -267,6 +499,7 @@ INDEX_HTML = """
       const form = document.getElementById('form');
       const urlInput = document.getElementById('url');
       const submitBtn = document.getElementById('submit');
+      const cancelBtn = document.getElementById('cancel');
       const statusEl = document.getElementById('status');
       const resultEl = document.getElementById('result');
       const debugEl = document.getElementById('debug');
@@ -277,6 +510,7 @@ INDEX_HTML = """
 
       let pendingLinks = null;
       let eventSource = null;
+      let currentTaskId = null;
       let logs = [];
       let autoScroll = true;
 
@@ -303,17 +537,20 @@ INDEX_HTML = """
         // 添加到数组开头（时间降序）
         logs.unshift(logEntry);
         
+        // 只插入新条目，不重建整个日志列表
+        logContainer.insertBefore(createLogNode(logEntry), logContainer.firstChild);
+        
         // 限制日志数量，避免内存占用过大
         if (logs.length > 1000) {
-          logs = logs.slice(0, 1000);
+          logs.length = 1000;
+          while (logContainer.children.length > 1000) {
+            logContainer.removeChild(logContainer.lastChild);
+          }
         }
         
         // 更新日志计数
         logCounter.textContent = logs.length;
         
-        // 渲染日志
-        renderLogs();
-        
         // 自动滚动到底部
         if (autoScroll) {
           setTimeout(() => {
@@ -322,6 +559,14 @@ INDEX_HTML = """
         }
       }
 
+      function createLogNode(log) {
+        const node = document.createElement('div');
+        node.className = `log-entry ${log.type}`;
+        node.innerHTML = `<div class="log-time">${log.timestamp}</div>
+            <div class="log-message">${escapeHtml(log.message)}</div>`;
+        return node;
+      }
+
       function renderLogs() {
         logContainer.innerHTML = logs.map(log => `
           <div class="log-entry ${log.type}">
@@ -377,10 +622,11 @@ INDEX_HTML = """
       }
 
       function renderLinks() {
-        if (!pendingLinks || !pendingLinks.docx) return;
-        const href = pendingLinks.docx;
+        if (!pendingLinks || !(pendingLinks.docx || pendingLinks.zip)) return;
+        const href = pendingLinks.docx || pendingLinks.zip;
+        const label = pendingLinks.docx ? '下载 DOCX' : '下载批量结果 ZIP';
         const html = `<div>爬取成功，下载文档：</div>
-          <ul><li><a href="${href}" target="_blank">下载 DOCX</a></li></ul>
+          <ul><li><a href="${href}" target="_blank">${label}</a></li></ul>
           <div class="note">下载链接：<span id="dl-url">${href}</span></div>`;
         resultEl.innerHTML = html;
         resultEl.style.display = 'block';
@@ -396,6 +642,8 @@ INDEX_HTML = """
         
         const evt = new EventSource(`/api/events?task_id=${encodeURIComponent(taskId)}`);
         eventSource = evt;
+        currentTaskId = taskId;
+        cancelBtn.style.display = 'inline-block';
         
         evt.onopen = () => {
           addLog('SSE连接已建立', 'success');
@@ -403,12 +651,14 @@ INDEX_HTML = """
         
         evt.onmessage = (m) => {
           try {
-            addLog('收到消息: ' + m.data, 'info');
             const evtData = JSON.parse(m.data);
             if (evtData.type === 'start') {
               const mp = evtData.max_pages == null ? '未设置' : evtData.max_pages;
               statusEl.textContent = `开始任务：${evtData.url}，页数限制：${mp}`;
               addLog(`开始任务：${evtData.url}，页数限制：${mp}`, 'info');
+            } else if (evtData.type === 'queued') {
+              statusEl.textContent = `排队中：第 ${evtData.position} 位，预计等待 ${evtData.estimated_wait} 秒`;
+              addLog(`排队中：第 ${evtData.position} 位，预计等待 ${evtData.estimated_wait} 秒`, 'warning');
             } else if (evtData.type === 'site_title') {
               statusEl.textContent = `网站：${evtData.title}`;
               addLog(`网站：${evtData.title}`, 'info');
@@ -419,6 +669,9 @@ INDEX_HTML = """
               const { new_phones, new_contacts, url } = evtData;
               statusEl.textContent = `完成页面：${url}，新增手机号 ${new_phones} 个，联系人 ${new_contacts} 个`;
               addLog(`完成页面：${url}，新增手机号 ${new_phones} 个，联系人 ${new_contacts} 个`, 'success');
+            } else if (evtData.type === 'progress_summary') {
+              statusEl.textContent = `已爬取 ${evtData.pages} 页，待爬取 ${evtData.queue} 页；最近 ${evtData.batch} 页新增手机号 ${evtData.new_phones} 个，联系人 ${evtData.new_contacts} 个`;
+              addLog(`已爬取 ${evtData.pages} 页（最近 ${evtData.batch} 页新增手机号 ${evtData.new_phones}，联系人 ${evtData.new_contacts}），当前：${evtData.url}`, 'success');
             } else if (evtData.type === 'progress') {
               statusEl.textContent = `进度：已爬取 ${evtData.pages} 页，待爬取 ${evtData.queue} 页；累计手机号 ${evtData.phones}，联系人 ${evtData.contacts}`;
               addLog(`进度：已爬取 ${evtData.pages} 页，待爬取 ${evtData.queue} 页；累计手机号 ${evtData.phones}，联系人 ${evtData.contacts}`, 'info');
@@ -429,6 +682,9 @@ INDEX_HTML = """
             } else if (evtData.type === 'done') {
               statusEl.textContent = `完成：共 ${evtData.pages} 页，手机号 ${evtData.phones}，联系人 ${evtData.contacts}`;
               addLog(`爬取完成：共 ${evtData.pages} 页，手机号 ${evtData.phones}，联系人 ${evtData.contacts}`, 'success');
+              if (evtData.near_duplicates) {
+                addLog(`近似重复页面 ${evtData.near_duplicates} 页，外链已延后爬取`, 'info');
+              }
               if (evtData.files) {
                 pendingLinks = evtData.files;
                 renderLinks();
@@ -436,6 +692,16 @@ INDEX_HTML = """
             } else if (evtData.type === 'stream_end') {
               addLog('收到流结束信号，关闭连接', 'info');
               evt.close();
+              cancelBtn.style.display = 'none';
+            } else if (evtData.type === 'batch_progress') {
+              const finished = evtData.total - (evtData.pending || 0) - (evtData.running || 0);
+              statusEl.textContent = `批量任务：已结束 ${finished} / ${evtData.total}，运行中 ${evtData.running || 0}，已完成 ${evtData.completed || 0}，失败 ${evtData.failed || 0}`;
+              addLog(`批量进度：已结束 ${finished} / ${evtData.total}`, 'info');
+            } else if (evtData.type === 'cancelled') {
+              statusEl.textContent = evtData.message;
+              addLog(evtData.message, 'warning');
+            } else if (evtData.type === 'events_dropped') {
+              addLog(`重连期间有 ${evtData.count} 条较早的事件已超出缓冲范围`, 'warning');
             } else if (evtData.type === 'error') {
               statusEl.textContent = `错误：${evtData.message}`;
               addLog(`错误：${evtData.message}`, 'error');
@@ -446,11 +712,29 @@ INDEX_HTML = """
         };
         
         evt.onerror = (e) => {
-          addLog('SSE连接错误: ' + JSON.stringify(e), 'error');
-          evt.close();
+          // 浏览器会自动重连并携带 Last-Event-ID，服务端从断点续传
+          if (evt.readyState === EventSource.CLOSED) {
+            addLog('SSE连接已关闭', 'error');
+          } else {
+            addLog('SSE连接中断，正在重连...', 'warning');
+          }
         };
       }
 
+      cancelBtn.addEventListener('click', async () => {
+        if (!currentTaskId) return;
+        cancelBtn.disabled = true;
+        try {
+          const resp = await fetch(`/api/tasks/${encodeURIComponent(currentTaskId)}`, { method: 'DELETE' });
+          const data = await resp.json();
+          addLog(`取消任务：${data.message}`, resp.ok ? 'warning' : 'error');
+        } catch (err) {
+          addLog(`取消任务失败: ${err.message}`, 'error');
+        } finally {
+          cancelBtn.disabled = false;
+        }
+      });
+
       form.addEventListener('submit', async (e) => {
         e.preventDefault();
         const url = urlInput.value.trim();
@@ -556,6 +840,9 @@ def scrape_api():
     url = (data.get('url') or '').strip()
     max_pages_client = data.get('max_pages')
     re_scrape = data.get('re_scrape', False)
+    # verbose=true 时逐页推送事件，否则按间隔合并为进度摘要
+    verbose = bool(data.get('verbose', False))
+    priority = parse_priority(data.get('priority', 'normal'))
 
     logger.info(f"收到爬取请求: {url}, max_pages: {max_pages_client}, re_scrape: {re_scrape}")
 
@@ -568,23 +855,30 @@ def scrape_api():
     # 如果是强制重新爬取，先终止旧任务
     if re_scrape:
         logger.info("强制重新爬取，检查并终止旧任务")
-        if terminate_old_task(url):
+        if terminate_old_task(url, max_pages_client):
             logger.info("旧任务已终止")
         else:
             logger.info("没有找到需要终止的旧任务")
     else:
         # 如果不是强制重新爬取，先检查历史
         logger.info(f"检查URL历史: {url}")
-        history_check = check_url_history(url)
+        history_check = check_url_history(url, max_pages_client)
         logger.info(f"历史检查结果: {history_check}")
         
         if history_check['status'] == 'completed':
-            # 已有结果，直接返回
+            # 已有结果，直接返回；结果过期不久时在后台刷新
             logger.info(f"返回已有结果: {history_check['files']}")
+            if history_check.get('refresh'):
+                try:
+                    refresh_id = start_scrape_task(url, max_pages_client, False, JOB_PRIORITIES['low'])[0]
+                    logger.info(f"后台刷新任务: {refresh_id}")
+                except QueueFullError:
+                    logger.info("任务队列已满，暂不刷新过期结果")
             return jsonify({
                 'status': 'completed',
                 'message': history_check['message'],
-                'files': history_check['files']
+                'files': history_check['files'],
+                'stale': history_check.get('stale', False)
             })
         elif history_check['status'] == 'running':
             # 正在爬取中，返回任务ID
@@ -605,120 +899,37 @@ def scrape_api():
         else:
             logger.info(f"需要创建新任务: {history_check['message']}")
 
-    # 尝试访问链接，确保可访问
+    # 队列已满时直接拒绝
     try:
-        import requests
-        probe = requests.head(url, timeout=10, allow_redirects=True)
-        if probe.status_code >= 400:
-            return jsonify({ 'message': f'链接不可访问: HTTP {probe.status_code}' }), 400
-    except Exception as e:
-        return jsonify({ 'message': f'链接校验失败: {e}' }), 400
+        SCHEDULER.check_admission()
+    except QueueFullError as e:
+        return queue_full_response(e)
 
-    # 分配任务ID
-    task_id = f"t{int(time.time()*1000)}"
-    TASKS[task_id] = {'queue': [], 'done': False, 'url': url, 'terminated': False}
-    
-    # 记录到历史 - 立即保存，确保历史检查能正确工作
-    url_hash = get_url_hash(url)
-    URL_HISTORY[url_hash] = {
-        'task_id': task_id,
-        'status': 'running',
-        'timestamp': time.time(),
-        'url': url
-    }
-    
-    logger.info(f"创建任务: {task_id}, URL: {url}")
-    logger.info(f"保存到历史: {url_hash} -> {URL_HISTORY[url_hash]}")
-    
-    def emit(evt: dict):
-        logger.info(f"任务 {task_id} 发送事件: {evt}")
-        TASKS[task_id]['queue'].append(evt)
-
-    # 立即发送任务初始化事件
-    emit({'type': 'start', 'url': url, 'max_pages': max_pages_client or DEFAULT_MAX_PAGES})
-
-    # 运行爬虫（限制页数，避免长时间执行）
-    scraper = PhoneScraper(url)
-    scraper.progress_callback = emit
-
-    # 生成文件名（带时间戳，避免覆盖）
-    ts = time.strftime('%Y%m%d_%H%M%S')
-    safe_host = re.sub(r'[^a-zA-Z0-9_.-]', '_', urlparse(url).netloc or 'site')
-    base_name = f"{safe_host}_{ts}"
-    docx_name = f"{base_name}.docx"
-    docx_path = os.path.join(OUTPUT_DIR, docx_name)
+    # 该网址近期返回错误状态、或其主机近期无法连接时直接返回错误；其余情况在任务中探测，不阻塞请求
+    cached_probe = PROBE.cached(url)
+    if cached_probe is not None and not cached_probe[0]:
+        return jsonify({ 'message': cached_probe[1] }), 400
 
-    # 后台线程执行抓取与导出
-    import threading
-    def run_task():
-        try:
-            logger.info(f"任务 {task_id} 开始执行")
-            
-            # 检查任务是否被终止
-            if TASKS[task_id].get('terminated', False):
-                logger.info(f"任务 {task_id} 已被终止，停止执行")
-                return
-            
-            # 解析前端传入的页数限制
-            max_pages = DEFAULT_MAX_PAGES
-            try:
-                if max_pages_client is not None:
-                    mp = int(max_pages_client)
-                    if mp > 0:
-                        max_pages = mp
-            except Exception:
-                pass
-            
-            # 爬取
-            scraper.crawl_website(max_pages=max_pages)
-            
-            # 再次检查任务是否被终止
-            if TASKS[task_id].get('terminated', False):
-                logger.info(f"任务 {task_id} 在爬取过程中被终止，停止执行")
-                return
-            
-            scraper.export_to_docx(docx_path)
-            
-            # 仅发送 DOCX 下载链接
-            if os.path.exists(docx_path):
-                files_payload = {'docx': f"/download/{docx_name}"}
-                TASKS[task_id]['files'] = files_payload
-                
-                # 更新历史记录
-                URL_HISTORY[url_hash].update({
-                    'status': 'completed',
-                    'files': files_payload,
-                    'timestamp': time.time()
-                })
-                
-                emit({'type': 'files', 'files': files_payload})
-                logger.info(f"任务 {task_id} 完成，文件: {docx_path}")
-            else:
-                logger.error(f"任务 {task_id} 失败，文件不存在: {docx_path}")
-                # 更新历史记录为失败
-                URL_HISTORY[url_hash].update({
-                    'status': 'failed',
-                    'timestamp': time.time()
-                })
-        except Exception as e:
-            logger.error(f"任务 {task_id} 执行失败: {e}")
-            # 更新历史记录为失败
-            URL_HISTORY[url_hash].update({
-                'status': 'failed',
-                'timestamp': time.time()
-            })
-            emit({'type': 'error', 'message': str(e)})
-        finally:
-            TASKS[task_id]['done'] = True
-            logger.info(f"任务 {task_id} 标记完成")
+    try:
+        task_id, position, wait, created = start_scrape_task(url, max_pages_client, verbose, priority)
+    except QueueFullError as e:
+        return queue_full_response(e)
 
-    threading.Thread(target=run_task, daemon=True).start()
+    if not created:
+        # 并发提交了相同网址和参数：加入已在运行的任务，共享其事件流
+        return jsonify({
+            'status': 'running',
+            'message': '已有任务正在爬取中，请稍后',
+            'task_id': task_id
+        })
 
     # 返回新任务状态
     return jsonify({ 
         'status': 'new_task',
         'task_id': task_id,
-        'message': '开始新的爬取任务'
+        'message': '开始新的爬取任务' if wait <= 0 else f'任务已排队，第 {position} 位',
+        'position': position if wait > 0 else 0,
+        'estimated_wait': round(wait)
     })
 
 
@@ -750,18 +961,18 @@ def events():
         }
         return Response(error_stream(), headers=headers)
     
-    if task_id not in TASKS:
+    if STORE.get_task(task_id) is None:
         logger.error(f"SSE连接请求的task_id不存在: {task_id}")
         # 检查是否在历史记录中
         task_found_in_history = False
-        for url_hash, record in URL_HISTORY.items():
+        for url_hash, record in STORE.list_history().items():
             if record.get('task_id') == task_id:
                 task_found_in_history = True
-                logger.warning(f"任务 {task_id} 在历史记录中找到，但TASKS中不存在")
+                logger.warning(f"任务 {task_id} 在历史记录中找到，但任务存储中不存在")
                 break
         
         if task_found_in_history:
-            # 任务在历史记录中但TASKS中不存在，可能是服务重启了
+            # 任务在历史记录中但任务存储中不存在，可能是数据被清理了
             error_message = f'任务 {task_id} 状态异常，请重新提交'
         else:
             error_message = f'无效的task_id: {task_id}'
@@ -782,11 +993,21 @@ def events():
         }
         return Response(error_stream(), headers=headers)
 
+    # 断线重连时浏览器通过 Last-Event-ID 头告知已收到的最后一个事件
+    try:
+        resume_from = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id') or 0)
+    except ValueError:
+        resume_from = 0
+
     def stream():
         try:
-            # 持续推送队列中的事件，直到任务完成且队列清空
+            # 持续推送新事件，直到任务完成且事件读完；
+            # 没有新事件时阻塞等待通知，空闲超过心跳间隔时发送心跳注释
+            last_event_id = resume_from
+            idle = 0.0
+            heartbeat = EVENT_STREAM['heartbeat_interval']
             while True:
-                q = TASKS.get(task_id)
+                q = STORE.get_task(task_id)
                 if not q:
                     logger.warning(f"任务 {task_id} 不存在")
                     # 发送错误事件
@@ -794,13 +1015,19 @@ def events():
                     yield f"data: {__import__('json').dumps(error_event, ensure_ascii=False)}\n\n"
                     break
                     
-                while q['queue']:
-                    evt = q['queue'].pop(0)
-                    data = f"data: {__import__('json').dumps(evt, ensure_ascii=False)}\n\n"
-                    logger.info(f"发送事件: {evt}")
-                    yield data
+                for event_id, evt in read_events(task_id, last_event_id):
+                    if event_id > last_event_id + 1:
+                        # 超出缓冲范围的旧事件已被丢弃，告知客户端
+                        yield format_sse({'type': 'events_dropped', 'count': event_id - last_event_id - 1})
+                    last_event_id = event_id
+                    logger.debug(f"发送事件: {evt}")
+                    yield format_sse(evt, event_id)
                     
                 if q['done']:
+                    # 任务结束后可能还有未读事件，先补发
+                    for event_id, evt in read_events(task_id, last_event_id):
+                        last_event_id = event_id
+                        yield format_sse(evt, event_id)
                     # 结束前再推送一次 done（如果客户端错过）
                     done_event = {'type': 'done', 'files': q.get('files', {})}
                     yield f"data: {__import__('json').dumps(done_event, ensure_ascii=False)}\n\n"
@@ -808,8 +1035,16 @@ def events():
                     yield f"data: {__import__('json').dumps({'type': 'stream_end'}, ensure_ascii=False)}\n\n"
                     logger.info(f"任务 {task_id} 流结束")
                     break
-                    
-                time.sleep(0.5)
+                
+                # 任务在本进程运行时完全依赖通知；在其他 worker 运行时按间隔检查存储
+                timeout = heartbeat if BUS.is_local(task_id) else EVENT_STREAM['remote_poll_interval']
+                if BUS.wait(task_id, last_event_id, timeout):
+                    idle = 0.0
+                else:
+                    idle += timeout
+                    if idle >= heartbeat:
+                        yield ": heartbeat\n\n"
+                        idle = 0.0
         except Exception as e:
             logger.error(f"SSE流错误: {e}")
             yield f"data: {__import__('json').dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
@@ -826,9 +1061,259 @@ def events():
     return Response(stream(), headers=headers)
 
 
+@app.post('/api/batch')
+def batch_api():
+    """批量提交：JSON {'urls': [...]}，或上传每行一个网址的文本文件（表单字段 file）"""
+    if 'file' in request.files:
+        text = request.files['file'].read().decode('utf-8-sig', errors='ignore')
+        options = request.form
+    else:
+        options = request.get_json(silent=True) or {}
+        urls = options.get('urls') or []
+        text = '\n'.join(str(u) for u in urls) if isinstance(urls, list) else str(urls)
+
+    urls, invalid = parse_url_list(text)
+    if not urls:
+        return jsonify({'message': '请提供至少一个有效的HTTP/HTTPS网址', 'invalid': invalid[:100]}), 400
+    if len(urls) > BATCH['max_urls']:
+        return jsonify({'message': f'单个批次最多 {BATCH["max_urls"]} 个网址'}), 400
+
+    max_pages_client = options.get('max_pages')
+    re_scrape = str(options.get('re_scrape', '')).lower() in ('1', 'true', 'yes')
+    priority = parse_priority(options.get('priority', BATCH['priority']))
+    logger.info(f"收到批量爬取请求: {len(urls)} 个网址，无效 {len(invalid)} 个，re_scrape: {re_scrape}")
+
+    items = [{'url': url, 'status': ITEM_PENDING, 'task_id': '', 'files': {}} for url in urls]
+    batch_id = f"b{int(time.time()*1000)}{uuid.uuid4().hex[:4]}"
+    STORE.create_task(batch_id, '', kind='batch', total=len(items), invalid=invalid)
+    STORE.set_batch_items(batch_id, items)
+    BUS.open(batch_id)
+
+    def emit(evt: dict):
+        BUS.publish(batch_id, STORE.append_event(batch_id, evt), evt)
+        if evt['type'] == 'batch_progress':
+            STORE.update_task(batch_id, counts={k: v for k, v in evt.items() if k != 'type'})
+
+    def is_terminated() -> bool:
+        task = STORE.get_task(batch_id)
+        return task is None or task['terminated']
+
+    def submit_child(url: str) -> str:
+        # 先检查队列再创建子任务，队列满时不产生需要撤销的任务
+        SCHEDULER.check_admission()
+        return start_scrape_task(url, max_pages_client, False, priority)[0]
+
+    def resolve(item: dict):
+        # 与URL历史去重（在后台逐项检查）：缓存中已有结果的直接复用，正在运行的只跟踪，近期失败的跳过
+        if re_scrape:
+            terminate_old_task(item['url'], max_pages_client)
+            return
+        history_check = check_url_history(item['url'], max_pages_client)
+        if history_check['status'] == 'completed':
+            item.update(status=STATUS_COMPLETED, files=history_check['files'],
+                        task_id=history_check.get('task_id') or '')
+        elif history_check['status'] == 'running':
+            item.update(status=STATUS_RUNNING, task_id=history_check['task_id'])
+        elif history_check['status'] == 'failed':
+            item.update(status=ITEM_SKIPPED, task_id=history_check.get('task_id') or '')
+
+    def save_item(index: int, item: dict):
+        # 只改写变化的子项
+        STORE.update_batch_item(batch_id, index, item)
+
+    token = CANCEL_TOKENS[batch_id] = CancellationToken(check=is_terminated)
+    coordinator = BatchCoordinator(
+        items, STORE, submit=submit_child, emit=emit, cancel=cancel_task, cancel_token=token,
+        resolve=resolve, on_item=save_item
+    )
+
+    def run_batch():
+        try:
+            if not coordinator.run():
+                logger.info(f"批次 {batch_id} 已取消")
+                return
+            archive_name = f"batch_{batch_id}.zip"
+            build_batch_archive(items, os.path.join(OUTPUT_DIR, archive_name))
+            files_payload = {'zip': f"/download/{archive_name}"}
+            emit({'type': 'files', 'files': files_payload})
+            STORE.transition(batch_id, [STATUS_RUNNING], STATUS_COMPLETED, files=files_payload)
+            logger.info(f"批次 {batch_id} 完成: {coordinator.counts()}")
+        except Exception as e:
+            logger.error(f"批次 {batch_id} 执行失败: {e}")
+            emit({'type': 'error', 'message': str(e)})
+        finally:
+            STORE.transition(batch_id, [STATUS_RUNNING], STATUS_FAILED)
+            CANCEL_TOKENS.pop(batch_id, None)
+            BUS.close(batch_id)
+
+    # 协调器只负责提交和轮询，子任务由调度器的工作线程执行
+    threading.Thread(target=run_batch, name=f'batch-{batch_id}', daemon=True).start()
+
+    return jsonify({
+        'status': 'new_batch',
+        'task_id': batch_id,
+        'total': len(items),
+        'invalid': invalid[:100],
+        'counts': coordinator.counts(),
+        'message': f'已提交 {len(items)} 个网址'
+    })
+
+
+@app.get('/api/batch/<batch_id>')
+def batch_status(batch_id):
+    """查询批次状态和各网址结果"""
+    task = STORE.get_task(batch_id)
+    if task is None or task.get('kind') != 'batch':
+        return jsonify({'status': 'error', 'message': f'无效的批次ID: {batch_id}'}), 404
+    return jsonify({
+        'task_id': batch_id,
+        'status': task['status'],
+        'counts': task.get('counts', {}),
+        'files': task.get('files', {}),
+        # 旧版本的批次把子项保存在批次数据中
+        'items': STORE.get_batch_items(batch_id) or task.get('items', [])
+    })
+
+
+@app.delete('/api/tasks/<task_id>')
+def cancel_task_api(task_id):
+    """取消排队或运行中的任务"""
+    task = STORE.get_task(task_id)
+    if task is None:
+        return jsonify({'status': 'error', 'message': f'无效的task_id: {task_id}'}), 404
+    if not cancel_task(task_id):
+        task = STORE.get_task(task_id) or task
+        return jsonify({'status': task['status'], 'message': '任务已结束，无需取消'}), 409
+
+    # 清除该任务的历史记录，允许重新提交同一网址
+    url_hash = task.get('url_hash') or get_url_hash(task.get('url', ''))
+    history = STORE.get_history(url_hash)
+    if history and history.get('task_id') == task_id:
+        if history.get('files'):
+            # 保留上次的结果文件
+            STORE.update_history(url_hash, status=STATUS_TERMINATED, timestamp=time.time())
+        else:
+            STORE.delete_history(url_hash)
+    logger.info(f"任务 {task_id} 已取消")
+    return jsonify({'status': STATUS_TERMINATED, 'task_id': task_id, 'message': '任务已取消'})
+
+
+@app.get('/api/tasks/<task_id>/results')
+def task_results(task_id):
+    """分页读取任务的页面结果（爬取过程中即可读取）。
+
+    参数：cursor（上一页返回的 next_cursor）、limit、has_phone、url_prefix、
+    fields（逗号分隔的返回字段）；stream=1 时以 NDJSON 流式返回游标之后的全部结果。
+    任务未结束时，读到末尾后可稍后用同一 next_cursor 继续拉取新结果。
+    """
+    task = STORE.get_task(task_id)
+    if task is None:
+        return jsonify({'status': 'error', 'message': f'无效的task_id: {task_id}'}), 404
+    try:
+        cursor = int(request.args.get('cursor') or 0)
+        limit = int(request.args.get('limit') or RESULT_STORE['page_size'])
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'cursor 和 limit 必须为整数'}), 400
+    limit = max(1, min(limit, RESULT_STORE['max_page_size']))
+
+    filters = {}
+    has_phone = request.args.get('has_phone')
+    if has_phone is not None:
+        filters['has_phone'] = has_phone.lower() in ('1', 'true', 'yes')
+    if request.args.get('url_prefix'):
+        filters['url_prefix'] = request.args['url_prefix']
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+
+    def project(record: dict) -> dict:
+        if not fields:
+            return record
+        return {key: record[key] for key in ['id'] + fields if key in record}
+
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        def generate():
+            for record in RESULTS.iter_results(task_id, cursor, **filters):
+                yield json.dumps(project(record), ensure_ascii=False) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    results = RESULTS.query(task_id, cursor, limit, **filters)
+    return jsonify({
+        'task_id': task_id,
+        'status': task['status'],
+        'done': task['done'],
+        'results': [project(record) for record in results],
+        'next_cursor': results[-1]['id'] if results else cursor,
+        'has_more': len(results) == limit
+    })
+
+
+def parse_since(value: str) -> float:
+    """解析时间参数：Unix 时间戳或 YYYY-MM-DD[ HH:MM:SS]（本地时间）"""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+@app.get('/api/phones/new')
+def new_phones():
+    """列出某时间之后首次被爬到的手机号。
+
+    参数：since（必填，Unix 时间戳或 YYYY-MM-DD[ HH:MM:SS]）、limit、
+    cursor（上一页返回的 next_cursor）。
+    """
+    since = request.args.get('since', '').strip()
+    if not since:
+        return jsonify({'status': 'error', 'message': '请提供 since 参数'}), 400
+    try:
+        since_ts = parse_since(since)
+        limit = int(request.args.get('limit') or PHONE_INDEX['page_size'])
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'since 应为时间戳或 YYYY-MM-DD，limit 必须为整数'}), 400
+    limit = max(1, min(limit, PHONE_INDEX['max_page_size']))
+    phones = PHONE_INDEX_STORE.new_since(since_ts, limit, request.args.get('cursor'))
+    return jsonify({
+        'since': since_ts,
+        'phones': phones,
+        'next_cursor': phones[-1]['phone'] if phones else request.args.get('cursor'),
+        'has_more': len(phones) == limit
+    })
+
+
+@app.get('/api/phones/<phone>')
+def lookup_phone(phone):
+    """查询某手机号出现在哪些站点和页面"""
+    normalized = normalize_phone(phone)
+    if len(normalized) != 11:
+        return jsonify({'status': 'error', 'message': f'无效的手机号: {phone}'}), 400
+    sightings = PHONE_INDEX_STORE.lookup(normalized)
+    return jsonify({
+        'phone': normalized,
+        'found': bool(sightings),
+        'sites': sorted({item['site'] for item in sightings}),
+        'sightings': sightings
+    })
+
+
 @app.get('/health')
 def health_check():
-    return jsonify({'status': 'ok', 'timestamp': time.time()})
+    return jsonify({
+        'status': 'ok',
+        'timestamp': time.time(),
+        'scheduler': SCHEDULER.stats(),
+        'lifecycle': dict(
+            LIFECYCLE_MANAGER.metrics(),
+            event_channels=BUS.channel_count(),
+            cancel_tokens=len(CANCEL_TOKENS),
+            reachability_cache=len(PROBE)
+        ),
+        'outputs': OUTPUTS.metrics()
+    })
 
 
 @app.get('/api/history')
@@ -837,7 +1322,7 @@ def get_history():
     try:
         # 返回所有历史记录（仅包含必要信息）
         history_summary = {}
-        for url_hash, record in URL_HISTORY.items():
+        for url_hash, record in STORE.list_history().items():
             # 只返回最近的信息，不包含敏感数据
             history_summary[url_hash] = {
                 'status': record.get('status'),
@@ -860,9 +1345,8 @@ def get_history():
 def delete_history(url_hash):
     """删除指定URL的爬取历史"""
     try:
-        if url_hash in URL_HISTORY:
+        if STORE.delete_history(url_hash):
             # 删除历史记录
-            del URL_HISTORY[url_hash]
             logger.info(f"删除历史记录: {url_hash}")
             return jsonify({'status': 'success', 'message': '历史记录已删除'})
         else:
@@ -24,38 +24,102 @@ def run_web_app():
     print(f"启动Web应用: http://{host}:{port}")
     app.run(host=host, port=port, debug=False, threaded=True)
 
-def run_scraper():
+def run_stream_server():
+    """运行异步SSE推送服务"""
+    from core.stream_server import main as stream_main
+    from core.config import STREAM_SERVER
+    
+    print(f"启动SSE推送服务: http://{STREAM_SERVER['host']}:{STREAM_SERVER['port']}/api/events")
+    stream_main()
+
+def run_scraper(argv=None):
     """运行命令行爬取器"""
     from core.phone_scraper import PhoneScraper
     import argparse
     
     parser = argparse.ArgumentParser(description='手机号爬取器')
-    parser.add_argument('url', help='要爬取的网址')
+    parser.add_argument('url', nargs='?', help='要爬取的网址')
     parser.add_argument('--max-pages', type=int, default=200, help='最大爬取页数')
-    parser.add_argument('--output', help='输出文件路径')
+    parser.add_argument('--output', help='输出文件路径（单站点为 DOCX；--urls-file 模式为 JSONL，默认输出到标准输出）')
+    parser.add_argument('--associate', action='store_true', help='按就近距离关联姓名/职务与手机号')
+    parser.add_argument('--compact-dedup', action='store_true', help='去重集合只保存 64 位哈希（大规模爬取时降低内存占用）')
+    parser.add_argument('--urls-file', help='网址列表文件（每行一个），多站点并行爬取')
+    parser.add_argument('--max-workers', type=int, help='全局同时爬取的站点数上限')
+    parser.add_argument('--processes', type=int, help='进程数上限（默认CPU核数）')
+    parser.add_argument('--threads-per-process', type=int, help='每个进程同时爬取的站点数')
+    parser.add_argument('--docx-dir', help='--urls-file 模式下为每个站点导出 DOCX 的目录')
+    parser.add_argument('--results-jsonl', help='单站点模式下边爬取边把页面结果写入该 JSONL 文件，导出从该文件读取（已存在的文件改名为 .1 保留）')
+    
+    args = parser.parse_args(argv)
     
-    args = parser.parse_args()
+    if args.urls_file:
+        run_parallel_scraper(args)
+        return
+    if not args.url:
+        parser.error('请提供网址或 --urls-file')
     
-    scraper = PhoneScraper(args.url)
-    scraper.crawl_website(max_pages=args.max_pages)
+    scraper = PhoneScraper(args.url, associate_contacts=args.associate or None,
+                           compact_dedup=args.compact_dedup or None)
+    if args.results_jsonl:
+        from core.result_sink import JSONLSink
+        scraper.sink = JSONLSink(args.results_jsonl)
+    try:
+        scraper.crawl_website(max_pages=args.max_pages)
+    finally:
+        scraper.sink.close()
     
     if args.output:
         scraper.export_to_docx(args.output)
     else:
         scraper.export_to_docx()
 
+def run_parallel_scraper(args):
+    """多站点并行爬取，每个站点完成后输出一行 JSON"""
+    import json
+    from core.batch import parse_url_list
+    from core.parallel_crawl import iter_parallel_crawl
+    
+    with open(args.urls_file, encoding='utf-8-sig') as f:
+        urls, invalid = parse_url_list(f.read())
+    for url in invalid:
+        print(f"跳过无效网址: {url}", file=sys.stderr)
+    
+    out = open(args.output, 'a', encoding='utf-8') if args.output and args.output != '-' else sys.stdout
+    completed = 0
+    try:
+        for result in iter_parallel_crawl(
+            urls,
+            max_workers=args.max_workers,
+            processes=args.processes,
+            threads_per_process=args.threads_per_process,
+            max_pages=args.max_pages,
+            associate=args.associate,
+            compact_dedup=args.compact_dedup or None,
+            output_dir=args.docx_dir,
+        ):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+            completed += result['status'] == 'completed'
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"完成 {completed} / {len(urls)} 个站点", file=sys.stderr)
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='手机号爬取器')
-    parser.add_argument('--mode', choices=['web', 'scraper'], default='web', 
-                       help='运行模式: web(Web应用) 或 scraper(命令行爬取器)')
+    parser.add_argument('--mode', choices=['web', 'scraper', 'stream'], default='web', 
+                       help='运行模式: web(Web应用)、scraper(命令行爬取器) 或 stream(SSE推送服务)')
     
-    args = parser.parse_args()
+    # 其余参数交给各模式自己解析（如 scraper 模式的网址和 --urls-file）
+    args, remaining = parser.parse_known_args()
     
     if args.mode == 'web':
         run_web_app()
     elif args.mode == 'scraper':
-        run_scraper()
+        run_scraper(remaining)
+    elif args.mode == 'stream':
+        run_stream_server()
 
 if __name__ == '__main__':
     main()
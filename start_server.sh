@@ -12,6 +12,10 @@ HOST="0.0.0.0"
 
 # PID文件
 PID_FILE="$PROJECT_DIR/gunicorn.pid"
+STREAM_PID_FILE="$PROJECT_DIR/stream_server.pid"
+
+# SSE推送服务端口（nginx 将 /api/events 转发到该端口）
+STREAM_PORT="${STREAM_PORT:-5001}"
 
 # 日志文件
 LOG_DIR="$PROJECT_DIR/logs"
@@ -88,6 +92,16 @@ stop_service() {
     fi
     
     rm -f "$PID_FILE"
+    
+    # 停止SSE推送服务
+    if [[ -f "$STREAM_PID_FILE" ]]; then
+        local stream_pid=$(cat "$STREAM_PID_FILE" 2>/dev/null)
+        if [[ -n "$stream_pid" ]] && kill -0 "$stream_pid" 2>/dev/null; then
+            kill "$stream_pid"
+            echo "SSE推送服务已停止"
+        fi
+        rm -f "$STREAM_PID_FILE"
+    fi
 }
 
 # 启动服务
@@ -156,6 +170,11 @@ start_service() {
     local gunicorn_pid=$!
     echo "$gunicorn_pid" > "$PID_FILE"
     
+    # 启动异步SSE推送服务
+    STREAM_PORT="$STREAM_PORT" python3 "$PROJECT_DIR/run.py" --mode stream > "$LOG_DIR/stream_server.log" 2>&1 &
+    echo $! > "$STREAM_PID_FILE"
+    echo "SSE推送服务端口: $STREAM_PORT"
+    
     # 等待服务启动
     echo "等待服务启动..."
     sleep 3
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试公共配置
+爬取默认会写入跨任务手机号索引，导入 core.web_app 时会打开任务存储和页面结果存储；
+测试改用临时目录中的数据库，不写入仓库的 data/ 目录。需在导入 core 之前设置环境变量。
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix='phone_scraper_tests_')
+atexit.register(shutil.rmtree, _DATA_DIR, ignore_errors=True)
+os.environ['PHONE_INDEX_PATH'] = os.path.join(_DATA_DIR, 'phone_index.db')
+os.environ['TASK_STORE_PATH'] = os.path.join(_DATA_DIR, 'tasks.db')
+os.environ['RESULT_STORE_PATH'] = os.path.join(_DATA_DIR, 'results.db')
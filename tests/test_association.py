@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试手机号与联系人就近关联
+"""
+
+from bs4 import BeautifulSoup
+
+from core.association import associate_block, extract_contact_records, iter_text_blocks
+
+
+def test_associate_block():
+    """测试同一块内按最近距离配对"""
+    block = '联系人：张三 13800138000 负责人：李四 手机：139-0013-9000'
+    records = associate_block(block)
+    print(records)
+    assert records == [
+        {'name': '张三', 'title': '', 'phone': '13800138000'},
+        {'name': '李四', 'title': '负责人', 'phone': '13900139000'},
+    ]
+
+
+def test_associate_block_distance():
+    """测试超过最大距离时不配对"""
+    block = '联系人：张三' + '。' * 80 + '13800138000'
+    records = associate_block(block, max_distance=40)
+    assert records == [{'name': '', 'title': '', 'phone': '13800138000'}]
+
+
+def test_table_rows_are_separate_blocks():
+    """测试表格行各自成块，不会跨行配对"""
+    html = """
+    <table>
+      <tr><td>姓名：王五</td><td>主任</td><td>13600136000</td></tr>
+      <tr><td>姓名：赵六电话</td><td>经理</td><td>+86 13500135000</td></tr>
+    </table>
+    <p>总机 13700137000</p>
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    blocks = iter_text_blocks(soup)
+    assert len(blocks) == 3
+
+    records = extract_contact_records(soup)
+    print(records)
+    assert records == [
+        {'name': '王五', 'title': '主任', 'phone': '13600136000'},
+        {'name': '赵六', 'title': '', 'phone': '13500135000'},
+        {'name': '', 'title': '', 'phone': '13700137000'},
+    ]
+
+
+def test_deeply_nested_dom():
+    """测试嵌套很深的页面不会触发 RecursionError"""
+    depth = 5000
+    html = '<div>' * depth + '联系人：张三 13800138000' + '</div>' * depth
+    soup = BeautifulSoup(html, 'html.parser')
+    assert iter_text_blocks(soup) == ['联系人：张三 13800138000']
+    assert extract_contact_records(soup) == [{'name': '张三', 'title': '', 'phone': '13800138000'}]
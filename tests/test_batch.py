@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量爬取协调
+"""
+
+import zipfile
+
+from core.batch import BatchCoordinator, build_batch_archive, parse_url_list
+from core.job_scheduler import QueueFullError
+from core.task_store import SQLiteTaskStore, STATUS_COMPLETED, STATUS_RUNNING
+
+
+def test_parse_url_list():
+    """测试网址列表解析：按规范化网址去重、忽略注释和空行、记录无效行"""
+    text = '\n'.join([
+        '# 注释',
+        'https://a.example.com',
+        '',
+        'ftp://bad.example.com',
+        'https://b.example.com',
+        'https://a.example.com',
+        'HTTPS://A.example.com:443/',
+    ])
+    urls, invalid = parse_url_list(text)
+    assert urls == ['https://a.example.com', 'https://b.example.com']
+    assert invalid == ['ftp://bad.example.com']
+
+
+def test_coordinator_bounds_outstanding(tmp_path):
+    """测试协调器限制同时提交的子任务数，并在队列满时稍后重试"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    items = [{'url': f'https://s{i}.example.com', 'status': 'pending', 'task_id': '', 'files': {}}
+             for i in range(5)]
+    items.append({'url': 'https://done.example.com', 'status': STATUS_COMPLETED, 'task_id': 'old', 'files': {}})
+    submitted = []
+    peak = {'value': 0, 'full_once': True}
+
+    def submit(url):
+        if peak['full_once']:
+            peak['full_once'] = False
+            raise QueueFullError(10)
+        task_id = f'c{len(submitted)}'
+        store.create_task(task_id, url)
+        submitted.append(task_id)
+        running = sum(1 for t in submitted if store.get_task(t)['status'] == STATUS_RUNNING)
+        peak['value'] = max(peak['value'], running)
+        return task_id
+
+    events = []
+
+    def emit(evt):
+        events.append(evt)
+        # 模拟工作线程：每轮轮询时完成一个子任务
+        for task_id in submitted:
+            if store.transition(task_id, [STATUS_RUNNING], STATUS_COMPLETED):
+                break
+
+    coordinator = BatchCoordinator(items, store, submit, emit, max_outstanding=2, poll_interval=0)
+    assert coordinator.run() is True
+    assert len(submitted) == 5
+    assert peak['value'] <= 2
+    assert coordinator.counts() == {'completed': 6, 'total': 6}
+    assert events[-1]['completed'] == 6
+
+
+def test_coordinator_resolves_and_saves_items(tmp_path):
+    """测试协调器在后台逐项检查历史，并只保存变化的子项"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    items = [{'url': f'https://s{i}.example.com', 'status': 'pending', 'task_id': '', 'files': {}}
+             for i in range(3)]
+    store.set_batch_items('b1', items)
+
+    def resolve(item):
+        # 第一个网址已有缓存结果
+        if item['url'] == 'https://s0.example.com':
+            item.update(status=STATUS_COMPLETED, files={'docx': '/download/s0.docx'})
+
+    def submit(url):
+        task_id = f'c-{url[8:10]}'
+        store.create_task(task_id, url)
+        store.transition(task_id, [STATUS_RUNNING], STATUS_COMPLETED)
+        return task_id
+
+    saved = []
+
+    def on_item(index, item):
+        saved.append(index)
+        store.update_batch_item('b1', index, item)
+
+    coordinator = BatchCoordinator(items, store, submit, lambda evt: None, poll_interval=0,
+                                   resolve=resolve, on_item=on_item)
+    assert coordinator.run() is True
+    assert [item['status'] for item in store.get_batch_items('b1')] == [STATUS_COMPLETED] * 3
+    assert store.get_batch_items('b1')[1]['task_id'] == 'c-s1'
+    assert saved.count(0) == 1  # 已有结果的网址不提交，只保存一次
+
+
+def test_build_batch_archive(tmp_path):
+    """测试打包结果：包含已有的 DOCX 和汇总表"""
+    (tmp_path / 'a.docx').write_bytes(b'docx')
+    items = [
+        {'url': 'https://a.example.com', 'status': 'completed', 'task_id': 't1', 'files': {'docx': '/download/a.docx'}},
+        {'url': 'https://b.example.com', 'status': 'failed', 'task_id': 't2', 'files': {}},
+    ]
+    archive_path = tmp_path / 'batch.zip'
+    build_batch_archive(items, str(archive_path), output_dir=str(tmp_path))
+    with zipfile.ZipFile(archive_path) as archive:
+        assert sorted(archive.namelist()) == ['a.docx', 'summary.csv']
+        summary = archive.read('summary.csv').decode('utf-8-sig')
+    assert 'https://b.example.com,failed,t2,' in summary
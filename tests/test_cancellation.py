@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试爬取任务取消
+"""
+
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from core.cancellation import CancellationToken
+from core.job_scheduler import JobScheduler
+from core.phone_scraper import PhoneScraper
+
+
+def test_wait_interrupted_by_cancel():
+    """测试等待期间取消立即返回"""
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.monotonic()
+    assert token.wait(5) is True
+    assert time.monotonic() - start < 1
+
+
+def test_external_check():
+    """测试通过外部检查（共享存储）发现取消"""
+    flag = {'terminated': False}
+    token = CancellationToken(check=lambda: flag['terminated'], poll_interval=0.01)
+    assert token.wait(0.02) is False
+    flag['terminated'] = True
+    assert token.wait(5) is True
+    assert token.cancelled
+
+
+def test_crawl_stops_between_fetches(monkeypatch):
+    """测试取消后爬虫不再抓取新页面"""
+    scraper = PhoneScraper('https://example.com/')
+    fetched = []
+
+    def fake_get_page_content(url):
+        fetched.append(url)
+        if len(fetched) == 3:
+            scraper.cancel_token.cancel()
+        links = ''.join(f'<a href="/p{len(fetched)}-{i}">x</a>' for i in range(3))
+        return '', BeautifulSoup(f'<html><body>{links}</body></html>', 'html.parser')
+
+    monkeypatch.setattr(scraper, 'get_page_content', fake_get_page_content)
+    done = []
+    scraper.progress_callback = lambda evt: evt['type'] == 'done' and done.append(evt)
+    start = time.monotonic()
+    scraper.crawl_website(max_pages=100)
+
+    assert time.monotonic() - start < 2
+    assert len(fetched) == 3
+    assert done and done[0]['cancelled'] is True
+
+
+def test_scheduler_cancel_queued_job():
+    """测试取消排队中的任务"""
+    scheduler = JobScheduler(max_workers=1, max_queue=5)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+    scheduler.submit('running', lambda: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    scheduler.submit('queued', lambda: ran.append('queued'))
+    scheduler.submit('after', lambda: ran.append('after'))
+
+    assert scheduler.cancel('queued') is True
+    assert scheduler.cancel('queued') is False
+    assert scheduler.position('after') == 1
+    release.set()
+    for _ in range(100):
+        if ran:
+            break
+        time.sleep(0.01)
+    assert ran == ['after']
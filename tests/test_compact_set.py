@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试紧凑去重集合
+"""
+
+from bs4 import BeautifulSoup
+
+from core.compact_set import HashSet64, PhoneSet, hash64
+from core.config import NEAR_DUPLICATE
+from core.phone_scraper import PhoneScraper
+
+
+def test_hash_set_grows_and_stays_exact():
+    """测试扩容后仍能正确判断是否存在"""
+    urls = [f'https://example.com/page/{i}' for i in range(5000)]
+    seen = HashSet64(capacity=16)
+    for url in urls:
+        seen.add(url)
+    seen.add(urls[0])
+    assert len(seen) == 5000
+    assert all(url in seen for url in urls)
+    assert not any(f'https://example.com/other/{i}' in seen for i in range(5000))
+    assert seen.nbytes <= 16 * 5000 * 2
+
+
+def test_phone_set_stores_integers():
+    """测试手机号按整数保存并可迭代取回"""
+    phones = PhoneSet(['13812345678', '13912345678', '13812345678'])
+    assert len(phones) == 2
+    assert '13812345678' in phones and '13700000000' not in phones
+    assert sorted(phones) == ['13812345678', '13912345678']
+
+
+def test_scraper_compact_dedup_option():
+    """测试爬虫开启紧凑去重后去重结果不变"""
+    scraper = PhoneScraper('https://example.com/', compact_dedup=True)
+    assert isinstance(scraper.visited_urls, HashSet64)
+    assert isinstance(scraper.seen_phones, PhoneSet)
+    scraper.extract_page_info('https://example.com/a', BeautifulSoup(
+        '<title>t</title><p>张三 13812345678</p>', 'html.parser'))
+    scraper.extract_page_info('https://example.com/b', BeautifulSoup(
+        '<title>t</title><p>13812345678 13912345678</p>', 'html.parser'))
+    assert [r['phone_numbers'] for r in scraper.phone_contacts] == ['13812345678', '13912345678']
+
+
+def test_scraper_compact_near_duplicate_index(monkeypatch):
+    """测试紧凑模式下近似重复索引只保存网址哈希，提取缓存使用较小的上限"""
+    monkeypatch.setitem(NEAR_DUPLICATE, 'enabled', True)
+    scraper = PhoneScraper('https://example.com/', compact_dedup=True)
+    assert scraper.simhash_index.compact
+    assert scraper.extraction_cache is None or scraper.extraction_cache.max_entries < 20000
+    html = '<title>t</title><p>' + '项目介绍 工程设计 ' * 50 + '</p>'
+    assert scraper.extract_page_info('https://example.com/a', BeautifulSoup(html, 'html.parser')) is None
+    duplicate_of = scraper.extract_page_info('https://example.com/b', BeautifulSoup(html, 'html.parser'))
+    assert duplicate_of == f"#{hash64('https://example.com/a'):016x}"
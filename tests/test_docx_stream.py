@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式生成 Word 文档
+"""
+
+import os
+
+import pytest
+from docx import Document
+
+from core.docx_stream import StreamingDocxWriter, write_results_docx
+
+
+def test_written_document_opens_with_python_docx(tmp_path):
+    """测试生成的文档可被 python-docx 打开，样式、加粗和特殊字符正确"""
+    path = str(tmp_path / 'out.docx')
+    results = [{
+        'url': 'https://example.com/?a=1&b=2',
+        'title': '联系我们 <首页>',
+        'phone_numbers': '13812345678',
+        'contacts': '',
+        'records': [{'name': '张三', 'title': '经理', 'phone': '13812345678'}],
+    }]
+    write_results_docx(path, '示例\x01站点', iter(results), '2024-01-01 00:00:00', 1, 1, 0)
+
+    paragraphs = Document(path).paragraphs
+    assert paragraphs[0].style.name == 'Title' and paragraphs[0].text == '示例站点'
+    assert paragraphs[0].alignment == 1
+    assert [p.text for p in paragraphs[1:5]] == [
+        '爬取时间: 2024-01-01 00:00:00', '爬取页面数: 1', '总计手机号: 1 个', '总计联系人: 0 个']
+    assert paragraphs[6].style.name == 'Heading 1' and paragraphs[6].text == '1. 联系我们 <首页>'
+    assert [(r.text, r.bold) for r in paragraphs[7].runs] == [('手机号: ', True), ('13812345678', None)]
+    assert paragraphs[8].text == '张三（经理）: 13812345678'
+    assert paragraphs[9].text == '来源: https://example.com/?a=1&b=2'
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    """测试写入中途出错时不留下不完整的文档"""
+    path = str(tmp_path / 'out.docx')
+    with pytest.raises(RuntimeError):
+        with StreamingDocxWriter(path) as writer:
+            writer.paragraph('第一段')
+            raise RuntimeError('中断')
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试任务事件通知（条件变量推送）
+"""
+
+import threading
+import time
+
+from core.event_bus import EventBus
+
+
+def test_publish_wakes_all_subscribers():
+    """测试一次发布唤醒同一任务的所有订阅者"""
+    bus = EventBus()
+    bus.open('t1')
+    woke = []
+
+    def subscriber():
+        start = time.time()
+        if bus.wait('t1', 0, timeout=5):
+            woke.append(time.time() - start)
+
+    threads = [threading.Thread(target=subscriber) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    bus.publish('t1', 1)
+    for t in threads:
+        t.join()
+    assert len(woke) == 5
+    assert max(woke) < 1
+
+
+def test_wait_returns_immediately_for_missed_event():
+    """测试订阅者错过的事件（id 已更新）不会阻塞"""
+    bus = EventBus()
+    bus.open('t2')
+    bus.publish('t2', 3)
+    assert bus.wait('t2', 2, timeout=5)
+    assert not bus.wait('t2', 3, timeout=0.01)
+
+
+def test_close_wakes_and_releases():
+    """测试任务结束时唤醒订阅者，旧通道被释放"""
+    bus = EventBus()
+    bus.open('t3')
+    bus.close('t3')
+    assert bus.wait('t3', 0, timeout=5)
+    bus.open('t4')
+    bus.close('t4')
+    assert not bus.is_local('t3')
+    assert bus.is_local('t4')
+
+
+def test_ring_buffer_replay():
+    """测试环形缓冲按 id 回放，超出缓冲范围时回退到存储"""
+    bus = EventBus(buffer_size=3)
+    bus.open('t5')
+    for i in range(1, 6):
+        bus.publish('t5', i, {'type': 'page_start', 'index': i})
+    assert [event_id for event_id, _ in bus.events_after('t5', 2)] == [3, 4, 5]
+    assert bus.events_after('t5', 4) == [(5, {'type': 'page_start', 'index': 5})]
+    assert bus.events_after('t5', 5) == []
+    # id 1 之后的事件已不全在缓冲中
+    assert bus.events_after('t5', 1) is None
+    # 非本进程的任务没有缓冲
+    assert bus.events_after('other', 0) is None
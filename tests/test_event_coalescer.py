@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试进度事件合并
+"""
+
+from core.event_coalescer import ProgressCoalescer
+
+
+def page_events(index):
+    return [
+        {'type': 'page_start', 'index': index, 'url': f'https://example.com/{index}', 'queue': 10 - index},
+        {'type': 'page_result', 'index': index, 'url': f'https://example.com/{index}', 'new_phones': 1, 'new_contacts': 0},
+    ]
+
+
+def test_page_events_are_batched():
+    """测试逐页事件合并为摘要，其他事件前先发出摘要"""
+    sent = []
+    coalescer = ProgressCoalescer(sent.append, interval=3600)
+    coalescer({'type': 'start', 'url': 'https://example.com'})
+    for i in range(1, 6):
+        for evt in page_events(i):
+            coalescer(evt)
+    coalescer({'type': 'done', 'pages': 5})
+
+    assert [evt['type'] for evt in sent] == ['start', 'progress_summary', 'done']
+    summary = sent[1]
+    assert summary['batch'] == 5 and summary['pages'] == 5 and summary['new_phones'] == 5
+    assert summary['queue'] == 5
+
+
+def test_interval_flush():
+    """测试间隔为 0 时每页发出一次摘要"""
+    sent = []
+    coalescer = ProgressCoalescer(sent.append, interval=0)
+    for i in range(1, 4):
+        for evt in page_events(i):
+            coalescer(evt)
+    assert [evt['batch'] for evt in sent] == [1, 1, 1]
+
+
+def test_verbose_passthrough():
+    """测试 verbose 模式原样转发"""
+    sent = []
+    coalescer = ProgressCoalescer(sent.append, verbose=True)
+    for evt in page_events(1):
+        coalescer(evt)
+    assert [evt['type'] for evt in sent] == ['page_start', 'page_result']
+
+
+def test_progress_keeps_latest():
+    """测试同一间隔内的 progress 只保留最新一条，随摘要之后发出"""
+    sent = []
+    coalescer = ProgressCoalescer(sent.append, interval=3600)
+    for i in range(1, 21):
+        for evt in page_events(i):
+            coalescer(evt)
+        if i % 10 == 0:
+            coalescer({'type': 'progress', 'pages': i, 'queue': 10 - i})
+    coalescer({'type': 'done', 'pages': 20})
+
+    assert [evt['type'] for evt in sent] == ['progress_summary', 'progress', 'done']
+    assert sent[0]['batch'] == 20 and sent[1]['pages'] == 20
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试按内容哈希的提取结果缓存
+"""
+
+from bs4 import BeautifulSoup
+
+from core.extraction_cache import ExtractionCache, content_key
+from core.phone_scraper import PhoneScraper
+
+
+def test_lru_eviction():
+    """测试内存层按 LRU 淘汰"""
+    cache = ExtractionCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # a 变为最近使用
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+
+def test_disk_tier(tmp_path):
+    """测试磁盘层按批写入，写入后在新实例中仍可命中"""
+    path = str(tmp_path / 'cache.db')
+    key = content_key('page', '联系人：张三 13800138000')
+    writer = ExtractionCache(disk_path=path, disk_batch_size=2, disk_flush_interval=60)
+    writer.set(key, {'phones': ['13800138000']})
+    assert ExtractionCache(disk_path=path).get(key) is None  # 未满一批，尚未写盘
+    assert writer.get(key) == {'phones': ['13800138000']}
+    writer.close()
+
+    cache = ExtractionCache(disk_path=path)
+    assert cache.get(key) == {'phones': ['13800138000']}
+    assert cache.stats()['hits'] == 1
+
+
+def test_scraper_reuses_page_extraction():
+    """测试相同内容的页面只提取一次，去重结果不变"""
+    scraper = PhoneScraper('http://example.com', associate_contacts=True)
+    scraper.extraction_cache = ExtractionCache()
+    html = '<title>联系我们</title><p>联系人：张三 13800138000</p><footer>总机 13900139000</footer>'
+
+    scraper.extract_page_info('http://example.com/a', BeautifulSoup(html, 'html.parser'))
+    scraper.extract_page_info('http://example.com/b', BeautifulSoup(html, 'html.parser'))
+
+    assert scraper.extraction_cache.stats()['hits'] >= 1
+    assert len(scraper.phone_contacts) == 1
+    assert scraper.phone_contacts[0]['records'][0] == {'name': '张三', 'title': '', 'phone': '13800138000'}
+
+
+def test_shared_footer_extracted_once():
+    """测试默认提取路径按块缓存：每页相同的页脚只运行一次正则"""
+    scraper = PhoneScraper('http://example.com')
+    scraper.extraction_cache = ExtractionCache()
+    calls = []
+    extract = scraper.extract_phone_numbers
+    scraper.extract_phone_numbers = lambda text: calls.append(text) or extract(text)
+    footer = '<footer>客服热线 13900139000</footer>'
+
+    for i, phone in enumerate(['13800138000', '13700137000']):
+        html = f'<title>第{i}页</title><p>联系人：张三{i} {phone}</p>{footer}'
+        scraper.extract_page_info(f'http://example.com/{i}', BeautifulSoup(html, 'html.parser'))
+
+    assert sum('13900139000' in text for text in calls) == 1
+    assert sorted(scraper.seen_phones) == ['13700137000', '13800138000', '13900139000']
+
+
+def test_label_block_merged_with_value():
+    """测试标签与值分属两个块时仍能提取联系人"""
+    scraper = PhoneScraper('http://example.com')
+    html = '<dl><dt>联系人：</dt><dd>王五</dd></dl><p>手机 13600136000</p>'
+    scraper.extract_page_info('http://example.com/', BeautifulSoup(html, 'html.parser'))
+    assert '王五' in scraper.seen_contacts
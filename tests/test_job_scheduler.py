@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试爬取任务调度
+"""
+
+import threading
+
+import pytest
+
+from core.job_scheduler import JobScheduler, QueueFullError, parse_priority
+
+
+def blocking_job(started, release, name, order):
+    def run():
+        order.append(name)
+        started.set()
+        release.wait(5)
+    return run
+
+
+def test_pool_size_and_priority_order():
+    """测试同时只执行 max_workers 个任务，排队任务按优先级、同级先进先出执行"""
+    scheduler = JobScheduler(max_workers=1, max_queue=10)
+    release = threading.Event()
+    started = threading.Event()
+    order = []
+    done = threading.Event()
+
+    scheduler.submit('first', blocking_job(started, release, 'first', order))
+    assert started.wait(5)
+
+    positions = {}
+    for name, priority in [('low', 2), ('normal-a', 1), ('high', 0), ('normal-b', 1)]:
+        scheduler.submit(
+            name, lambda n=name: order.append(n), priority,
+            on_position=lambda p, w, n=name: positions.__setitem__(n, (p, w))
+        )
+    scheduler.submit('last', done.set, 3)
+
+    assert scheduler.stats()['running'] == 1
+    assert scheduler.position('high') == 1 and scheduler.position('low') == 4
+    assert positions['high'][1] > 0
+
+    release.set()
+    assert done.wait(5)
+    assert order == ['first', 'high', 'normal-a', 'normal-b', 'low']
+
+
+def test_queue_full_rejects_with_estimated_wait():
+    """测试队列已满时拒绝提交并给出预计等待时间"""
+    scheduler = JobScheduler(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit('running', blocking_job(started, release, 'running', []))
+    assert started.wait(5)
+    scheduler.submit('queued', lambda: None)
+
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.check_admission()
+    assert excinfo.value.estimated_wait > 0
+    with pytest.raises(QueueFullError):
+        scheduler.submit('rejected', lambda: None)
+    release.set()
+
+
+def test_parse_priority():
+    """测试优先级解析"""
+    assert parse_priority('high') == 0
+    assert parse_priority('low') == 2
+    assert parse_priority('5') == 5
+    assert parse_priority('unknown') == 1
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试任务生命周期清理
+"""
+
+import time
+
+from core.lifecycle import LifecycleManager
+from core.task_store import SQLiteTaskStore, STATUS_RUNNING, STATUS_COMPLETED
+
+
+def test_sweep_evicts_and_reports(tmp_path):
+    """测试一次清理删除过期任务、淘汰历史并更新统计"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    store.create_task('done', 'https://example.com')
+    store.append_event('done', {'type': 'start'})
+    store.transition('done', [STATUS_RUNNING], STATUS_COMPLETED)
+    store.create_task('live', 'https://example.com')
+    for i in range(3):
+        store.set_history(f'h{i}', {'status': STATUS_COMPLETED, 'timestamp': i})
+
+    evicted = []
+    manager = LifecycleManager(store, on_evict=evicted.append, prune=[lambda: 2],
+                               task_ttl=60, max_history=1)
+    assert manager.sweep() == {'evicted_tasks': 0, 'evicted_history': 2, 'pruned': 2}
+    assert manager.sweep(now=time.time() + 120)['evicted_tasks'] == 1
+    assert evicted == ['done']
+    assert list(store.list_history()) == ['h2']
+
+    metrics = manager.metrics()
+    assert metrics['sweeps'] == 2 and metrics['evicted_tasks'] == 1 and metrics['evicted_history'] == 2
+    assert metrics['retained'] == {'tasks': {STATUS_RUNNING: 1}, 'events': 0, 'history': 1}
+
+
+def test_background_thread(tmp_path):
+    """测试后台线程按间隔执行清理"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    manager = LifecycleManager(store, task_ttl=0, interval=0.05)
+    manager.start()
+    manager.start()
+    time.sleep(0.3)
+    manager.stop()
+    assert manager.metrics()['sweeps'] >= 2
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试输出文件保留策略
+"""
+
+import os
+
+from core.output_retention import OutputFile, OutputRetention, file_group, plan_deletions
+from core.task_store import SQLiteTaskStore, STATUS_RUNNING, STATUS_COMPLETED
+
+NOW = 1_000_000.0
+
+
+def test_file_group():
+    """测试按文件名识别主机分组"""
+    assert file_group('example.com_20240101_120000_ab12.docx') == 'example.com'
+    assert file_group('www.a_b.com_20240101_120000.docx') == 'www.a_b.com'
+    assert file_group('batch_b1700000000000abcd.zip') == 'batch'
+    assert file_group('manual.docx') == 'manual.docx'
+
+
+def test_plan_deletions_rules():
+    """测试每主机保留数、最长保留时间、总大小上限和新文件保护"""
+    files = [
+        OutputFile('a_new', 'a', 100, NOW - 10),
+        OutputFile('a_mid', 'a', 100, NOW - 1000),
+        OutputFile('b_mid', 'b', 100, NOW - 2000),
+        OutputFile('a_old', 'a', 100, NOW - 3000),
+        OutputFile('b_ancient', 'b', 100, NOW - 90000),
+    ]
+    names = lambda doomed: sorted(f.name for f in doomed)
+    assert names(plan_deletions(files, NOW, keep_latest=2)) == ['a_old']
+    assert names(plan_deletions(files, NOW, max_age=86400)) == ['b_ancient']
+    assert names(plan_deletions(files, NOW, max_bytes=250)) == ['a_old', 'b_ancient', 'b_mid']
+    # 新文件即使超出上限也不删除
+    assert names(plan_deletions(files, NOW, max_bytes=50, min_age=60)) == ['a_mid', 'a_old', 'b_ancient', 'b_mid']
+
+
+def test_sweep_deletes_files_and_purges_history(tmp_path):
+    """测试清理时删除文件并清理指向它的历史记录"""
+    out = tmp_path / 'outputs'
+    out.mkdir()
+    for i, name in enumerate(['example.com_20240101_000000_aaaa.docx', 'example.com_20240102_000000_bbbb.docx',
+                              'example.com_20240103_000000_cccc.docx']):
+        path = out / name
+        path.write_bytes(b'x' * 10)
+        os.utime(path, (NOW - 3000 + i, NOW - 3000 + i))
+
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    store.set_history('old', {'status': STATUS_COMPLETED, 'files': {'docx': '/download/example.com_20240101_000000_aaaa.docx'}})
+    store.create_task('t1', 'https://example.com')
+    store.set_history('refreshing', {'task_id': 't1', 'status': STATUS_RUNNING,
+                                     'files': {'docx': '/download/example.com_20240102_000000_bbbb.docx'}})
+    store.set_history('kept', {'status': STATUS_COMPLETED, 'files': {'docx': '/download/example.com_20240103_000000_cccc.docx'}})
+
+    retention = OutputRetention(store, str(out), max_age=0, max_bytes=0, keep_latest=1, min_age=0)
+    assert retention.sweep(now=NOW) == 2
+    assert sorted(os.listdir(out)) == ['example.com_20240103_000000_cccc.docx']
+    assert store.get_history('old') is None
+    # 正在刷新的记录保留，只清空结果文件
+    assert store.get_history('refreshing')['files'] == {}
+    assert store.get_history('kept')['files']
+
+    metrics = retention.metrics()
+    assert metrics['deleted_files'] == 2 and metrics['deleted_bytes'] == 20 and metrics['purged_history'] == 2
+    assert metrics['usage']['files'] == 1 and metrics['usage']['bytes'] == 10
+
+
+def test_usage_before_first_sweep(tmp_path):
+    """测试尚未清理时也能查询当前占用"""
+    out = tmp_path / 'outputs'
+    out.mkdir()
+    (out / 'example.com_20240101_000000_aaaa.docx').write_bytes(b'x' * 10)
+    retention = OutputRetention(SQLiteTaskStore(str(tmp_path / 'tasks.db')), str(out))
+    usage = retention.metrics()['usage']
+    assert usage['files'] == 1 and usage['bytes'] == 10
+    (out / 'example.com_20240102_000000_bbbb.docx').write_bytes(b'x' * 5)
+    assert retention.metrics()['usage']['bytes'] == 15
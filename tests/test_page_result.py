@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面结果记录
+"""
+
+import json
+import pickle
+
+from bs4 import BeautifulSoup
+
+from core.config import DATA_CLEANING
+from core.page_result import PageResult
+from core.phone_scraper import PhoneScraper
+
+
+def test_mapping_view_matches_page_info():
+    """测试记录按原 page_info 的键输出，导出时才拼接字符串"""
+    result = PageResult('https://example.com/', '首页', ['13812345678', '13912345678'], ['张三'],
+                        original_phones=['13812345678', '13912345678'], original_contacts=['张三', '张三'])
+    assert dict(result) == {
+        'url': 'https://example.com/',
+        'title': '首页',
+        'phone_numbers': '13812345678; 13912345678',
+        'contacts': '张三',
+        'phone_count': 2,
+        'contact_count': 1,
+        'original_phones': '13812345678; 13912345678',
+        'original_contacts': '张三; 张三',
+    }
+    # 原始号码与去重后相同时共用同一个元组
+    assert result.original_phone_list is result.phones
+    assert not hasattr(result, '__dict__')
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert json.loads(json.dumps(dict(result)))['phone_count'] == 2
+
+
+def test_save_original_data_gates_fields(monkeypatch):
+    """测试 save_original_data 关闭时不保存原始数据"""
+    soup = BeautifulSoup('<title>t</title><p>张三 13812345678</p>', 'html.parser')
+    monkeypatch.setitem(DATA_CLEANING, 'save_original_data', False)
+    scraper = PhoneScraper('https://example.com/')
+    scraper.extract_page_info('https://example.com/a', soup)
+    record = scraper.phone_contacts[0]
+    assert 'original_phones' not in record and 'records' not in record
+    assert record['phone_numbers'] == '13812345678'
+
+    monkeypatch.setitem(DATA_CLEANING, 'save_original_data', True)
+    scraper = PhoneScraper('https://example.com/')
+    scraper.extract_page_info('https://example.com/a', soup)
+    assert scraper.phone_contacts[0]['original_phones'] == '13812345678'
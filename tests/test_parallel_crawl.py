@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多站点并行爬取
+"""
+
+import multiprocessing
+
+import pytest
+
+from core import parallel_crawl
+from core.parallel_crawl import iter_parallel_crawl, plan_workers
+
+
+def test_plan_workers_respects_global_limit():
+    """测试进程数 x 线程数不超过全局上限和网址数"""
+    assert plan_workers(max_workers=16, processes=8, threads_per_process=4) == (4, 4)
+    processes, threads = plan_workers(max_workers=5, processes=8, threads_per_process=4)
+    assert processes * threads <= 5
+    assert plan_workers(max_workers=16, processes=8, threads_per_process=4, total_urls=2) == (1, 2)
+    assert plan_workers(max_workers=1, processes=8, threads_per_process=4) == (1, 1)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='需要 fork 启动方式继承替身函数')
+def test_results_stream_from_worker_processes(monkeypatch):
+    """测试每个站点的结果都从工作进程返回"""
+    def fake_crawl_site(url, **options):
+        return {'url': url, 'status': 'completed', 'max_pages': options['max_pages']}
+
+    monkeypatch.setattr(parallel_crawl, 'crawl_site', fake_crawl_site)
+    urls = [f'https://s{i}.example.com' for i in range(7)]
+    results = list(iter_parallel_crawl(urls, max_workers=4, processes=2, threads_per_process=2, max_pages=3))
+
+    assert sorted(r['url'] for r in results) == sorted(urls)
+    assert all(r['max_pages'] == 3 for r in results)
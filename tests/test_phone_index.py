@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试跨任务手机号索引
+"""
+
+from bs4 import BeautifulSoup
+
+from core.phone_index import PhoneIndex, PhoneIndexWriter, normalize_phone
+from core.config import DATA_CLEANING
+from core.phone_scraper import PhoneScraper
+
+
+def test_lookup_across_crawls(tmp_path):
+    """测试多次爬取后按号码查询全部出处，并保留首次出现时间"""
+    index = PhoneIndex(str(tmp_path / 'phones.db'))
+    index.upsert_pages('a.com', [
+        ('https://a.com/1', ['13812345678']),
+        ('https://a.com/2', ['138-1234-5678']),
+    ], seen_at=100)
+    index.upsert_pages('b.com', [('https://b.com/', ['13812345678', '13912345678'])], seen_at=200)
+    index.upsert_pages('a.com', [('https://a.com/1', ['13812345678'])], seen_at=300)
+
+    sightings = index.lookup('+86 138-1234-5678')
+    assert [(s['site'], s['url']) for s in sightings] == [
+        ('a.com', 'https://a.com/1'), ('b.com', 'https://b.com/'), ('a.com', 'https://a.com/2')]
+    assert (sightings[0]['first_seen'], sightings[0]['last_seen']) == (100, 300)
+    assert index.lookup('13700000000') == []
+    assert index.count() == 2
+
+
+def test_new_since_pagination(tmp_path):
+    """测试按首次出现时间列出新号码并分页"""
+    index = PhoneIndex(str(tmp_path / 'phones.db'))
+    index.upsert_pages('a.com', [('https://a.com/', ['13800000001'])], seen_at=100)
+    index.upsert_pages('b.com', [('https://b.com/', ['13800000003', '13800000002', '13800000001'])], seen_at=200)
+
+    first = index.new_since(150, limit=1)
+    assert [p['phone'] for p in first] == ['13800000002']
+    rest = index.new_since(150, limit=10, cursor=first[-1]['phone'])
+    assert [p['phone'] for p in rest] == ['13800000003']
+    assert [p['site_count'] for p in index.new_since(0)] == [2, 1, 1]
+    assert normalize_phone('8613800000001') == '13800000001'
+
+
+def test_writer_flushes_in_batches(tmp_path):
+    """测试写入器按批更新索引"""
+    index = PhoneIndex(str(tmp_path / 'phones.db'))
+    writer = PhoneIndexWriter(index, 'a.com', batch_size=2)
+    writer.add('https://a.com/1', ['13812345678'])
+    writer.add('https://a.com/empty', [])
+    assert index.count() == 0
+    writer.add('https://a.com/2', ['13912345678'])
+    assert index.count() == 2
+    writer.add('https://a.com/3', ['13712345678'])
+    writer.flush()
+    assert index.count() == 3
+
+
+def test_crawl_indexes_every_page(tmp_path, monkeypatch):
+    """测试爬取时按页面写入索引：本次爬取中已出现过的号码也记录后续页面的出处"""
+    monkeypatch.setitem(DATA_CLEANING, 'save_original_data', False)
+    index = PhoneIndex(str(tmp_path / 'phones.db'))
+    scraper = PhoneScraper('https://a.com/', phone_index=index)
+    pages = {
+        'https://a.com/': '<p>电话 13812345678</p><a href="/2">下一页</a>',
+        'https://a.com/2': '<p>电话 13812345678</p>',
+    }
+    monkeypatch.setattr(scraper, 'get_page_content',
+                        lambda url: ('', BeautifulSoup(f'<html><body>{pages[url]}</body></html>', 'html.parser')))
+    monkeypatch.setattr(scraper.cancel_token, 'wait', lambda timeout: False)
+    scraper.crawl_website(max_pages=5)
+
+    assert [r['url'] for r in scraper.phone_contacts] == ['https://a.com/']
+    assert sorted(s['url'] for s in index.lookup('13812345678')) == ['https://a.com/', 'https://a.com/2']
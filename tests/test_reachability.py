@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试链接可达性探测
+"""
+
+import requests
+
+from core.reachability import ReachabilityProbe
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """记录请求次数的会话替身"""
+
+    def __init__(self, head_status=200, get_status=200, head_error=None):
+        self.head_status = head_status
+        self.get_status = get_status
+        self.head_error = head_error
+        self.calls = []
+
+    def head(self, url, **kwargs):
+        self.calls.append(('HEAD', url))
+        if self.head_error:
+            raise self.head_error
+        return FakeResponse(self.head_status)
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(('GET', url, headers.get('Range')))
+        return FakeResponse(self.get_status)
+
+
+def test_http_result_cached_per_url():
+    """测试 HTTP 状态结果按网址缓存，单个网址 404 不影响同一主机的其他网址"""
+    session = FakeSession()
+    probe = ReachabilityProbe(session=session, ttl=60)
+    assert probe.cached('https://example.com/a') is None
+    assert probe.check('https://example.com/a')[0] is True
+    assert probe.check('https://EXAMPLE.com/a#top')[0] is True
+    assert probe.cached('https://example.com/a') == (True, 'HTTP 200')
+    assert probe.cached('https://example.com/b') is None
+    assert len(session.calls) == 1
+
+    session = FakeSession(head_status=404, get_status=404)
+    probe = ReachabilityProbe(session=session, failure_ttl=60)
+    assert probe.check('https://example.com/missing')[0] is False
+    assert probe.cached('https://example.com/other') is None
+
+
+def test_ranged_get_fallback_when_head_unsupported():
+    """测试 HEAD 返回错误时用 Range GET 确认"""
+    session = FakeSession(head_status=405, get_status=206)
+    probe = ReachabilityProbe(session=session)
+    assert probe.check('https://example.com/') == (True, 'HTTP 206')
+    assert session.calls[1] == ('GET', 'https://example.com/', 'bytes=0-0')
+
+    session = FakeSession(head_status=404, get_status=404)
+    probe = ReachabilityProbe(session=session)
+    ok, reason = probe.check('https://example.com/missing')
+    assert ok is False and '404' in reason
+
+
+def test_connection_error_not_retried_with_get():
+    """测试连接错误直接判定为不可达"""
+    session = FakeSession(head_error=requests.ConnectionError('refused'))
+    probe = ReachabilityProbe(session=session, failure_ttl=60)
+    ok, reason = probe.check('https://down.example.com/')
+    assert ok is False and 'refused' in reason
+    assert probe.cached('https://down.example.com/other') == (False, reason)
+    assert len(session.calls) == 1
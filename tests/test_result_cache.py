@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试结果缓存键与新鲜度
+"""
+
+import time
+
+from core.config import RESULT_CACHE
+from core.result_cache import (
+    canonicalize_url, result_key, freshness, FRESH, STALE, EXPIRED
+)
+
+
+def test_canonicalize_url():
+    """测试网址规范化"""
+    assert canonicalize_url('HTTPS://Example.COM:443/a/b/?y=2&x=1#top') == 'https://example.com/a/b?x=1&y=2'
+    assert canonicalize_url('http://example.com') == 'http://example.com/'
+    assert canonicalize_url('http://example.com:8080/') == 'http://example.com:8080/'
+
+
+def test_result_key_variants():
+    """测试同一网址的不同写法命中同一缓存键，参数不同则不同"""
+    base = result_key('https://example.com/list?a=1&b=2', 100)
+    assert result_key('https://EXAMPLE.com/list/?b=2&a=1', '100') == base
+    assert result_key('https://example.com/list?a=1&b=2', 50) != base
+    assert result_key('https://example.com/list?a=1&b=2', 100, mode='associate') != base
+    # 无效页数按默认页数处理
+    assert result_key('https://example.com/', None) == result_key('https://example.com/', 'abc')
+
+
+def test_freshness():
+    """测试按完成时间判断新鲜度，而不是按自然日"""
+    now = time.time()
+    ttl, stale_ttl = RESULT_CACHE['ttl'], RESULT_CACHE['stale_ttl']
+    assert freshness({'completed_at': now - 60}, now) == FRESH
+    assert freshness({'completed_at': now - ttl - 60}, now) == STALE
+    assert freshness({'completed_at': now - ttl - stale_ttl - 60}, now) == EXPIRED
+    # 没有 completed_at 时不看 timestamp（刷新开始时会被改写），按 STALE 处理
+    assert freshness({'timestamp': now - 60}, now) == STALE
+    assert freshness({'completed_at': now - ttl - 60, 'timestamp': now}, now) == STALE
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面结果写入端
+"""
+
+import json
+
+from core.page_result import PageResult
+from core.result_sink import JSONLSink, SQLiteSink
+from core.result_store import ResultStore
+from core.phone_scraper import PhoneScraper
+
+
+def test_jsonl_sink_batches_and_survives_reopen(tmp_path):
+    """测试 JSONL 按批落盘；新一次爬取另起文件，append 时继续追加"""
+    path = str(tmp_path / 'results.jsonl')
+    sink = JSONLSink(path, fsync_every=2, fsync_interval=3600)
+    sink.write(PageResult('https://example.com/1', '测试', ['13812345678'], []))
+    assert open(path, encoding='utf-8').read() == ''
+    sink.write(PageResult('https://example.com/2', '测试', ['13912345678'], []))
+    # 第二条触发落盘，未调用 close 也已写入文件
+    assert len(open(path, encoding='utf-8').read().splitlines()) == 2
+    sink.close()
+
+    sink = JSONLSink(path, append=True)
+    sink.write(PageResult('https://example.com/3', '测试', [], []))
+    assert len(sink) == 3
+    assert [r['url'] for r in sink] == [f'https://example.com/{i}' for i in (1, 2, 3)]
+    sink.close()
+
+    # 重新运行：上一次的结果改名保留，本次只导出新结果
+    sink = JSONLSink(path)
+    sink.write(PageResult('https://example.com/4', '测试', [], []))
+    assert len(sink) == 1
+    assert [r['url'] for r in sink] == ['https://example.com/4']
+    sink.close()
+    assert len(open(path + '.1', encoding='utf-8').read().splitlines()) == 3
+
+
+def test_sqlite_sink_writes_in_batches(tmp_path):
+    """测试 SQLite 写入端按批提交，迭代前写出缓冲"""
+    store = ResultStore(str(tmp_path / 'results.db'))
+    sink = SQLiteSink(store, 't1', fsync_every=3, fsync_interval=3600)
+    for i in range(4):
+        sink.write(PageResult(f'https://example.com/{i}', '测试', ['13812345678'], []))
+    assert store.count('t1') == 3
+    assert len(sink) == 4
+    records = list(sink)
+    assert store.count('t1') == 4
+    assert records[0] == PageResult('https://example.com/0', '测试', ['13812345678'], [])
+
+
+def test_exports_read_from_sink(tmp_path):
+    """测试导出从写入端读取结果"""
+    scraper = PhoneScraper('https://example.com/')
+    scraper.sink = JSONLSink(str(tmp_path / 'results.jsonl'))
+    scraper.sink.write(PageResult('https://example.com/a', '测试', ['13812345678'], []))
+    scraper.sink.write(PageResult('https://example.com/b', '测试', ['13912345678'], []))
+    scraper.sink.close()
+
+    json_path = tmp_path / 'out.json'
+    scraper.export_to_json(str(json_path))
+    assert json.loads(json_path.read_text(encoding='utf-8')) == scraper.phone_contacts
+    assert [r['url'] for r in scraper.phone_contacts] == ['https://example.com/a', 'https://example.com/b']
+
+    csv_path = tmp_path / 'out.csv'
+    scraper.export_to_csv(str(csv_path))
+    assert len(csv_path.read_text(encoding='utf-8-sig').splitlines()) == 3
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面结果存储
+"""
+
+from core.page_result import PageResult
+from core.result_store import ResultStore
+
+
+def test_cursor_pagination(tmp_path):
+    """测试游标分页按写入顺序读取，任务之间互不影响"""
+    store = ResultStore(str(tmp_path / 'results.db'))
+    for i in range(5):
+        store.append('t1', PageResult(f'https://example.com/{i}', '测试', ['13812345678'], []))
+    store.append('t2', PageResult('https://other.com/', '测试', [], []))
+
+    first = store.query('t1', 0, 2)
+    assert [r['url'] for r in first] == ['https://example.com/0', 'https://example.com/1']
+    rest = store.query('t1', first[-1]['id'], 10)
+    assert [r['url'] for r in rest] == [f'https://example.com/{i}' for i in range(2, 5)]
+    assert store.query('t1', rest[-1]['id'], 10) == []
+    assert store.count('t1') == 5
+
+
+def test_filters_and_iteration(tmp_path):
+    """测试按是否含手机号和 URL 前缀过滤"""
+    store = ResultStore(str(tmp_path / 'results.db'))
+    store.append('t1', PageResult('https://example.com/news/1', '测试', [], []))
+    store.append('t1', PageResult('https://example.com/contact', '测试', ['13812345678'], []))
+    store.append('t1', PageResult('https://example.com/news/2', '测试', ['13912345678'], []))
+
+    assert [r['url'] for r in store.query('t1', has_phone=True)] == [
+        'https://example.com/contact', 'https://example.com/news/2']
+    assert [r['url'] for r in store.query('t1', url_prefix='https://example.com/news/')] == [
+        'https://example.com/news/1', 'https://example.com/news/2']
+    assert [r['url'] for r in store.iter_results('t1', has_phone=False)] == ['https://example.com/news/1']
+    assert store.delete_task('t1') == 3
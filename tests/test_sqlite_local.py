@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试按线程建立的 SQLite 连接
+"""
+
+import threading
+
+import pytest
+
+from core.phone_index import PhoneIndex
+from core.result_store import ResultStore
+from core.sqlite_local import ThreadLocalSQLite
+
+
+def test_connection_per_thread(tmp_path):
+    """测试同一线程复用连接，不同线程各用自己的连接，且开启 WAL"""
+    db = ThreadLocalSQLite()
+    db._open_sqlite(str(tmp_path / 'nested' / 'test.db'))
+    conn = db._conn()
+    assert db._conn() is conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db._conn()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+@pytest.mark.parametrize('store_class', [ResultStore, PhoneIndex])
+def test_memory_database_rejected(store_class):
+    """测试各存储拒绝内存数据库"""
+    with pytest.raises(ValueError, match=store_class.__name__):
+        store_class(':memory:')
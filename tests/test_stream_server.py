@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试异步 SSE 推送服务
+"""
+
+import asyncio
+
+from core.stream_server import StreamServer
+from core.task_store import SQLiteTaskStore, STATUS_RUNNING, STATUS_COMPLETED
+
+
+async def read_stream(port, task_id, last_event_id=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = f'Last-Event-ID: {last_event_id}\r\n' if last_event_id else ''
+    writer.write(f'GET /api/events?task_id={task_id} HTTP/1.1\r\nHost: x\r\n{headers}\r\n'.encode())
+    await writer.drain()
+    data = await asyncio.wait_for(reader.read(), timeout=10)
+    writer.close()
+    return data.decode('utf-8')
+
+
+def test_many_watchers_share_one_feed(tmp_path):
+    """测试多个订阅者实时收到事件，且任务结束后流正常关闭"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+    store.create_task('t1', 'https://example.com')
+    store.append_event('t1', {'type': 'start'})
+
+    async def scenario():
+        stream_server = StreamServer(store=store, poll_interval=0.05, heartbeat=5)
+        server = await stream_server.serve('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            watchers = [asyncio.ensure_future(read_stream(port, 't1')) for _ in range(20)]
+            resumed = asyncio.ensure_future(read_stream(port, 't1', last_event_id=1))
+            await asyncio.sleep(0.2)
+            assert len(stream_server.feeds) == 1
+            store.append_event('t1', {'type': 'page_start', 'index': 1})
+            store.transition('t1', [STATUS_RUNNING], STATUS_COMPLETED, files={'docx': '/download/a.docx'})
+            return await asyncio.gather(*watchers), await resumed
+
+    outputs, resumed = asyncio.run(scenario())
+    for output in outputs:
+        assert 'id: 1\n' in output and 'id: 2\n' in output
+        assert output.count('"page_start"') == 1
+        assert '/download/a.docx' in output and output.endswith('data: {"type": "stream_end"}\n\n')
+    assert 'id: 1\n' not in resumed and 'id: 2\n' in resumed
+
+
+def test_unknown_task(tmp_path):
+    """测试无效 task_id 返回错误并结束"""
+    store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+
+    async def scenario():
+        server = await StreamServer(store=store).serve('127.0.0.1', 0)
+        async with server:
+            return await read_stream(server.sockets[0].getsockname()[1], 'missing')
+
+    output = asyncio.run(scenario())
+    assert '无效的task_id' in output and 'stream_end' in output
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试名录表格提取
+"""
+
+from bs4 import BeautifulSoup
+
+from core.phone_scraper import PhoneScraper
+from core.table_extractor import extract_table_records, map_header
+
+
+def test_map_header():
+    """测试表头列映射"""
+    mapping = map_header(['序号', '姓名', '职务', '联系电话', '备注'])
+    assert mapping == {1: 'name', 2: 'title', 3: 'phone'}
+    assert map_header(['负责人电话']) == {0: 'phone'}
+
+
+def test_extract_table_records():
+    """测试按列输出结构化记录"""
+    html = """
+    <table>
+      <tr><th>序号</th><th>姓名</th><th>职务</th><th>手机</th></tr>
+      <tr><td>1</td><td>张三</td><td>经理</td><td>138 0013 8000</td></tr>
+      <tr><td>2</td><td>李四</td><td>主任</td><td>13900139000 / 13700137000</td></tr>
+      <tr><td>3</td><td>王五</td><td>科员</td><td>-</td></tr>
+    </table>
+    <table><tr><td>地址</td><td>成都市</td></tr></table>
+    """
+    records = extract_table_records(BeautifulSoup(html, 'html.parser'))
+    print(records)
+    assert records == [
+        {'name': '张三', 'title': '经理', 'phone': '13800138000'},
+        {'name': '李四', 'title': '主任', 'phone': '13900139000'},
+        {'name': '李四', 'title': '主任', 'phone': '13700137000'},
+        {'name': '王五', 'title': '科员', 'phone': ''},
+    ]
+
+
+def test_merged_cells():
+    """测试合并单元格展开后按列取值"""
+    html = """
+    <table>
+      <tr><th>部门</th><th>姓名</th><th>职务</th><th>手机</th></tr>
+      <tr><td rowspan="2">办公室</td><td rowspan="2">张三</td><td>经理</td><td>13800138000</td></tr>
+      <tr><td>兼主任</td><td>13900139000</td></tr>
+      <tr><td colspan="3">李四</td><td>13700137000</td></tr>
+    </table>
+    """
+    records = extract_table_records(BeautifulSoup(html, 'html.parser'))
+    print(records)
+    assert records == [
+        {'name': '张三', 'title': '经理', 'phone': '13800138000'},
+        {'name': '张三', 'title': '兼主任', 'phone': '13900139000'},
+        {'name': '李四', 'title': '李四', 'phone': '13700137000'},
+    ]
+
+
+def test_table_phones_extracted_once():
+    """测试已按列提取的表格单元格不再由展平文本重复提取，未映射的列仍保留"""
+    html = """
+    <table>
+      <tr><th>姓名</th><th>手机</th><th>备注</th></tr>
+      <tr><td>张三</td><td>13800138000</td><td>备用 13900139000</td></tr>
+    </table>
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    records = extract_table_records(soup, remove_handled=True)
+    assert records == [{'name': '张三', 'title': '', 'phone': '13800138000'}]
+    text = soup.get_text()
+    assert '13800138000' not in text and '张三' not in text
+    assert '13900139000' in text
+
+
+def test_label_value_row_is_not_header():
+    """测试 "标签：值" 形式的行不被当作表头，其中的手机号仍由展平文本提取"""
+    html = """
+    <table>
+      <tr><td>联系人：张三</td><td>联系电话：13812345678</td></tr>
+    </table>
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    assert extract_table_records(soup, remove_handled=True) == []
+    assert '13812345678' in soup.get_text()
+
+    scraper = PhoneScraper('https://example.com/')
+    scraper.extract_page_info('https://example.com/', BeautifulSoup(html, 'html.parser'))
+    assert [r['phone_numbers'] for r in scraper.phone_contacts] == ['13812345678']
+
+
+def test_header_kept_without_records():
+    """测试表格没有提取出记录时，表头单元格不被移除"""
+    html = """
+    <table>
+      <tr><th>姓名</th><th>手机</th></tr>
+      <tr><td>-</td><td>-</td></tr>
+    </table>
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    assert extract_table_records(soup, remove_handled=True) == []
+    assert '姓名' in soup.get_text() and '手机' in soup.get_text()
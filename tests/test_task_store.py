@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试任务/历史共享存储（SQLite 与 Redis 本地替身）
+"""
+
+import copy
+import fnmatch
+import threading
+import time
+
+import pytest
+
+from core.task_store import (
+    RedisTaskStore, SQLiteTaskStore, TaskStore, WatchError,
+    STATUS_RUNNING, STATUS_COMPLETED, STATUS_FAILED, STATUS_TERMINATED
+)
+
+
+class FakeRedis:
+    """redis-py 的最小本地替身，支持 WATCH/MULTI 乐观事务"""
+
+    def __init__(self):
+        self.data = {}
+        self.versions = {}
+        self.lock = threading.RLock()
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self.lock:
+            h = self.data.setdefault(name, {})
+            if key is not None:
+                h[key] = value
+            h.update(mapping or {})
+            self._touch(name)
+
+    def hget(self, name, key):
+        return self.data.get(name, {}).get(key)
+
+    def hgetall(self, name):
+        return dict(self.data.get(name, {}))
+
+    def hdel(self, name, key):
+        with self.lock:
+            removed = self.data.get(name, {}).pop(key, None) is not None
+            self._touch(name)
+            return int(removed)
+
+    def rpush(self, name, value):
+        with self.lock:
+            items = self.data.setdefault(name, [])
+            items.append(value)
+            self._touch(name)
+            return len(items)
+
+    def incr(self, name):
+        with self.lock:
+            self.data[name] = self.data.get(name, 0) + 1
+            return self.data[name]
+
+    def ltrim(self, name, start, end):
+        with self.lock:
+            items = self.data.get(name, [])
+            self.data[name] = items[start:] if end == -1 else items[start:end + 1]
+
+    def lrange(self, name, start, end):
+        items = self.data.get(name, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def llen(self, name):
+        return len(self.data.get(name, []))
+
+    def hlen(self, name):
+        return len(self.data.get(name, {}))
+
+    def delete(self, *names):
+        with self.lock:
+            for name in names:
+                if self.data.pop(name, None) is not None:
+                    self._touch(name)
+
+    def scan_iter(self, match='*', count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.watched = {}
+        self.commands = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        self.watched[key] = self.client.versions.get(key, 0)
+
+    def unwatch(self):
+        self.watched = {}
+
+    def multi(self):
+        self.commands = []
+
+    def hget(self, *args):
+        return self.client.hget(*args)
+
+    def hgetall(self, *args):
+        return self.client.hgetall(*args)
+
+    def hset(self, *args, **kwargs):
+        self.commands.append((args, copy.deepcopy(kwargs)))
+
+    def execute(self):
+        with self.client.lock:
+            for key, version in self.watched.items():
+                if self.client.versions.get(key, 0) != version:
+                    self.watched, self.commands = {}, None
+                    raise WatchError()
+            for args, kwargs in self.commands:
+                self.client.hset(*args, **kwargs)
+        self.watched, self.commands = {}, None
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteTaskStore(str(tmp_path / 'tasks.db'), max_events=5)
+    return RedisTaskStore(FakeRedis(), max_events=5)
+
+
+def test_task_lifecycle(store):
+    """测试任务创建、更新与事件顺序"""
+    store.create_task('t1', 'https://example.com')
+    task = store.get_task('t1')
+    assert task['status'] == STATUS_RUNNING and not task['done']
+
+    assert store.append_event('t1', {'type': 'start'}) == 1
+    assert store.append_event('t1', {'type': 'page_start'}) == 2
+    assert store.get_events('t1', 1) == [(2, {'type': 'page_start'})]
+
+    assert store.transition('t1', [STATUS_RUNNING], STATUS_COMPLETED, files={'docx': '/download/a.docx'})
+    task = store.get_task('t1')
+    assert task['done'] and task['files'] == {'docx': '/download/a.docx'}
+    # 终态不能再被终止
+    assert not store.transition('t1', [STATUS_RUNNING], STATUS_TERMINATED)
+
+
+def test_events_are_bounded(store):
+    """测试事件只保留最近 max_events 条，id 持续递增"""
+    store.create_task('t4', 'https://example.com')
+    for i in range(12):
+        store.append_event('t4', {'type': 'page_start', 'index': i})
+    events = store.get_events('t4')
+    assert [event_id for event_id, _ in events] == [8, 9, 10, 11, 12]
+    assert store.get_events('t4', 10) == [(11, {'type': 'page_start', 'index': 10}), (12, {'type': 'page_start', 'index': 11})]
+
+
+def test_history(store):
+    """测试历史记录的增删改查"""
+    store.set_history('h1', {'task_id': 't1', 'status': 'running', 'url': 'https://example.com'})
+    store.update_history('h1', status='completed')
+    assert store.get_history('h1')['status'] == 'completed'
+    assert list(store.list_history()) == ['h1']
+    assert store.delete_history('h1')
+    assert store.get_history('h1') is None
+    assert not store.delete_history('h1')
+
+
+def test_transition_is_atomic(store):
+    """测试并发状态切换只有一个成功"""
+    store.create_task('t2', 'https://example.com')
+    results = []
+
+    def worker():
+        results.append(store.transition('t2', [STATUS_RUNNING], STATUS_TERMINATED))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 1
+
+
+def test_shared_between_instances(tmp_path):
+    """测试不同实例（模拟不同 worker）共享同一数据库"""
+    path = str(tmp_path / 'tasks.db')
+    SQLiteTaskStore(path).create_task('t3', 'https://example.com')
+    other = SQLiteTaskStore(path)
+    assert other.get_task('t3')['url'] == 'https://example.com'
+
+
+def test_store_interface():
+    """测试接口不能直接实例化，SQLite 后端拒绝线程间不共享的内存数据库"""
+    with pytest.raises(TypeError):
+        TaskStore()
+    with pytest.raises(ValueError):
+        SQLiteTaskStore(':memory:')
+
+
+def test_claim_task_single_flight(store):
+    """测试同一结果键并发认领时只创建一个任务，其余请求加入该任务"""
+    store.set_history('k1', {'files': {'docx': '/download/old.docx'}, 'status': STATUS_COMPLETED})
+    results = []
+    barrier = threading.Barrier(8)
+
+    def claim(i):
+        barrier.wait()
+        results.append(store.claim_task('k1', f't{i}', 'https://example.com', history={'status': STATUS_RUNNING}))
+
+    threads = [threading.Thread(target=claim, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    created = [task_id for task_id, is_new in results if is_new]
+    assert len(created) == 1
+    assert {task_id for task_id, _ in results} == set(created)
+    history = store.get_history('k1')
+    assert history['task_id'] == created[0]
+    # 保留上次的结果文件
+    assert history['files'] == {'docx': '/download/old.docx'}
+
+    # 任务结束后可以再次认领
+    store.transition(created[0], [STATUS_RUNNING], STATUS_COMPLETED)
+    assert store.claim_task('k1', 'next', 'https://example.com') == ('next', True)
+
+
+def test_evict_finished_tasks(store):
+    """测试只删除结束时间早于截止时间的任务及其事件"""
+    for task_id in ('old', 'running'):
+        store.create_task(task_id, 'https://example.com')
+        store.append_event(task_id, {'type': 'start'})
+    store.transition('old', [STATUS_RUNNING], STATUS_FAILED)
+
+    assert store.evict_tasks(time.time() - 60) == []
+    assert store.evict_tasks(time.time() + 1) == ['old']
+    assert store.get_task('old') is None and store.get_events('old') == []
+    assert store.get_task('running') is not None
+    assert store.stats() == {'tasks': {STATUS_RUNNING: 1}, 'events': 1, 'history': 0}
+
+
+def test_trim_history_keeps_recent_and_running(store):
+    """测试历史记录按最近使用时间淘汰，运行中的记录保留"""
+    store.create_task('t1', 'https://example.com')
+    store.set_history('running', {'task_id': 't1', 'status': STATUS_RUNNING, 'timestamp': 1})
+    store.set_history('old', {'status': STATUS_COMPLETED, 'timestamp': 2})
+    store.set_history('used', {'status': STATUS_COMPLETED, 'timestamp': 3, 'last_access': 100})
+    store.set_history('new', {'status': STATUS_COMPLETED, 'timestamp': 50})
+
+    assert store.trim_history(2) == 2
+    assert sorted(store.list_history()) == ['running', 'used']
+    assert store.trim_history(2) == 0
+
+
+
+def test_batch_items(store):
+    """测试批次子项逐项更新，随批次一起清理"""
+    store.create_task('b1', '', kind='batch')
+    store.set_batch_items('b1', [{'url': f'https://s{i}.example.com', 'status': 'pending'} for i in range(12)])
+    store.update_batch_item('b1', 10, {'url': 'https://s10.example.com', 'status': STATUS_COMPLETED})
+    items = store.get_batch_items('b1')
+    assert len(items) == 12
+    assert items[10]['status'] == STATUS_COMPLETED and items[2]['status'] == 'pending'
+
+    store.transition('b1', [STATUS_RUNNING], STATUS_COMPLETED)
+    assert store.evict_tasks(time.time() + 1) == ['b1']
+    assert store.get_batch_items('b1') == []
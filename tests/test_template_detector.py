@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试站点模板块识别
+"""
+
+from bs4 import BeautifulSoup
+
+from core.template_detector import TemplateLearner
+
+FOOTER = '<footer>版权所有 某某公司 联系电话：13800138000</footer>'
+
+
+def make_page(i):
+    return BeautifulSoup(
+        f'<html><body><div class="main"><p>第{i}页正文内容 联系人：员工{i}</p></div>{FOOTER}</body></html>',
+        'html.parser'
+    )
+
+
+def test_template_learned_and_stripped():
+    """测试学习期后移除重复的页脚块，正文保留"""
+    learner = TemplateLearner(learn_pages=3, min_ratio=0.8, min_text_length=10)
+    for i in range(3):
+        page = make_page(i)
+        assert learner.process(page) == 0
+        assert '13800138000' in page.get_text()
+
+    page = make_page(99)
+    assert learner.process(page) == 1
+    assert '13800138000' not in page.get_text()
+    assert '第99页正文内容' in page.get_text()
+    assert learner.skipped_blocks == 1
+
+
+def test_single_page_site_has_no_templates():
+    """测试页数不足时不识别模板"""
+    learner = TemplateLearner(learn_pages=1)
+    learner.process(make_page(0))
+    assert learner.templates == set()
+    assert learner.process(make_page(1)) == 0
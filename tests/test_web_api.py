@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 Web 接口（Flask 测试客户端）
+每个测试使用临时目录中的任务存储、页面结果存储、手机号索引和输出目录，不启动真实的爬取。
+"""
+
+import json
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from core import batch, web_app
+from core.config import LIFECYCLE
+from core.event_bus import EventBus
+from core.job_scheduler import JobScheduler
+from core.page_result import PageResult
+from core.phone_index import PhoneIndex
+from core.result_store import ResultStore
+from core.task_store import SQLiteTaskStore, STATUS_COMPLETED, STATUS_RUNNING, STATUS_TERMINATED
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    output_dir = tmp_path / 'outputs'
+    output_dir.mkdir()
+    monkeypatch.setattr(web_app, 'STORE', SQLiteTaskStore(str(tmp_path / 'tasks.db')))
+    monkeypatch.setattr(web_app, 'RESULTS', ResultStore(str(tmp_path / 'results.db')))
+    monkeypatch.setattr(web_app, 'PHONE_INDEX_STORE', PhoneIndex(str(tmp_path / 'phones.db')))
+    monkeypatch.setattr(web_app, 'BUS', EventBus())
+    monkeypatch.setattr(web_app, 'CANCEL_TOKENS', {})
+    monkeypatch.setattr(web_app, 'OUTPUT_DIR', str(output_dir))
+    monkeypatch.setattr(web_app, 'build_batch_archive',
+                        lambda items, path: batch.build_batch_archive(items, path, str(output_dir)))
+    monkeypatch.setitem(LIFECYCLE, 'enabled', False)
+    return web_app.app.test_client()
+
+
+def add_results(task_id, count):
+    """写入 count 页结果，偶数页含手机号，前一半在 /a/ 下"""
+    for i in range(count):
+        phones = [f'138000000{i:02d}'] if i % 2 == 0 else []
+        url = f"https://example.com/{'a' if i < count // 2 else 'b'}/{i}"
+        web_app.RESULTS.append(task_id, PageResult(url, '测试', phones, []))
+
+
+def test_task_results_pagination_and_filters(client):
+    """测试结果接口的游标分页和过滤条件"""
+    web_app.STORE.create_task('t1', 'https://example.com/')
+    add_results('t1', 6)
+
+    first = client.get('/api/tasks/t1/results?limit=4').get_json()
+    assert [r['url'][-1] for r in first['results']] == ['0', '1', '2', '3']
+    assert first['has_more'] is True and first['done'] is False
+    rest = client.get(f"/api/tasks/t1/results?limit=4&cursor={first['next_cursor']}").get_json()
+    assert [r['url'][-1] for r in rest['results']] == ['4', '5']
+    assert rest['has_more'] is False
+
+    filtered = client.get('/api/tasks/t1/results?has_phone=1&url_prefix=https://example.com/a/&fields=url').get_json()
+    assert [set(r) for r in filtered['results']] == [{'id', 'url'}, {'id', 'url'}]
+    assert [r['url'] for r in filtered['results']] == ['https://example.com/a/0', 'https://example.com/a/2']
+
+    assert client.get('/api/tasks/t1/results?cursor=x').status_code == 400
+    assert client.get('/api/tasks/missing/results').status_code == 404
+
+
+def test_task_results_stream(client):
+    """测试 stream=1 以 NDJSON 返回游标之后的全部结果"""
+    web_app.STORE.create_task('t1', 'https://example.com/')
+    add_results('t1', 3)
+    response = client.get('/api/tasks/t1/results?stream=1&has_phone=true')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['phone_numbers'] for r in lines] == ['13800000000', '13800000002']
+
+
+def test_cancel_task(client):
+    """测试取消接口：无效任务 404，运行中的任务取消并清除历史，已结束的任务 409"""
+    assert client.delete('/api/tasks/missing').status_code == 404
+
+    url = 'https://example.com/'
+    url_hash = web_app.get_url_hash(url)
+    web_app.STORE.create_task('t1', url, url_hash=url_hash)
+    web_app.STORE.set_history(url_hash, {'task_id': 't1', 'status': STATUS_RUNNING, 'url': url})
+    response = client.delete('/api/tasks/t1')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == STATUS_TERMINATED
+    assert web_app.STORE.get_task('t1')['status'] == STATUS_TERMINATED
+    assert web_app.STORE.get_history(url_hash) is None
+
+    web_app.STORE.create_task('t2', url, status=STATUS_COMPLETED)
+    response = client.delete('/api/tasks/t2')
+    assert response.status_code == 409
+    assert response.get_json()['status'] == STATUS_COMPLETED
+
+
+def test_queue_full_returns_retry_after(client, monkeypatch):
+    """测试队列已满时返回 429 和 Retry-After"""
+    scheduler = JobScheduler(max_workers=1, max_queue=0)
+    scheduler.avg_duration = 30
+    monkeypatch.setattr(web_app, 'SCHEDULER', scheduler)
+    response = client.post('/api/scrape', json={'url': 'https://example.com/'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == response.get_json()['estimated_wait'] >= 1
+
+
+def test_batch_dedup_and_archive(client):
+    """测试批次去重、复用已有结果并打包 ZIP"""
+    url = 'https://example.com/'
+    docx = 'example_com.docx'
+    Path(web_app.OUTPUT_DIR, docx).write_bytes(b'docx')
+    now = time.time()
+    web_app.STORE.set_history(web_app.get_url_hash(url), {
+        'task_id': 'old', 'status': STATUS_COMPLETED, 'url': url,
+        'files': {'docx': f'/download/{docx}'}, 'timestamp': now, 'completed_at': now,
+    })
+
+    response = client.post('/api/batch', json={'urls': [url, 'HTTPS://EXAMPLE.COM:443', 'ftp://example.com']})
+    data = response.get_json()
+    assert data['total'] == 1 and data['invalid'] == ['ftp://example.com']
+
+    for _ in range(100):
+        status = client.get(f"/api/batch/{data['task_id']}").get_json()
+        if status['status'] != STATUS_RUNNING:
+            break
+        time.sleep(0.05)
+    assert status['status'] == STATUS_COMPLETED
+    assert [item['status'] for item in status['items']] == [STATUS_COMPLETED]
+    archive_name = status['files']['zip'].rsplit('/', 1)[-1]
+    with zipfile.ZipFile(Path(web_app.OUTPUT_DIR, archive_name)) as archive:
+        assert sorted(archive.namelist()) == [docx, 'summary.csv']
+    assert client.get('/api/batch/missing').status_code == 404
+
+
+def test_phone_lookup_and_new_since(client):
+    """测试按号码查询出处，以及新号码列表的分页"""
+    web_app.PHONE_INDEX_STORE.upsert_pages('a.com', [('https://a.com/', ['13800000001', '13800000002'])], seen_at=100)
+    web_app.PHONE_INDEX_STORE.upsert_pages('b.com', [('https://b.com/', ['13800000001', '13800000003'])], seen_at=200)
+
+    found = client.get('/api/phones/+86 138-0000-0001').get_json()
+    assert found['found'] is True and found['sites'] == ['a.com', 'b.com']
+    assert client.get('/api/phones/13900000000').get_json()['found'] is False
+    assert client.get('/api/phones/123').status_code == 400
+
+    first = client.get('/api/phones/new?since=50&limit=2').get_json()
+    assert [p['phone'] for p in first['phones']] == ['13800000001', '13800000002']
+    assert first['has_more'] is True
+    rest = client.get(f"/api/phones/new?since=50&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [p['phone'] for p in rest['phones']] == ['13800000003']
+    assert rest['has_more'] is False
+    assert [p['phone'] for p in client.get('/api/phones/new?since=150').get_json()['phones']] == ['13800000003']
+    assert client.get('/api/phones/new').status_code == 400
+    assert client.get('/api/phones/new?since=yesterday').status_code == 400
+
+
+def test_health_reports_output_usage(client, monkeypatch):
+    """测试 /health 在首次清理之前就返回输出目录占用"""
+    monkeypatch.setattr(web_app, 'OUTPUTS', web_app.OutputRetention(web_app.STORE, web_app.OUTPUT_DIR))
+    Path(web_app.OUTPUT_DIR, 'example.com_20240101_000000_aaaa.docx').write_bytes(b'x' * 10)
+    usage = client.get('/health').get_json()['outputs']['usage']
+    assert usage['files'] == 1 and usage['bytes'] == 10